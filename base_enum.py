@@ -8,7 +8,17 @@ class BaseEnum(Enum):
         has issues when classes are imported from two different locations
 
         As such we define equality to work on a string comparison instead.
+        Members are singletons, so the identity check handles the common case cheaply.
         """
+        if self is __value:
+            return True
         if self.__class__.__name__ == __value.__class__.__name__:
             return self.value == __value.value
         return False
+
+    def __hash__(self) -> int:
+        """
+        Overriding __eq__ removes the inherited hash, so define one consistent with it.
+        Equal members always share a value, even across double imports.
+        """
+        return hash(self._value_)
@@ -1,9 +1,79 @@
 from __future__ import annotations
+import math
+import struct
 from enum import auto
-from typing import Optional
+from typing import NamedTuple, Optional, TYPE_CHECKING
 
 from base_enum import BaseEnum
-from team import MonsterTeam
+from helpers import registry
+from monster_base import MonsterBase, MonsterState
+from random_gen import RandomGen
+from team import MonsterTeam, TeamSnapshot
+
+from data_structures.queue_adt import RingBuffer
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from helpers import DataSnapshot
+    from policies import ActionPolicy
+    from replay import Replay
+
+
+# BattleSnapshot.to_bytes header: battle number, turn number, stalled, RandomGen seed, out1_held, out2_held.
+_BATTLE_SNAPSHOT_HEADER = struct.Struct("<IIBQBB")
+
+
+class BattleSnapshot(NamedTuple):
+    """An immutable copy of a battle in progress; see Battle.snapshot."""
+
+    battle_number: int
+    turn_number: int
+    stalled: bool
+    rng_seed: int
+    out1: MonsterState
+    out2: MonsterState
+    team1: TeamSnapshot
+    team2: TeamSnapshot
+    # Whether each monster out is also slot 0 of its (empty) team, as retrieve_from_team then returns it again.
+    out1_held: bool
+    out2_held: bool
+    # The game data the battle runs on (see Battle.game_data). Not part of the bytes form.
+    game_data: Optional[DataSnapshot] = None
+
+    def to_bytes(self) -> bytes:
+        """
+        The snapshot in a compact form that can be sent to other processes, with monster
+        classes numbered by the roster of its game data.
+        :complexity: O(TEAM_LIMIT)
+        """
+        index = (self.game_data or registry.current()).index
+        # Only the seed modulo RandomGen.MOD affects what RandomGen draws, and that fits the header.
+        header = _BATTLE_SNAPSHOT_HEADER.pack(
+            self.battle_number, self.turn_number, self.stalled, self.rng_seed % RandomGen.MOD, self.out1_held, self.out2_held,
+        )
+        return b"".join((
+            header,
+            MonsterTeam.state_fingerprint(self.out1, index),
+            MonsterTeam.state_fingerprint(self.out2, index),
+            self.team1.to_bytes(index),
+            self.team2.to_bytes(index),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, game_data: Optional[DataSnapshot] = None) -> BattleSnapshot:
+        """The snapshot in data, with its classes from game_data (default: the current data)."""
+        game_data = game_data or registry.current()
+        index = game_data.index
+        battle_number, turn_number, stalled, rng_seed, out1_held, out2_held = _BATTLE_SNAPSHOT_HEADER.unpack_from(data)
+        offset = _BATTLE_SNAPSHOT_HEADER.size
+        out1 = MonsterTeam.state_from_fingerprint(data, offset, index)
+        out2 = MonsterTeam.state_from_fingerprint(data, offset + MonsterTeam.MONSTER_FINGERPRINT_SIZE, index)
+        offset += 2 * MonsterTeam.MONSTER_FINGERPRINT_SIZE
+        team1, offset = TeamSnapshot.from_bytes(data, offset, index)
+        team2, offset = TeamSnapshot.from_bytes(data, offset, index)
+        if offset != len(data):
+            raise ValueError("Malformed battle snapshot.")
+        return cls(battle_number, turn_number, bool(stalled), rng_seed, out1, out2, team1, team2, bool(out1_held), bool(out2_held), game_data)
 
 
 class Battle:
@@ -18,8 +88,137 @@ class Battle:
         TEAM2 = auto()
         DRAW = auto()
 
-    def __init__(self, verbosity=0) -> None:
+    class Event(BaseEnum):
+        START = auto()
+        ATTACK = auto()
+        SWAP = auto()
+        TICK = auto()
+        LEVEL_UP = auto()
+        EVOLVE = auto()
+        FAINT = auto()
+        RESULT = auto()
+        SPECIAL = auto()
+
+    # Number of events kept for post-mortems. Each turn records a handful of events.
+    DEFAULT_LOG_SIZE = 256
+
+    def __init__(
+        self,
+        verbosity=0,
+        log_size=DEFAULT_LOG_SIZE,
+        max_turns: Optional[int]=None,
+        record: bool=False,
+        policy1: Optional[ActionPolicy]=None,
+        policy2: Optional[ActionPolicy]=None,
+    ) -> None:
+        """
+        :verbosity: 0 for silent battles, > 1 to also print every event as it happens.
+        :log_size: how many of the most recent events to keep in self.log. 0 disables the log.
+        :max_turns: if given, a battle still going after this many turns ends in a draw,
+            with self.stalled set. Some teams can otherwise keep swapping forever.
+        :record: keep a Replay of each battle in self.last_replay (see replay.py).
+        :policy1, policy2: what chooses team 1's and team 2's actions (see policies.py).
+            By default, each team's own choose_action.
+
+        Events are fixed-shape tuples (battle_number, turn_number, event, team, monster_name, value),
+        where value depends on the event: damage dealt, new level, or HP.
+        The log is shared by every battle fought by this instance, oldest events being overwritten.
+
+        Each battle keeps the game data (roster and effectiveness table, see helpers.DataSnapshot)
+        that was current when it started in self.game_data, so a registry reload mid-battle
+        does not change the battle under it.
+        """
         self.verbosity = verbosity
+        self.log = RingBuffer(log_size) if log_size > 0 else None
+        self.battle_number = 0
+        self.turn_number = 0
+        self.max_turns = max_turns
+        self.stalled = False
+        self.record = record
+        # Both teams' actions of each turn of the battle being recorded, one byte per turn.
+        self.actions: Optional[bytearray] = None
+        self.last_replay: Optional[Replay] = None
+        self.policy1 = policy1
+        self.policy2 = policy2
+        self.game_data: Optional[DataSnapshot] = None
+
+    def _record(self, event: Battle.Event, team: int, monster: Optional[MonsterBase], value: int) -> None:
+        if self.log is None and self.verbosity <= 1:
+            return
+        entry = (self.battle_number, self.turn_number, event, team, monster and monster.get_name(), value)
+        if self.log is not None:
+            self.log.append(entry)
+        if self.verbosity > 1:
+            print(Battle.describe_event(entry))
+
+    @staticmethod
+    def describe_event(entry: tuple) -> str:
+        """Human readable form of a logged event."""
+        battle_number, turn_number, event, team, monster, value = entry
+        prefix = f"[battle {battle_number} turn {turn_number}]"
+        if event == Battle.Event.START:
+            return f"{prefix} Battle begins"
+        elif event == Battle.Event.ATTACK:
+            return f"{prefix} Team {team}'s {monster} deals {value} damage"
+        elif event == Battle.Event.SWAP:
+            return f"{prefix} Team {team} swaps in {monster}, {value} HP"
+        elif event == Battle.Event.TICK:
+            return f"{prefix} Team {team}'s {monster} takes {value} damage as both are alive"
+        elif event == Battle.Event.LEVEL_UP:
+            return f"{prefix} Team {team}'s {monster} levels up to LV.{value}"
+        elif event == Battle.Event.EVOLVE:
+            return f"{prefix} Team {team}'s monster evolves into {monster}"
+        elif event == Battle.Event.FAINT:
+            return f"{prefix} Team {team}'s {monster} fainted"
+        elif event == Battle.Event.SPECIAL:
+            return f"{prefix} Team {team} uses its special on its {value} waiting monsters"
+        return f"{prefix} Result: {Battle.Result(value).name}"
+
+    def last_turns(self, n: int) -> ArrayR[tuple]:
+        """
+        Post-mortem of the most recent battle in the log: its events from the last n turns, oldest first.
+        Events already drained from the log, or overwritten by newer ones, are not included.
+        """
+        if self.log is None:
+            return ArrayR(0)
+        events = self.log.snapshot()
+        if len(events) == 0:
+            return events
+        last_battle, last_turn = events[len(events) - 1][0], events[len(events) - 1][1]
+        return ArrayR.from_iterable(
+            event for event in events
+            if event[0] == last_battle and event[1] > last_turn - n
+        )
+
+    @staticmethod
+    def compute_damage(m1: MonsterBase, m2: MonsterBase) -> int:
+        '''
+        If defense < attack / 2: damage = attack - defense
+        Otherwise, If defence < attack: damage = attack * 5/8 - defense / 4
+        Otherwise, damage = attack / 4
+        '''
+        attack = m1.get_attack()
+        defense = m2.get_defense()
+        if defense < (attack / 2):
+            return math.ceil(attack - defense)
+        elif defense < attack:
+            return math.ceil((attack * 5/8) - (defense / 4))
+        else:
+            return math.ceil(attack / 4)
+
+    def choose_actions(self) -> tuple[Battle.Action, Battle.Action]:
+        """The actions of team 1 and team 2 for this turn, recorded if the battle is."""
+        if self.policy1 is None:
+            action_team1 = self.team1.choose_action(self.out1, self.out2)
+        else:
+            action_team1 = self.policy1.choose_action(self, 1)
+        if self.policy2 is None:
+            action_team2 = self.team2.choose_action(self.out2, self.out1)
+        else:
+            action_team2 = self.policy2.choose_action(self, 2)
+        if self.actions is not None:
+            self.actions.append(action_team1.value | action_team2.value << 2)
+        return action_team1, action_team2
 
     def process_turn(self) -> Optional[Battle.Result]:
         """
@@ -29,86 +228,89 @@ class Battle:
         * remove fainted monsters and retrieve new ones.
         * return the battle result if completed.
         """
-        import math
         # Process actions chosen by each team
-        action_team1 = self.team1.choose_action(self.out1, self.out2)
-        action_team2 = self.team2.choose_action(self.out2, self.out1)
-
-        print(self.out1, self.out1.get_attack(), self.out1.get_defense(), ' VS ', 
-              self.out2, self.out2.get_attack(), self.out2.get_defense(), 'Begain!!!')
-
-        def compute_damage(m1, m2):
-            '''
-            If defense < attack / 2: damage = attack - defense
-            Otherwise, If defence < attack: damage = attack * 5/8 - defense / 4
-            Otherwise, damage = attack / 4
-            '''
-            attack = m1.get_attack()
-            defense = m2.get_defense()
-            if defense < (attack / 2):
-                return math.ceil(attack - defense)
-            elif defense < attack:
-                return math.ceil((attack * 5/8) - (defense / 4))
-            else:
-                return math.ceil(attack / 4)
+        return self.resolve_turn(*self.choose_actions())
+
+    def resolve_turn(self, action_team1: Battle.Action, action_team2: Battle.Action) -> Optional[Battle.Result]:
+        """Play out a turn in which the teams take the given actions. See process_turn."""
+        compute_damage = self.compute_damage
 
         # Compare speed
         if self.out1.get_speed() >= self.out2.get_speed():
             # Handle actions
             if action_team1 == Battle.Action.ATTACK:
                 damage = compute_damage(self.out1, self.out2)
-                self.out2.hp -= damage                    
-                print(f'{self.out2} takes {damage} damage from {self.out1}')
+                self.out2.hp -= damage
+                self._record(Battle.Event.ATTACK, 1, self.out1, damage)
             elif action_team1 == Battle.Action.SWAP:
                 self.out1 = self.team1.retrieve_from_team()
+                self._record(Battle.Event.SWAP, 1, self.out1, self.out1.hp)
+            elif action_team1 == Battle.Action.SPECIAL:
+                self.team1.special()
+                self._record(Battle.Event.SPECIAL, 1, None, len(self.team1))
             if self.out2.alive():
                 if action_team2 == Battle.Action.ATTACK:
                     damage = compute_damage(self.out2, self.out1)
                     self.out1.hp -= damage
-                    print(f'{self.out1} takes {damage} damage from {self.out2}')
+                    self._record(Battle.Event.ATTACK, 2, self.out2, damage)
                 elif action_team2 == Battle.Action.SWAP:
                     self.out2 = self.team2.retrieve_from_team()
+                    self._record(Battle.Event.SWAP, 2, self.out2, self.out2.hp)
+                elif action_team2 == Battle.Action.SPECIAL:
+                    self.team2.special()
+                    self._record(Battle.Event.SPECIAL, 2, None, len(self.team2))
         elif self.out1.get_speed() < self.out2.get_speed():
             if action_team2 == Battle.Action.ATTACK:
                 damage = compute_damage(self.out2, self.out1)
                 self.out1.hp -= damage
-                print(f'{self.out1} takes {damage} damage from {self.out2}')
+                self._record(Battle.Event.ATTACK, 2, self.out2, damage)
             elif action_team2 == Battle.Action.SWAP:
                 self.out2 = self.team2.retrieve_from_team()
+                self._record(Battle.Event.SWAP, 2, self.out2, self.out2.hp)
+            elif action_team2 == Battle.Action.SPECIAL:
+                self.team2.special()
+                self._record(Battle.Event.SPECIAL, 2, None, len(self.team2))
             if self.out1.alive():
                 if action_team1 == Battle.Action.ATTACK:
                     damage = compute_damage(self.out1, self.out2)
                     self.out2.hp -= damage
-                    print(f'{self.out2} takes {damage} damage from {self.out1}')
+                    self._record(Battle.Event.ATTACK, 1, self.out1, damage)
                 elif action_team1 == Battle.Action.SWAP:
                     self.out1 = self.team1.retrieve_from_team()
+                    self._record(Battle.Event.SWAP, 1, self.out1, self.out1.hp)
+                elif action_team1 == Battle.Action.SPECIAL:
+                    self.team1.special()
+                    self._record(Battle.Event.SPECIAL, 1, None, len(self.team1))
 
 
         # Subtract 1 from HP if both survive
         if self.out1.alive() and self.out2.alive():
-            print(f'{self.out1} and {self.out2} both alive and take 1 damage')
             self.out1.hp -= 1
             self.out2.hp -= 1
+            self._record(Battle.Event.TICK, 1, self.out1, 1)
+            self._record(Battle.Event.TICK, 2, self.out2, 1)
 
         if self.out1.alive() and (not self.out2.alive()):
             self.out1.level_up()
+            self._record(Battle.Event.LEVEL_UP, 1, self.out1, self.out1.level)
         elif self.out2.alive() and (not self.out1.alive()):
             self.out2.level_up()
+            self._record(Battle.Event.LEVEL_UP, 2, self.out2, self.out2.level)
 
         # Handle level ups and evolutions
         if self.out1.ready_to_evolve():
-            print(f'{self.out1} evolve to {self.out1.evolve()}')
             self.out1 = self.out1.evolve()
+            self._record(Battle.Event.EVOLVE, 1, self.out1, self.out1.level)
         if self.out2.ready_to_evolve():
-            print(f'{self.out2} evolve to {self.out2.evolve()}')
             self.out2 = self.out2.evolve()
+            self._record(Battle.Event.EVOLVE, 2, self.out2, self.out2.level)
 
         # Check if any monsters fainted and replace them
         if not self.out1.alive():
-            print(f'{self.out1} fainted')
+            self._record(Battle.Event.FAINT, 1, self.out1, 0)
             self.out1 = self.team1.retrieve_from_team()
         if not self.out2.alive():
-            print(f'{self.out2} fainted')
+            self._record(Battle.Event.FAINT, 2, self.out2, 0)
             self.out2 = self.team2.retrieve_from_team()
 
         # Check if the battle is completed
@@ -121,26 +323,115 @@ class Battle:
 
         # Increment the turn number
         self.turn_number += 1
-        print(self.out1, self.out2, 'One round end!!!!')
         return None
 
+    def clone(self) -> Battle:
+        """
+        A copy of the battle in progress, sharing no mutable state with it, for policies to
+        simulate ahead on: a new battle restored from a snapshot of this one.
+        The copy keeps no log and records nothing.
+        :complexity: O(TEAM_LIMIT)
+        """
+        battle = Battle(log_size=0, max_turns=self.max_turns, policy1=self.policy1, policy2=self.policy2)
+        battle.restore(self.snapshot(), rng=False)
+        return battle
+
+    def snapshot(self) -> BattleSnapshot:
+        """
+        The state of the battle in progress, including the RandomGen seed, as an immutable value.
+        Teams that haven't changed since their last snapshot share it, so taking one
+        every turn mostly copies the two monsters out.
+        :complexity: O(TEAM_LIMIT), O(1) while neither team changes.
+        """
+        team1, team2 = self.team1, self.team2
+        return BattleSnapshot(
+            self.battle_number,
+            self.turn_number,
+            self.stalled,
+            RandomGen.seed,
+            self.out1.state(),
+            self.out2.state(),
+            team1.snapshot(),
+            team2.snapshot(),
+            len(team1) == 0 and self.out1 is team1.monster_order[0],
+            len(team2) == 0 and self.out2 is team2.monster_order[0],
+            self.game_data or registry.current(),
+        )
+
+    def restore(self, snapshot: BattleSnapshot, rng: bool = True) -> None:
+        """
+        Put the battle (and RandomGen) back in the state of the snapshot, to carry on from
+        there. Teams that haven't changed since the snapshot are kept as they are.
+        :rng: whether to reseed the global RandomGen too. Pass False to only look at the state.
+        :complexity: O(TEAM_LIMIT), O(1) for unchanged teams.
+        """
+        self.battle_number = snapshot.battle_number
+        self.turn_number = snapshot.turn_number
+        self.stalled = snapshot.stalled
+        self.game_data = snapshot.game_data or registry.current()
+        if rng:
+            RandomGen.seed = snapshot.rng_seed
+        if getattr(self, "team1", None) is None:
+            self.team1 = MonsterTeam.from_snapshot(snapshot.team1)
+            self.team2 = MonsterTeam.from_snapshot(snapshot.team2)
+        else:
+            self.team1.restore(snapshot.team1)
+            self.team2.restore(snapshot.team2)
+        self.out1 = MonsterBase.from_state(snapshot.out1)
+        self.out2 = MonsterBase.from_state(snapshot.out2)
+        if snapshot.out1_held:
+            self.team1.monster_order[0] = self.out1
+        if snapshot.out2_held:
+            self.team2.monster_order[0] = self.out2
+
     def battle(self, team1: MonsterTeam, team2: MonsterTeam) -> Battle.Result:
         if self.verbosity > 0:
             print(f"Team 1: {team1} vs. Team 2: {team2}")
             print(f"Team 1: {team1.monster_order}")
             print(f"Team 2: {team2.monster_order}")
         # Add any pregame logic here.
+        if self.record:
+            seed, start1, start2 = RandomGen.seed, team1.fingerprint(), team2.fingerprint()
+            self.actions = bytearray()
+        self.start(team1, team2)
+        result = None
+        while result is None:
+            result = self.play_turn()
+        # Add any postgame logic here.
+        if self.record:
+            from replay import Replay, final_state_hash
+            self.last_replay = Replay(seed, start1, start2, bytes(self.actions), self.max_turns, result, final_state_hash(self, result))
+            self.actions = None
+        return result
+
+    def start(self, team1: MonsterTeam, team2: MonsterTeam) -> None:
+        """Begin a battle between the teams, sending out their first monsters. See battle."""
         self.turn_number = 0
+        self.battle_number += 1
+        self.stalled = False
+        self.game_data = registry.current()
+        self._record(Battle.Event.START, 0, None, 0)
         self.team1 = team1
         # self.team1.regenerate_team()
         self.team2 = team2
         # self.team2.regenerate_team()
         self.out1 = team1.retrieve_from_team()
         self.out2 = team2.retrieve_from_team()
-        result = None
-        while result is None:
+
+    def play_turn(self, action_team1: Optional[Battle.Action] = None, action_team2: Optional[Battle.Action] = None) -> Optional[Battle.Result]:
+        """
+        Play a turn of a started battle, with the given actions or else those the teams choose.
+        Applies max_turns, and logs the result once there is one.
+        """
+        if action_team1 is None or action_team2 is None:
             result = self.process_turn()
-        # Add any postgame logic here.
+        else:
+            result = self.resolve_turn(action_team1, action_team2)
+        if result is None and self.max_turns is not None and self.turn_number >= self.max_turns:
+            self.stalled = True
+            result = Battle.Result.DRAW
+        if result is not None:
+            self._record(Battle.Event.RESULT, 0, None, result.value)
         return result
 
 if __name__ == "__main__":
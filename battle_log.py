@@ -0,0 +1,57 @@
+from __future__ import annotations
+import sys
+import threading
+from typing import Callable, TextIO
+
+from battle import Battle
+
+from data_structures.queue_adt import RingBuffer
+from data_structures.referential_array import ArrayR
+
+
+def write_events(events: ArrayR[tuple], stream: TextIO = sys.stdout) -> None:
+    """Writes a batch of battle events in human readable form, with a single write call."""
+    stream.write("".join(Battle.describe_event(event) + "\n" for event in events))
+
+
+class BattleLogFlusher(threading.Thread):
+    """
+    Background reader that drains a battle's event log in batches.
+
+    The battle loop only appends tuples to its RingBuffer; formatting and I/O happen here,
+    off the hot path. If the battle outpaces the flusher, the oldest events are dropped
+    (see RingBuffer.dropped) rather than slowing the battle down.
+
+    Usage:
+    ```
+    battle = Battle()
+    flusher = BattleLogFlusher(battle.log)
+    flusher.start()
+    battle.battle(team1, team2)
+    flusher.stop()          # Flushes whatever is left
+    ```
+    """
+
+    def __init__(self, log: RingBuffer[tuple], sink: Callable[[ArrayR[tuple]], None] = write_events, interval: float = 0.1) -> None:
+        super().__init__(daemon=True)
+        self.log = log
+        self.sink = sink
+        self.interval = interval
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Drain the log and pass the batch to the sink, if there is anything buffered."""
+        events = self.log.drain()
+        if len(events) > 0:
+            self.sink(events)
+
+    def stop(self) -> None:
+        """Stop the reader thread and flush any remaining events."""
+        self._stopping.set()
+        if self.is_alive():
+            self.join()
+        self.flush()
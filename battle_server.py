@@ -0,0 +1,432 @@
+"""
+Local battle server.
+
+Serves battles over a Unix socket or loopback TCP, as newline-delimited JSON. Each request
+line is an object
+```
+{"id": 7, "team1": "BACK:Flamikin,Gustwing", "team2": "FRONT:*", "seed": 42, "max_turns": 100}
+```
+with teams given as ladder team specs (see team_spec_key), or "MODE:*" for a random team of
+that mode, drawn from the seed. "id" is echoed back, "seed" defaults to 0 and "max_turns" to
+the server's, which is also the most a request may ask for. Each request gets one response
+line, in the order the connection sent them:
+```
+{"id": 7, "result": "TEAM1", "turns": 23, "stalled": false}
+{"id": 8, "error": "Unexpected monster Flamikn"}
+```
+Many requests can be in flight on one connection, and many connections at once.
+
+Requests from all connections are gathered into micro-batches: up to batch_size requests,
+or whatever arrived within max_delay seconds of the first. Identical requests in a batch
+are played once (the seed only counts when a team is random, see request_key), results
+already known come from an LRU cache, and the rest are played by run_batch, with one reused
+Battle. Each team spec is parsed and built once per version of the game data, and later
+teams of that spec are restored from a snapshot of the first. The turns themselves are
+played battle by battle: each turn depends on the state the last one left, so there is
+nothing to vectorise across a batch. With processes > 1 the batch is split between worker
+processes, so the cost of reaching them is paid per chunk of battles rather than per battle.
+
+Each batch plays on the game data current when it starts (see helpers.DataSnapshot), and a
+registry reload empties the result cache. Worker processes keep the data they were forked
+with, so restart a server with processes > 1 to serve reloaded data.
+
+Usage:
+```
+python battle_server.py --port 8765 -j 4
+python battle_server.py --unix /tmp/battles.sock
+
+async def main():
+    async with BattleServer(port=0) as server:
+        host, port = server.address
+        ...
+```
+A load generator to benchmark it is in benchmarks/server_load.py (run_benchmarks.py --server).
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+import helpers
+from battle import Battle
+from ladder import parse_team_spec_key
+from random_gen import RandomGen
+from team import MonsterTeam, TeamSnapshot
+
+if TYPE_CHECKING:
+    from helpers import DataSnapshot
+    from roster import RosterIndex
+
+# A request as the server plays it: (team 1 spec, team 2 spec, seed, max turns).
+BattleRequest = tuple[str, str, int, int]
+# What playing one gives: (result name, turns, stalled), or (None, error message, False).
+BattleOutcome = tuple[Optional[str], Any, bool]
+
+RANDOM_TEAM = "*"
+
+# The battle a process plays its batches with, reused from batch to batch.
+_batch_battle: Optional[Battle] = None
+
+
+def _parse_spec(index: RosterIndex, spec: str) -> tuple[MonsterTeam.TeamMode, Optional[TeamSnapshot]]:
+    """
+    The team mode of a spec, and a snapshot of a fresh team built from it (None for a random team).
+    Restoring a team from the snapshot is about 3x quicker than building it again.
+    """
+    mode, _, names = spec.partition(":")
+    if mode not in MonsterTeam.TeamMode.__members__:
+        raise ValueError(f"Unexpected team mode {mode!r}")
+    if mode == MonsterTeam.TeamMode.OPTIMISE.name:
+        raise ValueError("TeamMode.OPTIMISE needs a sort_key, which team specs do not have.")
+    if names == RANDOM_TEAM:
+        return MonsterTeam.TeamMode[mode], None
+    team_mode, classes = parse_team_spec_key(spec, index)
+    if not 1 <= len(classes) <= MonsterTeam.TEAM_LIMIT:
+        raise ValueError(f"A team has between 1 and {MonsterTeam.TEAM_LIMIT} monsters.")
+    for cls in classes:
+        if not cls.can_be_spawned():
+            raise ValueError(f"{cls.get_name()} cannot be spawned.")
+    return team_mode, MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=classes).snapshot()
+
+
+def _spec_parser(game_data: DataSnapshot) -> Callable[[str], tuple[MonsterTeam.TeamMode, Optional[TeamSnapshot]]]:
+    """_parse_spec on this version of the game data, memoised with it so that a reload drops it."""
+    return game_data.cached("battle_server.parse_spec", lambda data: lru_cache(maxsize=4096)(partial(_parse_spec, data.index)))
+
+
+def request_key(spec1: str, spec2: str, seed: int, max_turns: int) -> BattleRequest:
+    """
+    The request as played. Only drawing random teams uses RandomGen, so a battle between
+    two given teams plays out the same whatever the seed, and its seed is dropped.
+    """
+    if not (spec1.endswith(RANDOM_TEAM) or spec2.endswith(RANDOM_TEAM)):
+        seed = 0
+    return spec1, spec2, seed, max_turns
+
+
+def build_team(spec: str, game_data: Optional[DataSnapshot] = None) -> MonsterTeam:
+    """
+    A fresh team from a team spec, drawing a random one (from RandomGen) for 'MODE:*'.
+    :game_data: the data to take the monster classes from. Default: the current data.
+    """
+    game_data = game_data or helpers.registry.current()
+    mode, template = _spec_parser(game_data)(spec)
+    if template is None:
+        return MonsterTeam(mode, MonsterTeam.SelectionMode.RANDOM, spawnable=game_data.index.spawnable())
+    return MonsterTeam.from_snapshot(template)
+
+
+def play_request(request: BattleRequest, battle: Optional[Battle] = None, game_data: Optional[DataSnapshot] = None) -> BattleOutcome:
+    """
+    Play one request: seed RandomGen, build both teams (from game_data, default the current
+    data), and battle them.
+    :complexity: O(T) for a battle of T turns.
+    """
+    spec1, spec2, seed, max_turns = request
+    battle = battle or Battle(log_size=0)
+    try:
+        RandomGen.set_seed(seed)
+        team1, team2 = build_team(spec1, game_data), build_team(spec2, game_data)
+    except (ValueError, KeyError) as e:
+        return None, str(e).strip("'\""), False
+    battle.max_turns = max_turns
+    try:
+        result = battle.battle(team1, team2)
+    except Exception as e:
+        # Answer with the error rather than losing the rest of the batch.
+        return None, f"The battle failed: {e!r}", False
+    return result.name, battle.turn_number, battle.stalled
+
+
+def run_batch(requests: list[BattleRequest]) -> list[BattleOutcome]:
+    """
+    Play a batch of requests on this process's reused battle, returning their outcomes in order.
+    The whole batch plays on the game data current when it starts.
+    """
+    global _batch_battle
+    if _batch_battle is None:
+        _batch_battle = Battle(log_size=0)
+    game_data = helpers.registry.current()
+    return [play_request(request, _batch_battle, game_data) for request in requests]
+
+
+class BattleServer:
+    """
+    The server described in the module docstring. Listens on the Unix socket `path` if
+    given, otherwise on TCP host:port (port 0 picks a free one; see address).
+
+    :batch_size: most requests played in one batch.
+    :max_delay: seconds a batch waits for more requests after its first one arrives.
+    :processes: worker processes to play batches in. 1 plays them on the event loop itself.
+    :max_turns: battles still going after this many turns are draws. Requests may ask for
+        fewer turns but not more, so no request can hold up the others for long.
+    :cache_size: outcomes kept in the LRU cache. 0 turns the cache off.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: Optional[str] = None,
+        batch_size: int = 256,
+        max_delay: float = 0.002,
+        processes: int = 1,
+        max_turns: int = 100,
+        cache_size: int = 10_000,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size should be at least 1.")
+        self.host = host
+        self.port = port
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.processes = processes
+        self.max_turns = max_turns
+        self.cache_size = cache_size
+        # Requests answered, batches played, battles actually simulated, and cache hits.
+        self.requests = 0
+        self.batches = 0
+        self.battles = 0
+        self.cache_hits = 0
+        self._cache: OrderedDict[BattleRequest, BattleOutcome] = OrderedDict()
+        # The data version the cached outcomes were played on.
+        self._cache_version = helpers.registry.version
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._connections: set[asyncio.Task] = set()
+        self._executor: Optional[Executor] = None
+
+    @property
+    def address(self) -> Any:
+        """Where the server listens: the socket path, or (host, port)."""
+        if self.path is not None:
+            return self.path
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self) -> None:
+        # Load the roster up front, so no request pays for it.
+        helpers.preload()
+        if self.processes > 1:
+            self._executor = helpers.worker_executor(self.processes)
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._play_batches())
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._serve_connection, self.path)
+        else:
+            self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+
+    async def close(self) -> None:
+        self._server.close()
+        for connection in self._connections:
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def __aenter__(self) -> BattleServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        # Responses are futures, written in the order their requests were read.
+        responses: asyncio.Queue = asyncio.Queue()
+        writing = asyncio.create_task(self._write_responses(writer, responses))
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial
+                except asyncio.LimitOverrunError:
+                    responses.put_nowait(self._error(None, "Malformed request: line too long"))
+                    await self._skip_line(reader)
+                    continue
+                if not line:
+                    break
+                if line.strip():
+                    try:
+                        response = self._submit(line)
+                    except Exception as e:
+                        # Such as RecursionError from deeply nested JSON: still one answer per line.
+                        response = self._error(None, f"Malformed request: {e!r}")
+                    responses.put_nowait(response)
+            responses.put_nowait(None)
+            await writing
+        except (ConnectionError, asyncio.CancelledError):
+            # The client went away, or the server is closing.
+            writing.cancel()
+        finally:
+            self._connections.discard(connection)
+            writer.close()
+
+    @staticmethod
+    async def _skip_line(reader: asyncio.StreamReader) -> None:
+        """Drop the rest of a line too long for the stream's buffer."""
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                return
+            except asyncio.IncompleteReadError:
+                return
+            except asyncio.LimitOverrunError as e:
+                await reader.readexactly(e.consumed)
+
+    async def _write_responses(self, writer: asyncio.StreamWriter, responses: asyncio.Queue) -> None:
+        while (response := await responses.get()) is not None:
+            writer.write(json.dumps(await response).encode() + b"\n")
+            # Flush once the responses ready so far are all written.
+            if responses.empty():
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    return
+
+    def _error(self, request_id: Any, error: str) -> asyncio.Future:
+        """The (already done) future of an error response."""
+        self.requests += 1
+        future = asyncio.get_running_loop().create_future()
+        future.set_result({"id": request_id, "error": error})
+        return future
+
+    def _parse(self, message: Any) -> BattleRequest:
+        """The request in a message, checking its fields. :raises ValueError: if one is missing or invalid."""
+        if not isinstance(message, dict):
+            raise ValueError("a request is a JSON object")
+        for field in ("team1", "team2"):
+            if not isinstance(message.get(field), str):
+                raise ValueError(f"{field} should be a team spec string")
+        seed = message.get("seed", 0)
+        max_turns = message.get("max_turns", self.max_turns)
+        # (bool is an int subclass, but not a number anyone means here.)
+        if not isinstance(seed, int) or isinstance(seed, bool):
+            raise ValueError("seed should be an integer")
+        if not isinstance(max_turns, int) or isinstance(max_turns, bool) or not 1 <= max_turns <= self.max_turns:
+            raise ValueError(f"max_turns should be an integer from 1 to {self.max_turns}")
+        return request_key(message["team1"], message["team2"], seed, max_turns)
+
+    def _submit(self, line: bytes) -> asyncio.Future:
+        """Parse a request line, returning the future of its response."""
+        request_id = None
+        try:
+            message = json.loads(line)
+            if isinstance(message, dict):
+                request_id = message.get("id")
+            request = self._parse(message)
+        except ValueError as e:
+            return self._error(request_id, f"Malformed request: {e}")
+        future = asyncio.get_running_loop().create_future()
+        if self._cache_version != helpers.registry.version:
+            # Reloaded data can change any outcome.
+            self._cache.clear()
+            self._cache_version = helpers.registry.version
+        outcome = self._cache.get(request)
+        if outcome is not None:
+            self._cache.move_to_end(request)
+            self.cache_hits += 1
+            self._respond(future, request_id, outcome)
+        else:
+            self._queue.put_nowait((request, request_id, future))
+        return future
+
+    def _respond(self, future: asyncio.Future, request_id: Any, outcome: BattleOutcome) -> None:
+        self.requests += 1
+        result, turns, stalled = outcome
+        if result is None:
+            future.set_result({"id": request_id, "error": turns})
+        else:
+            future.set_result({"id": request_id, "result": result, "turns": turns, "stalled": stalled})
+
+    async def _play_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                wait = deadline - loop.time()
+                if wait <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), wait))
+                except asyncio.TimeoutError:
+                    break
+            await self._play_batch(batch)
+
+    async def _play_batch(self, batch: list[tuple[BattleRequest, Any, asyncio.Future]]) -> None:
+        unique = list(dict.fromkeys(request for request, _, _ in batch))
+        version = helpers.registry.version
+        try:
+            outcomes = dict(zip(unique, await self._run(unique)))
+        except Exception as e:
+            # Such as a worker process dying. Every request still gets an answer.
+            outcomes = dict.fromkeys(unique, (None, f"The batch failed: {e!r}", False))
+        self.batches += 1
+        self.battles += len(unique)
+        for request, request_id, future in batch:
+            self._respond(future, request_id, outcomes[request])
+        if self.cache_size > 0 and version == self._cache_version == helpers.registry.version:
+            for request in unique:
+                if outcomes[request][0] is not None:
+                    self._cache[request] = outcomes[request]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def _run(self, requests: list[BattleRequest]) -> list[BattleOutcome]:
+        if self._executor is None:
+            return run_batch(requests)
+        size = -(-len(requests) // self.processes)
+        loop = asyncio.get_running_loop()
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, run_batch, requests[i:i + size])
+            for i in range(0, len(requests), size)
+        ))
+        return [outcome for chunk in chunks for outcome in chunk]
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser(description="Serve battles as newline-delimited JSON over loopback TCP or a Unix socket.")
+    p.add_argument("--host", help="Address to listen on. Default 127.0.0.1.", default="127.0.0.1")
+    p.add_argument("-p", "--port", help="TCP port to listen on. Default 8765.", type=int, default=8765)
+    p.add_argument("-u", "--unix", help="Listen on this Unix socket instead of TCP.")
+    p.add_argument("-j", "--jobs", help="Worker processes. Default 1 (battles play on the event loop).", type=int, default=1)
+    p.add_argument("--batch-size", help="Most requests per batch. Default 256.", type=int, default=256)
+    p.add_argument("--max-delay", help="Seconds a batch waits to fill. Default 0.002.", type=float, default=0.002)
+    p.add_argument("--max-turns", help="Default turn limit of a battle. Default 100.", type=int, default=100)
+    args = p.parse_args()
+
+    server = BattleServer(args.host, args.port, args.unix, args.batch_size, args.max_delay, args.jobs, args.max_turns)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
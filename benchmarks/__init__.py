@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the battle, team, tower, stats and data structure hot paths.
+
+Run them with run_benchmarks.py from the repository root.
+"""
@@ -0,0 +1,81 @@
+"""Benchmarks for Battle.battle at several team sizes, and for snapshotting and cloning battles to look ahead on."""
+from __future__ import annotations
+
+from battle import Battle
+from helpers import get_roster_index
+from policies import LookaheadPolicy
+from random_gen import RandomGen
+from team import MonsterTeam
+
+from benchmarks.harness import benchmark
+from data_structures.referential_array import ArrayR
+
+TEAM_SIZES = (1, 3, 6)
+# Teams drawn from these seeds play out to a result at every size; some draws never finish.
+SEED1, SEED2 = 1000, 2000
+
+
+def random_classes(size: int, seed: int) -> ArrayR:
+    """A reproducible selection of spawnable monster classes."""
+    RandomGen.set_seed(seed)
+    spawnable = get_roster_index().spawnable()
+    return ArrayR.from_iterable(RandomGen.random_choice(spawnable) for _ in range(size))
+
+
+def make_battle_benchmark(size: int, log_size: int):
+    def setup():
+        classes1 = random_classes(size, SEED1)
+        classes2 = random_classes(size, SEED2)
+        battle = Battle(verbosity=0, log_size=log_size)
+
+        def run():
+            team1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=classes1)
+            team2 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=classes2)
+            return battle.battle(team1, team2)
+        return run
+    return setup
+
+
+for _size in TEAM_SIZES:
+    benchmark(f"battle.battle.size_{_size}")(make_battle_benchmark(_size, Battle.DEFAULT_LOG_SIZE))
+benchmark("battle.battle.size_6.no_log")(make_battle_benchmark(6, 0))
+
+
+def battle_in_progress() -> Battle:
+    """A battle between two full teams, just after its first monsters have come out."""
+    battle = Battle(verbosity=0, log_size=0)
+    battle.team1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=random_classes(6, SEED1))
+    battle.team2 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=random_classes(6, SEED2))
+    battle.out1 = battle.team1.retrieve_from_team()
+    battle.out2 = battle.team2.retrieve_from_team()
+    return battle
+
+
+@benchmark("battle.snapshot")
+def bench_snapshot():
+    return battle_in_progress().snapshot
+
+
+@benchmark("battle.restore")
+def bench_restore():
+    battle = battle_in_progress()
+    snapshot = battle.snapshot()
+
+    def run():
+        # Forget the team snapshots, so both teams are rebuilt every time.
+        battle.team1.retrieve_from_team()
+        battle.team2.retrieve_from_team()
+        battle.restore(snapshot)
+    return run
+
+
+@benchmark("battle.clone")
+def bench_clone():
+    return battle_in_progress().clone
+
+
+@benchmark("battle.lookahead.depth_4")
+def bench_lookahead():
+    battle = battle_in_progress()
+    policy = LookaheadPolicy(depth=4)
+    return lambda: policy.choose_action(battle, 1)
@@ -0,0 +1,102 @@
+"""Benchmarks for BSet, ArraySortedList, ArrayR and the queue/stack variants."""
+from __future__ import annotations
+
+from random_gen import RandomGen
+
+from benchmarks.harness import benchmark
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.bset import BSet
+from data_structures.queue_adt import CircularQueue, GrowableCircularQueue
+from data_structures.referential_array import ArrayR
+from data_structures.sorted_list_adt import ListItem
+from data_structures.stack_adt import ArrayStack, GrowableArrayStack
+
+N_ITEMS = 1000
+
+
+def random_items(n: int, seed: int = 7) -> list[ListItem]:
+    RandomGen.set_seed(seed)
+    return [ListItem(i, RandomGen.randint(0, 10 * n)) for i in range(n)]
+
+
+@benchmark("bset.len")
+def bench_bset_len():
+    s = BSet.from_iterable(range(1, 200, 3))
+    return s.__len__
+
+
+@benchmark("bset.iterate")
+def bench_bset_iterate():
+    s = BSet.from_iterable(range(1, 200, 3))
+    return lambda: list(s)
+
+
+@benchmark("bset.union_all")
+def bench_bset_union_all():
+    sets = [BSet.from_iterable([i, i + 7, i + 18]) for i in range(1, 50)]
+    return lambda: BSet.union_all(sets)
+
+
+@benchmark(f"sorted_list.add.{N_ITEMS}")
+def bench_sorted_list_add():
+    items = random_items(N_ITEMS)
+
+    def run():
+        sorted_list = ArraySortedList(1)
+        for item in items:
+            sorted_list.add(item)
+    return run
+
+
+@benchmark(f"sorted_list.add_many.{N_ITEMS}")
+def bench_sorted_list_add_many():
+    items = random_items(N_ITEMS)
+
+    def run():
+        ArraySortedList(1).add_many(items)
+    return run
+
+
+@benchmark(f"sorted_list.contains.{N_ITEMS}")
+def bench_sorted_list_contains():
+    items = random_items(N_ITEMS)
+    sorted_list = ArraySortedList(1)
+    sorted_list.add_many(items)
+    probe = items[N_ITEMS // 2]
+    return lambda: probe in sorted_list
+
+
+@benchmark(f"array_r.from_list_to_list.{N_ITEMS}")
+def bench_array_round_trip():
+    items = list(range(N_ITEMS))
+    return lambda: ArrayR.from_list(items).to_list()
+
+
+def make_queue_benchmark(cls, capacity):
+    def setup():
+        def run():
+            queue = cls(capacity)
+            for i in range(N_ITEMS):
+                queue.append(i)
+            for _ in range(N_ITEMS):
+                queue.serve()
+        return run
+    return setup
+
+
+def make_stack_benchmark(cls, capacity):
+    def setup():
+        def run():
+            stack = cls(capacity)
+            for i in range(N_ITEMS):
+                stack.push(i)
+            for _ in range(N_ITEMS):
+                stack.pop()
+        return run
+    return setup
+
+
+benchmark(f"queue.fixed.{N_ITEMS}")(make_queue_benchmark(CircularQueue, N_ITEMS))
+benchmark(f"queue.growable.{N_ITEMS}")(make_queue_benchmark(GrowableCircularQueue, 1))
+benchmark(f"stack.fixed.{N_ITEMS}")(make_stack_benchmark(ArrayStack, N_ITEMS))
+benchmark(f"stack.growable.{N_ITEMS}")(make_stack_benchmark(GrowableArrayStack, 1))
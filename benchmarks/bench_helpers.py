@@ -0,0 +1,45 @@
+"""Benchmarks for importing helpers and loading the roster."""
+from __future__ import annotations
+import os
+import subprocess
+import sys
+
+import helpers
+
+from benchmarks.harness import benchmark
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_import_benchmark(script: str):
+    def setup():
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        command = [sys.executable, "-c", script]
+        # Make sure the compiled roster cache exists, so this measures a warm start.
+        subprocess.run(command, env=env, check=True)
+        return lambda: subprocess.run(command, env=env, check=True)
+    return setup
+
+
+# Both include the interpreter's own start up time; compare them against python.startup.
+benchmark("helpers.import_fresh_process")(make_import_benchmark("import helpers"))
+benchmark("helpers.import_and_load_fresh_process")(make_import_benchmark("import helpers; helpers.preload()"))
+benchmark("python.startup")(make_import_benchmark("pass"))
+
+
+@benchmark("helpers.registry_reload")
+def bench_registry_reload():
+    original = helpers.registry.current()
+
+    def run():
+        helpers.registry.reload()
+        # Keep the original classes in place for anything else running in this process.
+        helpers.registry._publish(original)
+    return run
+
+
+@benchmark("helpers.parse_roster_yaml")
+def bench_parse_roster_yaml():
+    with open(helpers.ROSTER_FILE, "rb") as f:
+        raw = f.read()
+    return lambda: helpers._parse_roster_yaml(raw)
@@ -0,0 +1,26 @@
+"""Benchmarks for stat lookups and ComplexStats formula evaluation."""
+from __future__ import annotations
+
+from helpers import get_roster_index
+from stats import ComplexStats
+
+from benchmarks.harness import benchmark
+from data_structures.referential_array import ArrayR
+
+
+@benchmark("stats.evaluate_expression")
+def bench_evaluate_expression():
+    stats = ComplexStats(
+        ArrayR.from_list(["level", "3", "power", "1", "2", "3", "middle", "*"]),
+        ArrayR.from_list(["level", "5", "-", "sqrt", "1", "10", "middle"]),
+        ArrayR.from_list(["9", "2", "8", "middle"]),
+        ArrayR.from_list(["5", "6", "+"]),
+    )
+    expression = stats.attack_formula
+    return lambda: stats.evaluate_expression(expression, 7)
+
+
+@benchmark("stats.monster_get_attack.simple")
+def bench_simple_attack():
+    monster = get_roster_index().get("Infernox")(simple_mode=True)
+    return monster.get_attack
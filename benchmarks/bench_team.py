@@ -0,0 +1,47 @@
+"""Benchmarks for MonsterTeam add/retrieve/special in each team mode."""
+from __future__ import annotations
+
+from team import MonsterTeam
+
+from benchmarks.bench_battle import random_classes
+from benchmarks.harness import benchmark
+
+MODES = (
+    ("front", MonsterTeam.TeamMode.FRONT, None),
+    ("back", MonsterTeam.TeamMode.BACK, None),
+    ("optimise_hp", MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SortMode.HP),
+)
+
+
+def make_team(mode, sort_key):
+    classes = random_classes(MonsterTeam.TEAM_LIMIT, 42)
+    return MonsterTeam(mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=classes, sort_key=sort_key)
+
+
+def make_add_retrieve_benchmark(mode, sort_key):
+    def setup():
+        team = make_team(mode, sort_key)
+
+        def run():
+            # Cycle every monster out and back in: TEAM_LIMIT retrieves and adds.
+            for _ in range(MonsterTeam.TEAM_LIMIT):
+                team.add_to_team(team.retrieve_from_team())
+        return run
+    return setup
+
+
+def make_special_benchmark(mode, sort_key):
+    def setup():
+        team = make_team(mode, sort_key)
+        return team.special
+    return setup
+
+
+for _name, _mode, _sort_key in MODES:
+    benchmark(f"team.add_retrieve_cycle.{_name}")(make_add_retrieve_benchmark(_mode, _sort_key))
+    benchmark(f"team.special.{_name}")(make_special_benchmark(_mode, _sort_key))
+
+
+@benchmark("team.select_randomly")
+def bench_select_randomly():
+    return lambda: MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
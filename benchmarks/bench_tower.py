@@ -0,0 +1,32 @@
+"""Benchmarks for complete BattleTower runs."""
+from __future__ import annotations
+
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from tower import BattleTower
+
+from benchmarks.harness import benchmark
+
+
+def run_tower(n_teams: int, seed: int) -> int:
+    """Play a seeded tower to completion, returning the number of battles fought."""
+    RandomGen.set_seed(seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+    tower.generate_teams(n_teams)
+    battles = 0
+    while tower.battles_remaining():
+        tower.next_battle()
+        battles += 1
+    return battles
+
+
+@benchmark("tower.full_run.3_teams")
+def bench_tower_small():
+    return lambda: run_tower(3, 129371)
+
+
+@benchmark("tower.full_run.10_teams")
+def bench_tower_large():
+    return lambda: run_tower(10, 129371)
@@ -0,0 +1,118 @@
+"""
+Minimal benchmark harness: registration, timing and baseline comparison.
+
+A benchmark is a function that does any setup it needs and returns a
+zero-argument callable; only the callable is timed. Register it with
+the `benchmark` decorator:
+
+```
+@benchmark("stats.evaluate_expression")
+def bench_evaluate():
+    stats = ...
+    return lambda: stats.get_attack(10)
+```
+"""
+from __future__ import annotations
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from typing import Callable, Optional
+
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register the decorated setup function under the given (unique) name."""
+    def register(setup: Callable[[], Callable[[], object]]):
+        if name in BENCHMARKS:
+            raise ValueError(f"Benchmark {name} is already registered.")
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def time_benchmark(setup: Callable[[], Callable[[], object]], repeat: int = 5, min_time: float = 0.2) -> dict:
+    """
+    Time a single benchmark.
+
+    The number of calls per sample is picked (as timeit's autorange does) so that one
+    sample takes at least min_time seconds; the best and median of `repeat` samples are reported.
+    """
+    func = setup()
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    samples = [elapsed / number] + [timer.timeit(number) / number for _ in range(repeat - 1)]
+    return {
+        "per_call_s": min(samples),
+        "median_s": statistics.median(samples),
+        "calls_per_sample": number,
+        "samples": len(samples),
+    }
+
+
+def run_benchmarks(pattern: str = "", repeat: int = 5, min_time: float = 0.2, log: Optional[Callable[[str], None]] = None) -> dict:
+    """Run all registered benchmarks whose name contains pattern, returning the JSON-ready report."""
+    results = {}
+    for name in sorted(BENCHMARKS):
+        if pattern not in name:
+            continue
+        start = time.perf_counter()
+        results[name] = time_benchmark(BENCHMARKS[name], repeat, min_time)
+        if log is not None:
+            log(f"{name:<45} {format_seconds(results[name]['per_call_s']):>10}/call  ({time.perf_counter() - start:.1f}s)")
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "benchmarks": results,
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, threshold: float) -> dict:
+    """
+    Compare a report to a baseline report.
+
+    Returns {name: {"baseline_s", "current_s", "ratio", "regression"}} for every benchmark present in both,
+    where a regression is a per-call time more than `threshold` (e.g. 0.1 for 10%) slower than the baseline.
+    """
+    comparison = {}
+    for name, result in report["benchmarks"].items():
+        old = baseline.get("benchmarks", {}).get(name)
+        if old is None:
+            continue
+        ratio = result["per_call_s"] / old["per_call_s"] if old["per_call_s"] > 0 else float("inf")
+        comparison[name] = {
+            "baseline_s": old["per_call_s"],
+            "current_s": result["per_call_s"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        }
+    return comparison
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def format_bytes(size: int) -> str:
+    for unit, scale in (("MiB", 1 << 20), ("KiB", 1 << 10)):
+        if abs(size) >= scale:
+            return f"{size / scale:.2f}{unit}"
+    return f"{size}B"
+
+
+def load_report(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
@@ -0,0 +1,58 @@
+"""Memory report for a large BattleTower simulation, run with run_benchmarks.py --memory."""
+from __future__ import annotations
+import sys
+from typing import Iterator
+
+import helpers
+from battle import Battle
+from profiling import memory_report
+from random_gen import RandomGen
+from team import MonsterTeam
+from tower import BattleTower
+
+from benchmarks.harness import format_bytes
+
+
+def tower_checkpoints(n_teams: int, battles: int, seed: int) -> Iterator[tuple[str, dict]]:
+    """Build a tower with n_teams enemy teams and play up to `battles` battles, checkpointing each phase."""
+    RandomGen.set_seed(seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+    yield "set_my_team", {}
+    tower.generate_teams(n_teams)
+    yield "generate_teams", tower_containers(tower)
+    played = 0
+    while played < battles and tower.battles_remaining():
+        tower.next_battle()
+        played += 1
+    yield "battles", {"battles": played, **tower_containers(tower)}
+
+
+def tower_containers(tower: BattleTower) -> dict:
+    """Sizes of the tower's own team lists (the lists only; the teams are counted in the census)."""
+    return {
+        "enemy_teams_bytes": sys.getsizeof(tower.enemy_teams),
+        "enemy_teams_order_bytes": sys.getsizeof(tower.enemy_teams_order),
+    }
+
+
+def tower_memory_report(n_teams: int, battles: int = 5, seed: int = 129371) -> dict:
+    # Load the roster up front, so it is not counted as part of the tower.
+    helpers.preload()
+    report = memory_report(tower_checkpoints(n_teams, battles, seed))
+    report["scenario"] = {"name": "tower", "teams": n_teams, "battles": battles, "seed": seed}
+    return report
+
+
+def format_memory_report(report: dict) -> str:
+    lines = [f"peak traced memory: {format_bytes(report['peak_bytes'])}"]
+    for checkpoint in report["checkpoints"]:
+        lines.append(f"  after {checkpoint['label']:<20} {format_bytes(checkpoint['traced_bytes']):>12}")
+    for title, section in (("peak", report["peak"]), ("steady state", report["steady"])):
+        lines.append(f"{title} ({section['label']}) by subsystem:")
+        for subsystem, size in section["by_subsystem"].items():
+            lines.append(f"  {subsystem:<40} {format_bytes(size):>12}")
+    lines.append("live objects at steady state:")
+    for name, entry in report["steady"]["objects"].items():
+        lines.append(f"  {name:<20} {entry['count']:>10} {format_bytes(entry['bytes']):>12}")
+    return "\n".join(lines)
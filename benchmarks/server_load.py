@@ -0,0 +1,139 @@
+"""Load generator for battle_server.BattleServer, run with run_benchmarks.py --server."""
+from __future__ import annotations
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+import helpers
+from battle import Battle
+from battle_server import BattleServer, play_request
+from helpers import get_roster_index
+from ladder import team_spec_key
+from random_gen import RandomGen
+from team import MonsterTeam
+
+from benchmarks.harness import format_seconds
+
+
+def random_requests(n: int, seed: int = 0, teams: Optional[int] = None) -> list[dict]:
+    """
+    n request messages between random BACK teams, with ids 0 to n - 1.
+    :teams: draw both sides from a pool of this many specs, so some requests repeat.
+        Default: a new pair of teams for every request.
+    """
+    RandomGen.set_seed(seed)
+    spawnable = get_roster_index().spawnable()
+
+    def random_spec() -> str:
+        size = RandomGen.randint(1, MonsterTeam.TEAM_LIMIT)
+        return team_spec_key(MonsterTeam.TeamMode.BACK, [RandomGen.random_choice(spawnable) for _ in range(size)])
+
+    pool = [random_spec() for _ in range(teams)] if teams else None
+    requests = []
+    for i in range(n):
+        if pool:
+            team1, team2 = RandomGen.random_choice(pool), RandomGen.random_choice(pool)
+        else:
+            team1, team2 = random_spec(), random_spec()
+        requests.append({"id": i, "team1": team1, "team2": team2, "seed": RandomGen.randint(0, 2 ** 31)})
+    return requests
+
+
+async def _run_connection(address: Any, requests: list[dict], latencies: list[float]) -> list[dict]:
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    sent = {}
+    # Pipeline every request, then read the responses as they stream back.
+    for request in requests:
+        sent[request["id"]] = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    responses = []
+    for _ in requests:
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - sent[response["id"]])
+        responses.append(response)
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+async def generate_load(address: Any, requests: list[dict], connections: int = 8) -> dict:
+    """
+    Send the requests to a running server over `connections` connections (requests dealt
+    round-robin between them), timing every response.
+    :address: the server's Unix socket path, or (host, port).
+    """
+    latencies: list[float] = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        _run_connection(address, requests[i::connections], latencies) for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "requests": n,
+        "errors": sum(1 for responses in results for response in responses if "error" in response),
+        "seconds": elapsed,
+        "requests_per_s": n / elapsed,
+        "latency_p50_s": latencies[n // 2],
+        "latency_p99_s": latencies[min(n - 1, n * 99 // 100)],
+    }
+
+
+async def _load_server(server: BattleServer, requests: list[dict], connections: int) -> dict:
+    async with server:
+        stats = await generate_load(server.address, requests, connections)
+    stats["batches"] = server.batches
+    stats["battles"] = server.battles
+    stats["cache_hits"] = server.cache_hits
+    return stats
+
+
+def direct_battles(requests: list[dict], max_turns: int = 100) -> dict:
+    """The baseline: each request played with a new Battle, with no server in between."""
+    start = time.perf_counter()
+    for request in requests:
+        play_request((request["team1"], request["team2"], request["seed"], max_turns), Battle(log_size=0))
+    elapsed = time.perf_counter() - start
+    return {"requests": len(requests), "seconds": elapsed, "requests_per_s": len(requests) / elapsed}
+
+
+def server_load_report(n_requests: int, connections: int = 8, processes: int = 1, teams: Optional[int] = None, seed: int = 0) -> dict:
+    """
+    Throughput and latency of the server, batched and with batches of one request, on the
+    same requests, next to playing them directly.
+    """
+    helpers.preload()
+    requests = random_requests(n_requests, seed, teams)
+    report = {
+        "scenario": {"requests": n_requests, "connections": connections, "processes": processes, "teams": teams, "seed": seed},
+        "direct": direct_battles(requests),
+    }
+    configurations = {
+        "unbatched": BattleServer(batch_size=1, max_delay=0, processes=processes, cache_size=0),
+        "batched": BattleServer(processes=processes),
+    }
+    for name, server in configurations.items():
+        report[name] = asyncio.run(_load_server(server, requests, connections))
+    return report
+
+
+def format_server_load_report(report: dict) -> str:
+    scenario = report["scenario"]
+    lines = [
+        f"{scenario['requests']} requests over {scenario['connections']} connections, {scenario['processes']} process(es)",
+        f"  {'direct':<10} {report['direct']['requests_per_s']:>10.0f} req/s",
+    ]
+    for name in ("unbatched", "batched"):
+        stats = report[name]
+        lines.append(
+            f"  {name:<10} {stats['requests_per_s']:>10.0f} req/s"
+            f"  p50 {format_seconds(stats['latency_p50_s']):>10}  p99 {format_seconds(stats['latency_p99_s']):>10}"
+            f"  {stats['batches']} batches, {stats['battles']} battles, {stats['cache_hits']} cache hits, {stats['errors']} errors"
+        )
+    return "\n".join(lines)
@@ -1,7 +1,11 @@
 """
     Array-based implementation of SortedList ADT.
     Items to store should be of time ListItem.
+
+    Besides single inserts, supports bulk loading (add_many, merge) in a
+    single merge pass, and binary-search based membership and range queries.
 """
+from typing import Iterable
 
 from data_structures.referential_array import ArrayR
 from data_structures.sorted_list_adt import *
@@ -50,33 +54,33 @@ class ArraySortedList(SortedList[T]):
             raise IndexError('Element should be inserted in sorted order')
 
     def __contains__(self, item: ListItem):
-        """ Checks if value is in the list. """
-        for i in range(len(self)):
+        """ Checks if value is in the list.
+        :complexity: O(log n) to find the item's key, plus the number of items sharing that key.
+        """
+        return self._find(item) >= 0
+
+    def _find(self, item: ListItem) -> int:
+        """ Position of the item among the items with an equal key, or -1. """
+        for i in range(self.bisect_left(item.key), self.bisect_right(item.key)):
             if self.array[i] == item:
-                return True
-        return False
+                return i
+        return -1
 
     def _shuffle_right(self, index: int) -> None:
         """ Shuffle items to the right up to a given position. """
-        for i in range(len(self), index, -1):
-            self.array[i] = self.array[i - 1]
+        self.array.move(index, index + 1, len(self) - index)
 
     def _shuffle_left(self, index: int) -> None:
         """ Shuffle items starting at a given position to the left. """
-        for i in range(index, len(self)):
-            self.array[i] = self.array[i + 1]
-
-    def _resize(self) -> None:
-        """ Resize the list. """
-        # doubling the size of our list
-        new_array = ArrayR(2 * len(self.array))
+        self.array.move(index + 1, index, len(self) - index)
 
-        # copying the contents
-        for i in range(self.length):
-            new_array[i] = self.array[i]
-
-        # referring to the new array
-        self.array = new_array
+    def _resize(self, min_capacity: int = 0) -> None:
+        """ Resize the list, doubling its capacity until it holds at least min_capacity items. """
+        capacity = 2 * len(self.array)
+        while capacity < min_capacity:
+            capacity *= 2
+        # copying the contents in one go and referring to the new array
+        self.array = self.array.extend_into(capacity)
 
     def delete_at_index(self, index: int) -> ListItem:
         """ Delete item at a given position. """
@@ -89,8 +93,8 @@ class ArraySortedList(SortedList[T]):
 
     def index(self, item: ListItem) -> int:
         """ Find the position of a given item in the list. """
-        pos = self._index_to_add(item)
-        if pos < len(self) and self[pos] == item:
+        pos = self._find(item)
+        if pos >= 0:
             return pos
         raise ValueError('item not in list')
 
@@ -103,12 +107,82 @@ class ArraySortedList(SortedList[T]):
         if self.is_full():
             self._resize()
 
-        # find where to place it
+        # find where to place it; the position is sorted by construction,
+        # so there is no need to go through the checks in __setitem__
         position = self._index_to_add(item)
 
-        self[position] = item
+        self._shuffle_right(position)
+        self.array[position] = item
         self.length += 1
 
+    def add_many(self, items: Iterable[ListItem]) -> None:
+        """ Add a batch of new elements to the list.
+        :complexity: O(m log m + n) for m new items, rather than O(m * n) for m calls to add.
+        """
+        self._merge_sorted(sorted(items, key=lambda item: item.key))
+
+    def merge(self, other: 'ArraySortedList[T]') -> None:
+        """ Add all elements of another sorted list to this one.
+        :complexity: O(n + m), as other is already sorted.
+        """
+        self._merge_sorted(other.array.to_list()[:len(other)])
+
+    def _merge_sorted(self, new_items: list[ListItem]) -> None:
+        """ Merge already sorted items into the list in a single pass.
+            Existing items come before new items with an equal key.
+        """
+        if not new_items:
+            return
+        old_items = self.array.to_list()[:len(self)]
+        total = len(old_items) + len(new_items)
+        merged = [None] * total
+        i = j = 0
+        for k in range(total):
+            if j == len(new_items) or (i < len(old_items) and old_items[i].key <= new_items[j].key):
+                merged[k] = old_items[i]
+                i += 1
+            else:
+                merged[k] = new_items[j]
+                j += 1
+        if total > len(self.array):
+            self._resize(total)
+        self.array[:total] = merged
+        self.length = total
+
+    def bisect_left(self, key) -> int:
+        """ Position of the first item whose key is >= key (len(self) if none is).
+        :complexity: O(log n)
+        """
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self.array[mid].key < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def bisect_right(self, key) -> int:
+        """ Position just after the last item whose key is <= key.
+        :complexity: O(log n)
+        """
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if key < self.array[mid].key:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def range_query(self, low_key, high_key) -> ArrayR[ListItem]:
+        """ Returns the items with low_key <= key < high_key, in order.
+        :complexity: O(log n + k) for k items returned.
+        """
+        start = self.bisect_left(low_key)
+        end = max(start, self.bisect_left(high_key))
+        return self.array[start:end]
+
     def _index_to_add(self, item: ListItem) -> int:
         """ Find the position where the new item should be placed. """
         low = 0
@@ -3,6 +3,7 @@
 """
 
 from __future__ import annotations
+from typing import Iterable, Iterator
 from data_structures.set_adt import Set
 
 class BSet(Set[int]):
@@ -36,14 +37,22 @@ class BSet(Set[int]):
 
     def __len__(self) -> int:
         """
-        Size computation. The most expensive operation.
-        Use int.bit_length(your_integer) to calculate the bit length.
+        Size computation, as a population count of the bit vector.
+        :complexity: O(1) for sets fitting in a machine word, O(bit_length / 64) otherwise.
         """
-        res = 0
-        for item in range(1, int.bit_length(self.elems) + 1):
-            if item in self:
-                res += 1
-        return res
+        return self.elems.bit_count()
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Iterates over the elements in increasing order.
+        Jumps straight to each set bit by isolating the lowest one (x & -x).
+        :complexity: O(len(self)) steps rather than O(bit_length).
+        """
+        bit_elems = self.elems
+        while bit_elems:
+            lowest = bit_elems & -bit_elems
+            yield lowest.bit_length()
+            bit_elems ^= lowest
 
     def add(self, item: int) -> None:
         """ Adds an element to the set.
@@ -97,17 +106,51 @@ class BSet(Set[int]):
     def __or__(self, other: BSet):
         return self.union(other)
 
+    def __sub__(self, other: BSet):
+        return self.difference(other)
+
+    def __iand__(self, other: BSet) -> BSet:
+        """ In-place intersection, without allocating a new set. """
+        self.elems &= other.elems
+        return self
+
+    def __ior__(self, other: BSet) -> BSet:
+        """ In-place union, without allocating a new set. """
+        self.elems |= other.elems
+        return self
+
+    def __isub__(self, other: BSet) -> BSet:
+        """ In-place difference, without allocating a new set. """
+        self.elems &= ~other.elems
+        return self
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[int]) -> BSet:
+        """ Creates a set holding the given items.
+        :raises TypeError: if an item is not integer or if not positive.
+        """
+        bit_elems = 0
+        for item in items:
+            if not isinstance(item, int) or item <= 0:
+                raise TypeError('Set elements should be integers')
+            bit_elems |= 1 << (item - 1)
+        res = cls()
+        res.elems = bit_elems
+        return res
+
+    @classmethod
+    def union_all(cls, sets: Iterable[BSet]) -> BSet:
+        """ Creates a new set equal to the union of all of the given sets. """
+        bit_elems = 0
+        for other in sets:
+            bit_elems |= other.elems
+        res = cls()
+        res.elems = bit_elems
+        return res
+
     def __str__(self):
         """ Construct a nice string representation. """
-        bit_elems = self.elems
-        out_elems = []
-        current = 0
-        while bit_elems:
-            if bit_elems & (1 << current):
-                out_elems.append(str(current+1))
-                bit_elems &= ~(1 << current)
-            current += 1
-        return '{' + ', '.join(out_elems) + '}'
+        return '{' + ', '.join(str(item) for item in self) + '}'
 
 if __name__ == '__main__':
     s = BSet(3)
@@ -1,14 +1,16 @@
 """ Queue ADT and an array implementation.
 
 Defines a generic abstract queue with the usual methods, and implements
-a circular queue using arrays. Also defines UnitTests for the class.
+a circular queue using arrays, plus a growable variant for queues of
+unknown size. Also defines UnitTests for the class.
 """
 __author__ = "Maria Garcia de la Banda for the base"+"XXXXX student for"
 __docformat__ = 'reStructuredText'
 
+import threading
 import unittest
 from abc import ABC, abstractmethod
-from typing import Generic
+from typing import Generic, Iterable
 from data_structures.referential_array import ArrayR, T
 
 class Queue(ABC, Generic[T]):
@@ -110,6 +112,186 @@ class CircularQueue(Queue[T]):
         self.front = 0
         self.rear = 0
 
+    def append_many(self, items: Iterable[T]) -> None:
+        """ Adds all items to the rear of the queue, in order.
+        Copies at most two contiguous blocks, rather than one item at a time.
+        :pre: the queue has room for all the items
+        :raises Exception: if the items do not fit, in which case none are added
+        :complexity: O(k) for k items
+        """
+        items = list(items)
+        if len(self) + len(items) > len(self.array):
+            raise Exception("Queue is full")
+        if not items:
+            return
+        first = min(len(items), len(self.array) - self.rear)
+        self.array[self.rear:self.rear + first] = items[:first]
+        self.array[0:len(items) - first] = items[first:]
+        self.length += len(items)
+        self.rear = (self.rear + len(items)) % len(self.array)
+
+    def serve_many(self, n: int) -> ArrayR[T]:
+        """ Deletes and returns the n elements at the queue's front, in order.
+        :pre: the queue holds at least n elements
+        :raises Exception: if there are fewer than n elements, in which case none are served
+        :complexity: O(n)
+        """
+        if n > len(self):
+            raise Exception("Queue is empty")
+        first = min(n, len(self.array) - self.front)
+        items = self.array[self.front:self.front + first].to_list() + self.array[0:n - first].to_list()
+        self.length -= n
+        self.front = (self.front + n) % len(self.array)
+        return ArrayR.from_list(items)
+
+    def _items(self) -> list[T]:
+        """ The elements of the queue from front to rear. """
+        data = self.array.to_list()
+        return (data[self.front:] + data[:self.front])[:len(self)]
+
+
+class GrowableCircularQueue(CircularQueue[T]):
+    """ Circular queue that grows instead of raising when full.
+
+    Capacity doubles whenever an append would not fit, and halves once the
+    queue is down to a quarter of its capacity (never below the initial
+    capacity), so a burst of appends followed by serves does not pin memory.
+    The gap between the two thresholds prevents thrashing when the size
+    oscillates around a power of two.
+
+    Each resize copies the elements once, in order, into a new array.
+
+    :complexity: append and serve are amortised O(1). A single call is O(n)
+        in the worst case, when it triggers a resize. append_many and
+        serve_many are amortised O(k) for k items.
+    """
+
+    def __init__(self, initial_capacity: int = 1) -> None:
+        CircularQueue.__init__(self, initial_capacity)
+        self.initial_capacity = len(self.array)
+
+    def is_full(self) -> bool:
+        """ A growable queue is never full. """
+        return False
+
+    def append(self, item: T) -> None:
+        """ Adds an element to the rear of the queue, growing it if needed. """
+        if len(self) == len(self.array):
+            self._resize(2 * len(self.array))
+        CircularQueue.append(self, item)
+
+    def serve(self) -> T:
+        """ Deletes and returns the element at the queue's front, shrinking it if needed.
+        :raises Exception: if the queue is empty
+        """
+        item = CircularQueue.serve(self)
+        self._maybe_shrink()
+        return item
+
+    def append_many(self, items: Iterable[T]) -> None:
+        """ Adds all items to the rear of the queue, growing it at most once. """
+        items = list(items)
+        capacity = len(self.array)
+        while capacity < len(self) + len(items):
+            capacity *= 2
+        if capacity != len(self.array):
+            self._resize(capacity)
+        CircularQueue.append_many(self, items)
+
+    def serve_many(self, n: int) -> ArrayR[T]:
+        """ Deletes and returns the n elements at the queue's front, shrinking it if needed. """
+        items = CircularQueue.serve_many(self, n)
+        self._maybe_shrink()
+        return items
+
+    def _maybe_shrink(self) -> None:
+        if len(self) > len(self.array) // 4:
+            return
+        capacity = len(self.array)
+        while capacity > self.initial_capacity and len(self) <= capacity // 4:
+            capacity //= 2
+        if capacity != len(self.array):
+            self._resize(max(capacity, self.initial_capacity))
+
+    def _resize(self, capacity: int) -> None:
+        """ Moves the elements, front first, into a new array of the given capacity. """
+        new_array = ArrayR(capacity)
+        new_array[0:len(self)] = self._items()
+        self.array = new_array
+        self.front = 0
+        self.rear = len(self) % capacity
+
+
+class RingBuffer(CircularQueue[T]):
+    """ Bounded circular queue that overwrites its oldest element when full.
+
+    Meant for keeping the last N events of a running process: the producer
+    never blocks or waits for a reader, the storage is allocated once up front,
+    and a consumer (possibly another thread) periodically drains whatever is buffered.
+
+    CPython has no compare-and-swap, so every operation that reads or moves
+    front and rear (append, serve, serve_many, peek, drain, ...) takes a lock; the
+    critical sections are a few attribute updates long, so an uncontended
+    append costs well under a microsecond.
+
+    Attributes:
+         dropped (int): number of elements overwritten before being served
+    """
+
+    def __init__(self, max_capacity: int) -> None:
+        CircularQueue.__init__(self, max_capacity)
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def append(self, item: T) -> None:
+        """ Adds an element to the rear, overwriting the front element if full.
+        :complexity: O(1)
+        """
+        with self.lock:
+            self.array[self.rear] = item
+            self.rear = (self.rear + 1) % len(self.array)
+            if self.length == len(self.array):
+                self.front = self.rear
+                self.dropped += 1
+            else:
+                self.length += 1
+
+    def append_many(self, items: Iterable[T]) -> None:
+        """ Adds all items in order, overwriting the oldest elements as needed. """
+        for item in items:
+            self.append(item)
+
+    def serve(self) -> T:
+        with self.lock:
+            return CircularQueue.serve(self)
+
+    def serve_many(self, n: int) -> ArrayR[T]:
+        with self.lock:
+            return CircularQueue.serve_many(self, n)
+
+    def peek(self) -> T:
+        with self.lock:
+            return CircularQueue.peek(self)
+
+    def drain(self) -> ArrayR[T]:
+        """ Deletes and returns all buffered elements, oldest first.
+        :complexity: O(n)
+        """
+        with self.lock:
+            return CircularQueue.serve_many(self, len(self))
+
+    def snapshot(self) -> ArrayR[T]:
+        """ Returns all buffered elements, oldest first, without removing them.
+        :complexity: O(n)
+        """
+        with self.lock:
+            return ArrayR.from_list(self._items())
+
+    def clear(self) -> None:
+        with self.lock:
+            CircularQueue.clear(self)
+            self.dropped = 0
+
 
 class TestQueue(unittest.TestCase):
     """ Tests for the above class."""
@@ -14,6 +14,11 @@ space to hold the references.
 Note that while I do check the precondition in __init__ (noone else
 would), I do not check that of getitem or setitem, since that is already
 checked by self.array[index].
+
+Bulk operations (from_iterable, copy, fill, extend_into, slices and
+iteration) go through ctypes slice assignment and iteration on the
+underlying array, so the per-element work happens in C rather than
+through __getitem__/__setitem__.
 """
 __author__ = """
 Julian Garcia for the __init__ code, Maria Garcia de la Banda for the rest.
@@ -22,7 +27,7 @@ Modified by Jackson Goerner
 __docformat__ = "reStructuredText"
 
 from ctypes import py_object
-from typing import TypeVar, Generic
+from typing import Iterable, Iterator, TypeVar, Generic
 
 T = TypeVar("T")
 
@@ -31,12 +36,12 @@ class ArrayR(Generic[T]):
     def __init__(self, length: int) -> None:
         """Creates an array of references to objects of the given length
         :complexity: O(length) for best/worst case to initialise to None
-        :pre: length > 0
+        :pre: length >= 0
         """
         if length < 0:
             raise ValueError("Array length should be larger than or equal to 0.")
         self.array = (length * py_object)()  # initialises the space
-        self.array[:] = [None for _ in range(length)]
+        self.array[:] = [None] * length
 
     def __len__(self) -> int:
         """Returns the length of the array
@@ -44,20 +49,34 @@ class ArrayR(Generic[T]):
         """
         return len(self.array)
 
-    def __getitem__(self, index: int) -> T:
-        """Returns the object in position index.
-        :complexity: O(1)
+    def __getitem__(self, index: int | slice) -> T | ArrayR[T]:
+        """Returns the object in position index, or a new array for a slice.
+        :complexity: O(1), or O(slice length) for slices
         :pre: index in between 0 and length - self.array[] checks it
         """
+        if isinstance(index, slice):
+            return self._wrap(self.array[index])
         return self.array[index]
 
-    def __setitem__(self, index: int, value: T) -> None:
-        """Sets the object in position index to value
-        :complexity: O(1)
+    def __setitem__(self, index: int | slice, value: T | Iterable[T]) -> None:
+        """Sets the object in position index to value.
+        For a slice, value should be an iterable of exactly the slice's length.
+        :complexity: O(1), or O(slice length) for slices
         :pre: index in between 0 and length - self.array[] checks it
         """
+        if isinstance(index, slice):
+            if isinstance(value, ArrayR):
+                value = value.array[:]
+            elif not isinstance(value, (list, tuple)):
+                value = list(value)
         self.array[index] = value
 
+    def __iter__(self) -> Iterator[T]:
+        """Iterates over the items without going through __getitem__.
+        :complexity: O(1) per item
+        """
+        return iter(self.array)
+
     def index(self, item: T) -> T:
         for index, arr_item in enumerate(self.array):
             if arr_item == item:
@@ -74,15 +93,61 @@ class ArrayR(Generic[T]):
         ret_str = ret_str[:-2] + "]"
         return ret_str
 
+    def move(self, source: int, destination: int, count: int) -> None:
+        """Copies the count items starting at source to start at destination instead.
+        The two ranges may overlap, as the items are read out before any is written.
+        :complexity: O(count)
+        """
+        self.array[destination:destination + count] = self.array[source:source + count]
+
     @classmethod
-    def from_list(cls, l: list[T]) -> ArrayR[T]:
-        ret = ArrayR(len(l))
-        for x in range(len(l)):
-            ret[x] = l[x]
+    def _wrap(cls, items: list[T]) -> ArrayR[T]:
+        """Builds an array holding items, filling it with a single slice assignment."""
+        ret = cls.__new__(cls)
+        ret.array = (len(items) * py_object)()
+        ret.array[:] = items
         return ret
 
+    @classmethod
+    def from_list(cls, l: list[T]) -> ArrayR[T]:
+        """:complexity: O(len(l))"""
+        return cls.from_iterable(l)
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[T]) -> ArrayR[T]:
+        """Creates an array holding the given items, in order.
+        :complexity: O(n) where n is the number of items
+        """
+        if isinstance(items, ArrayR):
+            items = items.array[:]
+        elif not isinstance(items, (list, tuple)):
+            items = list(items)
+        return cls._wrap(items)
+
     def to_list(self) -> list[T]:
-        ret = []
-        for x in range(len(self)):
-            ret.append(self[x])
+        """:complexity: O(length)"""
+        return self.array[:]
+
+    def copy(self) -> ArrayR[T]:
+        """Returns a shallow copy of this array.
+        :complexity: O(length)
+        """
+        return self._wrap(self.array[:])
+
+    def fill(self, value: T) -> None:
+        """Sets every position of the array to value.
+        :complexity: O(length)
+        """
+        self.array[:] = [value] * len(self.array)
+
+    def extend_into(self, length: int) -> ArrayR[T]:
+        """Returns a new array of the given length, starting with the items of this array
+        and padded with None. Used when growing array-backed containers.
+        :complexity: O(length)
+        :pre: length >= len(self)
+        """
+        if length < len(self.array):
+            raise ValueError("New length should be larger than or equal to the current length.")
+        ret = ArrayR(length)
+        ret.array[:len(self.array)] = self.array[:]
         return ret
@@ -1,14 +1,15 @@
 """ Stack ADT and an array implementation.
 
 Defines a generic abstract stack with the usual methods, and implements
-a stack using arrays. Also defines UnitTests for the class.
+a stack using arrays, plus a growable variant for stacks of unknown
+size. Also defines UnitTests for the class.
 """
 __author__ = "Maria Garcia de la Banda for the base"+"XXXXX student for"
 __docformat__ = 'reStructuredText'
 
 import unittest
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Iterable
 from data_structures.referential_array import ArrayR, T
 
 class Stack(ABC, Generic[T]):
@@ -99,6 +100,91 @@ class ArrayStack(Stack[T]):
             raise Exception("Stack is empty")
         return self.array[self.length-1]
 
+    def push_many(self, items: Iterable[T]) -> None:
+        """ Pushes all items onto the stack in order, so the last item ends up on top.
+        :pre: the stack has room for all the items
+        :raises Exception: if the items do not fit, in which case none are pushed
+        :complexity: O(k) for k items, as a single block copy
+        """
+        items = list(items)
+        if len(self) + len(items) > len(self.array):
+            raise Exception("Stack is full")
+        self.array[self.length:self.length + len(items)] = items
+        self.length += len(items)
+
+    def pop_many(self, n: int) -> ArrayR[T]:
+        """ Pops n elements, returning them in the order they were popped (top first).
+        :pre: the stack holds at least n elements
+        :raises Exception: if there are fewer than n elements, in which case none are popped
+        :complexity: O(n)
+        """
+        if n > len(self):
+            raise Exception("Stack is empty")
+        items = self.array[self.length - n:self.length].to_list()
+        items.reverse()
+        self.length -= n
+        return ArrayR.from_list(items)
+
+
+class GrowableArrayStack(ArrayStack[T]):
+    """ Array stack that grows instead of raising when full.
+
+    Capacity doubles whenever a push would not fit, and halves once the
+    stack is down to a quarter of its capacity (never below the initial
+    capacity). Each resize is a single bulk copy of the elements.
+
+    :complexity: push and pop are amortised O(1), O(n) in the worst case
+        when they trigger a resize. push_many and pop_many are amortised
+        O(k) for k items.
+    """
+
+    def __init__(self, initial_capacity: int = 1) -> None:
+        ArrayStack.__init__(self, initial_capacity)
+        self.initial_capacity = len(self.array)
+
+    def is_full(self) -> bool:
+        """ A growable stack is never full. """
+        return False
+
+    def push(self, item: T) -> None:
+        """ Pushes an element to the top of the stack, growing it if needed. """
+        if len(self) == len(self.array):
+            self.array = self.array.extend_into(2 * len(self.array))
+        ArrayStack.push(self, item)
+
+    def pop(self) -> T:
+        """ Pops the element at the top of the stack, shrinking it if needed.
+        :raises Exception: if the stack is empty
+        """
+        item = ArrayStack.pop(self)
+        self._maybe_shrink()
+        return item
+
+    def push_many(self, items: Iterable[T]) -> None:
+        """ Pushes all items onto the stack, growing it at most once. """
+        items = list(items)
+        capacity = len(self.array)
+        while capacity < len(self) + len(items):
+            capacity *= 2
+        if capacity != len(self.array):
+            self.array = self.array.extend_into(capacity)
+        ArrayStack.push_many(self, items)
+
+    def pop_many(self, n: int) -> ArrayR[T]:
+        """ Pops n elements, top first, shrinking the stack if needed. """
+        items = ArrayStack.pop_many(self, n)
+        self._maybe_shrink()
+        return items
+
+    def _maybe_shrink(self) -> None:
+        if len(self) > len(self.array) // 4:
+            return
+        capacity = len(self.array)
+        while capacity > self.initial_capacity and len(self) <= capacity // 4:
+            capacity //= 2
+        if capacity != len(self.array):
+            self.array = self.array[0:max(capacity, self.initial_capacity)]
+
 class TestStack(unittest.TestCase):
     """ Tests for the above class."""
     EMPTY = 0
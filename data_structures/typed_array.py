@@ -0,0 +1,152 @@
+""" Fixed-size array of primitive values, the typed sibling of ArrayR.
+
+ArrayR stores references, so every int or float stored in it is a boxed
+Python object. ArrayT stores the raw values in an array.array instead,
+using the usual struct typecodes ('i' for C ints, 'd' for doubles, ...),
+so each element costs its itemsize (4 or 8 bytes) and the whole array can
+be handed to vectorised code without copying through view() or
+to_numpy(). ArrayT does not implement the buffer protocol itself (a class
+can only do so from Python 3.12), so pass arr.view() rather than arr to
+memoryview() or numpy.asarray().
+
+Like ArrayR, the length is fixed at creation and is not growable.
+"""
+from __future__ import annotations
+
+__docformat__ = "reStructuredText"
+
+from array import array
+from typing import Iterable, Iterator, Union
+
+Number = Union[int, float]
+
+
+class ArrayT:
+    def __init__(self, typecode: str, length: int) -> None:
+        """Creates an array of the given primitive type and length, initialised to 0.
+        :complexity: O(length)
+        :raises ValueError: if length is negative or the typecode is invalid
+        """
+        if length < 0:
+            raise ValueError("Array length should be larger than or equal to 0.")
+        self.array = array(typecode)
+        self.array.frombytes(bytes(self.array.itemsize * length))
+
+    @property
+    def typecode(self) -> str:
+        return self.array.typecode
+
+    @property
+    def itemsize(self) -> int:
+        """Size in bytes of a single element."""
+        return self.array.itemsize
+
+    def __len__(self) -> int:
+        """Returns the length of the array
+        :complexity: O(1)
+        """
+        return len(self.array)
+
+    def __getitem__(self, index: int | slice) -> Number | ArrayT:
+        """Returns the value in position index, or a new array for a slice.
+        :complexity: O(1), or O(slice length) for slices
+        """
+        if isinstance(index, slice):
+            return self._wrap(self.array[index])
+        return self.array[index]
+
+    def __setitem__(self, index: int | slice, value: Number | Iterable[Number]) -> None:
+        """Sets the value in position index.
+        For a slice, value should be an iterable of exactly the slice's length.
+        :complexity: O(1), or O(slice length) for slices
+        :raises TypeError: if the value does not fit the typecode
+        """
+        if isinstance(index, slice):
+            items = self._as_array(value)
+            if len(items) != len(range(*index.indices(len(self.array)))):
+                raise ValueError("Can only assign a sequence of the same size to a slice.")
+            self.array[index] = items
+        else:
+            self.array[index] = value
+
+    def __iter__(self) -> Iterator[Number]:
+        return iter(self.array)
+
+    def index(self, item: Number) -> int:
+        try:
+            return self.array.index(item)
+        except ValueError:
+            raise ValueError("Value does not exist") from None
+
+    def __str__(self) -> str:
+        return "[" + ", ".join(str(item) for item in self.array) + "]"
+
+    def _as_array(self, items: Iterable[Number]) -> array:
+        """Converts items to an array.array of this array's typecode, copying only when needed."""
+        if isinstance(items, ArrayT):
+            items = items.array
+        if isinstance(items, array) and items.typecode == self.array.typecode:
+            return items
+        return array(self.array.typecode, items)
+
+    @classmethod
+    def _wrap(cls, items: array) -> ArrayT:
+        """Builds an array around items, without copying them."""
+        ret = cls.__new__(cls)
+        ret.array = items
+        return ret
+
+    @classmethod
+    def from_list(cls, typecode: str, l: list[Number]) -> ArrayT:
+        """:complexity: O(len(l))"""
+        return cls.from_iterable(typecode, l)
+
+    @classmethod
+    def from_iterable(cls, typecode: str, items: Iterable[Number]) -> ArrayT:
+        """Creates a typed array holding the given values, in order.
+        :complexity: O(n) where n is the number of items
+        """
+        ret = cls.__new__(cls)
+        ret.array = array(typecode, items.array if isinstance(items, ArrayT) else items)
+        return ret
+
+    def to_list(self) -> list[Number]:
+        return self.array.tolist()
+
+    def copy(self) -> ArrayT:
+        """:complexity: O(length), a single memory copy"""
+        return self._wrap(array(self.array.typecode, self.array))
+
+    def fill(self, value: Number) -> None:
+        """Sets every position of the array to value.
+        :complexity: O(length)
+        """
+        self.array[:] = array(self.array.typecode, [value]) * len(self.array)
+
+    def extend_into(self, length: int) -> ArrayT:
+        """Returns a new array of the given length, starting with the values of this array
+        and padded with 0.
+        :complexity: O(length)
+        :pre: length >= len(self)
+        """
+        if length < len(self.array):
+            raise ValueError("New length should be larger than or equal to the current length.")
+        ret = self.copy()
+        ret.array.frombytes(bytes(self.array.itemsize * (length - len(self.array))))
+        return ret
+
+    def view(self) -> memoryview:
+        """Returns a zero-copy, writable memoryview over the values."""
+        return memoryview(self.array)
+
+    def to_numpy(self):
+        """Returns a zero-copy NumPy view over the values. Requires numpy to be installed.
+        :raises ValueError: for the 'u' (unicode character) typecode, which NumPy has no dtype for
+        """
+        if self.array.typecode == "u":
+            raise ValueError("Arrays of typecode 'u' have no NumPy equivalent.")
+        import numpy
+        dtype = numpy.dtype(self.array.typecode)
+        if dtype.itemsize != self.array.itemsize:
+            raise ValueError(f"NumPy's dtype {dtype} does not match typecode {self.array.typecode!r}.")
+        return numpy.frombuffer(self.array, dtype=dtype)
@@ -4,6 +4,7 @@ from __future__ import print_function
 import sys
 import json
 import inspect
+import time
 
 from unittest import result
 from unittest.signals import registerResult
@@ -35,6 +36,10 @@ class JSONTestResult(result.TestResult):
         else:
             return str(test)
 
+    def startTest(self, test):
+        super(JSONTestResult, self).startTest(test)
+        self._started = time.perf_counter()
+
     def getOutput(self):
         if self.buffer:
             out = self._stdout_buffer.getvalue()
@@ -45,7 +50,7 @@ class JSONTestResult(result.TestResult):
                 out += err
             return out
 
-    def buildResult(self, test, err=None):
+    def buildResult(self, test, err=None, skipped=None):
         output = self.getOutput() or ""
         result = {
             "name": self.getDescription(test),
@@ -55,10 +60,15 @@ class JSONTestResult(result.TestResult):
             method = getattr(test, test._testMethodName)
             val = getattr(method, dec.get_attr_name(), None)
             dec.change_result(val, result, output, err)
+        if skipped is not None:
+            result["skipped"] = skipped
+        started = getattr(self, "_started", None)
+        if started is not None:
+            result["duration"] = time.perf_counter() - started
         return result
 
-    def processResult(self, test, err=None):
-        self.results.append(self.buildResult(test, err))
+    def processResult(self, test, err=None, skipped=None):
+        self.results.append(self.buildResult(test, err, skipped))
 
     def addSuccess(self, test):
         super(JSONTestResult, self).addSuccess(test)
@@ -75,6 +85,10 @@ class JSONTestResult(result.TestResult):
         self._mirrorOutput = False
         self.processResult(test, err)
 
+    def addSkip(self, test, reason):
+        super(JSONTestResult, self).addSkip(test, reason)
+        self.processResult(test, skipped=reason)
+
 
 class JSONTestRunner(object):
     """A test runner class that displays results in JSON form.
@@ -0,0 +1,180 @@
+"""Running test modules in parallel worker processes"""
+import multiprocessing
+import os
+import sys
+import time
+import unittest
+from collections import deque
+from multiprocessing.connection import wait
+
+import ed_utils.timeout as timeout_module
+from ed_utils.json_test_runner import JSONTestResult
+
+
+class ReportingTestResult(JSONTestResult):
+    """Sends each test's start and JSON result back to the parent process as it happens."""
+
+    def __init__(self, conn):
+        super(ReportingTestResult, self).__init__(None, True, 1, [])
+        self.conn = conn
+
+    def startTest(self, test):
+        super(ReportingTestResult, self).startTest(test)
+        self.conn.send(("start", test.id()))
+
+    def processResult(self, test, err=None, skipped=None):
+        self.conn.send(("result", test.id(), self.buildResult(test, err, skipped)))
+
+
+def run_worker(test_ids, sys_path, conn):
+    """Entry point of a worker process: run the given tests, in order, reporting over conn."""
+    sys.path[:] = sys_path
+    # The parent enforces timeouts by killing this process, which (unlike a thread) actually stops the test.
+    timeout_module.PROCESS_TIMEOUTS = True
+    suite = unittest.defaultTestLoader.loadTestsFromNames(test_ids)
+    result = ReportingTestResult(conn)
+    result.buffer = True
+    result.startTestRun()
+    try:
+        suite(result)
+    finally:
+        result.stopTestRun()
+    conn.send(("done",))
+    conn.close()
+
+
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+class Worker(object):
+
+    def __init__(self, context, test_ids):
+        self.remaining = deque(test_ids)
+        self.conn, child_conn = context.Pipe(duplex=False)
+        # Not daemonic, so tests can start worker processes of their own. stop() kills it.
+        self.process = context.Process(target=run_worker, args=(list(test_ids), list(sys.path), child_conn))
+        self.process.start()
+        child_conn.close()
+        self.current = None
+        self.started = None
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ParallelTestRunner(object):
+    """
+    Runs each test module in its own worker process, up to `jobs` at a time, and collects
+    the same JSON results as JSONTestRunner (each with its wall time in "duration").
+
+    A test that runs past its @timeout (or default_timeout, if it has none) has its worker
+    killed; it is reported as timed out and the rest of its module continues in a new worker.
+    """
+
+    def __init__(self, jobs=None, default_timeout=60, grace=0.5, stdout_visibility=None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.default_timeout = default_timeout
+        self.grace = grace
+        self.json_data = {
+            "testcases": [],
+        }
+        if stdout_visibility:
+            self.json_data["stdout_visibility"] = stdout_visibility
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+    def time_limit(self, test):
+        method = getattr(test, test._testMethodName, None)
+        limit = getattr(method, timeout_module.TIMEOUT_ATTR, None)
+        return (limit if limit is not None else self.default_timeout) + self.grace
+
+    def run(self, suite):
+        "Run the given test suite, returning the JSON data."
+        tests = {}
+        modules = {}
+        local = unittest.TestSuite()
+        for test in iter_tests(suite):
+            if isinstance(test, unittest.loader._FailedTest):
+                # Modules that failed to import can't be loaded by a worker either.
+                local.addTest(test)
+                continue
+            tests[test.id()] = test
+            modules.setdefault(type(test).__module__, []).append(test.id())
+
+        results = {}
+        local_result = JSONTestResult(None, True, 1, [])
+        local(local_result)
+
+        pending = deque(modules.values())
+        running = {}
+        try:
+            self._run_workers(tests, results, pending, running)
+        finally:
+            # Workers are not daemonic, so don't leave any behind if the run is interrupted.
+            for worker in running.values():
+                worker.stop()
+
+        self.json_data["testcases"].extend(local_result.results)
+        self.json_data["testcases"].extend(results[test_id] for test_id in tests if test_id in results)
+        return self.json_data
+
+    def _run_workers(self, tests, results, pending, running):
+        while pending or running:
+            while pending and len(running) < self.jobs:
+                worker = Worker(self.context, pending.popleft())
+                running[worker.conn] = worker
+
+            now = time.perf_counter()
+            deadlines = [w.started + self.time_limit(tests[w.current]) for w in running.values() if w.current is not None]
+            wait_for = max(0, min(deadlines) - now) if deadlines else None
+            for conn in wait(list(running), wait_for):
+                worker = running[conn]
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    message = ("exited",)
+                if message[0] == "start":
+                    worker.current = message[1]
+                    worker.started = time.perf_counter()
+                elif message[0] == "result":
+                    results[message[1]] = message[2]
+                    worker.remaining.remove(message[1])
+                    worker.current = None
+                elif message[0] == "done":
+                    del running[conn]
+                    worker.stop()
+                else:
+                    del running[conn]
+                    worker.stop()
+                    self._abandon(worker, tests, results, pending, "Worker exited with code {}".format(worker.process.exitcode))
+
+            now = time.perf_counter()
+            for conn, worker in list(running.items()):
+                if worker.current is not None and now - worker.started > self.time_limit(tests[worker.current]):
+                    del running[conn]
+                    worker.stop()
+                    self._abandon(worker, tests, results, pending, "Timed out after {:.1f} seconds".format(now - worker.started))
+
+    def _abandon(self, worker, tests, results, pending, reason):
+        """Report the worker's current test as failed, and queue the tests after it for a new worker."""
+        if worker.current is None:
+            # The worker died outside of any test, e.g. while importing; don't retry its tests.
+            failed = list(worker.remaining)
+            worker.remaining.clear()
+        else:
+            failed = [worker.current]
+            worker.remaining.remove(worker.current)
+        builder = JSONTestResult(None, True, 1, [])
+        for test_id in failed:
+            error = TimeoutError(reason) if reason.startswith("Timed out") else RuntimeError(reason)
+            results[test_id] = builder.buildResult(tests[test_id], (type(error), error, None))
+            results[test_id]["duration"] = time.perf_counter() - worker.started if worker.started else 0.0
+        if worker.remaining:
+            pending.appendleft(list(worker.remaining))
@@ -2,6 +2,11 @@ from functools import wraps
 from threading import Thread
 from queue import Queue
 
+# Attribute holding a test's time limit, for runners that enforce it themselves.
+TIMEOUT_ATTR = "__timeout__"
+# Set in the worker processes of a ParallelTestRunner, which kill tests that run too long.
+PROCESS_TIMEOUTS = False
+
 def do_stuff(q1, a, k, method):
     try:
         q1.put(method(*a, **k))
@@ -12,6 +17,8 @@ def timeout(sec=3):
     def timeout_dec(func):
         @wraps(func)
         def test(*args, **kwargs):
+            if PROCESS_TIMEOUTS:
+                return func(*args, **kwargs)
             q = Queue()
             p = Thread(target=do_stuff, args=[q, args, kwargs, func], kwargs={}, daemon=True)
             p.start()
@@ -25,5 +32,6 @@ def timeout(sec=3):
                 if isinstance(x, Exception):
                     raise x
                 return x
+        setattr(test, TIMEOUT_ATTR, sec)
         return test
     return timeout_dec
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import os
 from enum import auto
 from typing import Optional
 
 from base_enum import BaseEnum
 
 from data_structures.referential_array import ArrayR
+from data_structures.typed_array import ArrayT
+
+# Resolved relative to this file so imports work from any working directory.
+# Set MONSTER_BATTLES_EFFECTIVENESS (or assign this before first use) to load a different table.
+EFFECTIVENESS_FILE = os.environ.get(
+    "MONSTER_BATTLES_EFFECTIVENESS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "type_effectiveness.csv"),
+)
 
 class Element(BaseEnum):
     """
@@ -41,16 +50,16 @@ class Element(BaseEnum):
 
     @classmethod
     def from_string(cls, string: str) -> Element:
-        for elem in Element:
-            if elem.name.lower() == string.lower():
-                return elem
-        raise ValueError(f"Unexpected string {string}")
+        try:
+            return cls.__members__[string.upper()]
+        except KeyError:
+            raise ValueError(f"Unexpected string {string}") from None
 
 class EffectivenessCalculator:
     """
     Helper class for calculating the element effectiveness for two elements.
 
-    This class follows the singleton pattern.
+    This class follows the singleton pattern. The singleton is loaded on first use.
 
     Usage:
         EffectivenessCalculator.get_effectiveness(elem1, elem2)
@@ -58,7 +67,7 @@ class EffectivenessCalculator:
 
     instance: Optional[EffectivenessCalculator] = None
 
-    def __init__(self, element_names: ArrayR[str], effectiveness_values: ArrayR[float]) -> None:
+    def __init__(self, element_names: ArrayR[str], effectiveness_values: ArrayR[float] | ArrayT) -> None:
         """
         Initialise the Effectiveness Calculator.
 
@@ -90,7 +99,13 @@ class EffectivenessCalculator:
 
         Example: EffectivenessCalculator.get_effectiveness(Element.FIRE, Element.WATER) == 0.5
         """
-        return cls.instance.effectiveness_map[(type1.name.upper(), type2.name.upper())]
+        if cls.instance is None:
+            cls.make_singleton()
+        return cls.instance.lookup(type1, type2)
+
+    def lookup(self, type1: Element, type2: Element) -> float:
+        """Returns the effectiveness of elem1 attacking elem2 in this table, rather than the singleton."""
+        return self.effectiveness_map[(type1.name.upper(), type2.name.upper())]
 
     @classmethod
     def from_csv(cls, csv_file: str) -> EffectivenessCalculator:
@@ -100,19 +115,14 @@ class EffectivenessCalculator:
             header, rest = file.read().strip().split("\n", maxsplit=1)
             header = header.split(",")
             rest = rest.replace("\n", ",").split(",")
-            a_header = ArrayR(len(header))
-            a_all = ArrayR(len(rest))
-            for i in range(len(header)):
-                a_header[i] = header[i]
-            for i in range(len(rest)):
-                a_all[i] = float(rest[i])
+            a_header = ArrayR.from_list(header)
+            # Unboxed doubles: 8 bytes per value instead of a float object each.
+            a_all = ArrayT.from_iterable("d", map(float, rest))
             return EffectivenessCalculator(a_header, a_all)
 
     @classmethod
-    def make_singleton(cls):
-        cls.instance = EffectivenessCalculator.from_csv("type_effectiveness.csv")
-
-EffectivenessCalculator.make_singleton()
+    def make_singleton(cls, csv_file: Optional[str] = None):
+        cls.instance = EffectivenessCalculator.from_csv(csv_file or EFFECTIVENESS_FILE)
 
 
 if __name__ == "__main__":
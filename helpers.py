@@ -1,14 +1,29 @@
 from __future__ import annotations
-import yaml
-from typing import TYPE_CHECKING
+import hashlib
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
 
 from data_structures.referential_array import ArrayR
 
 if TYPE_CHECKING:
+    from elements import EffectivenessCalculator
     from monster_base import MonsterBase
+    from roster import RosterIndex
 
 
-_monsters: ArrayR[MonsterBase] = None
+# Resolved relative to this file so imports work from any working directory.
+# Set MONSTER_BATTLES_ROSTER (or assign this before first use) to load a different roster.
+ROSTER_FILE = os.environ.get(
+    "MONSTER_BATTLES_ROSTER",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "monsters.yaml"),
+)
+
+# Bump whenever the layout of the cached roster records changes.
+ROSTER_CACHE_VERSION = 1
 
 
 def MonsterBaseFactory(name, description, evolution, element, simple_stats, complex_stats, can_be_spawned) -> type[MonsterBase]:
@@ -24,48 +39,269 @@ def MonsterBaseFactory(name, description, evolution, element, simple_stats, comp
         "can_be_spawned": classmethod(lambda s: can_be_spawned),
     })
 
+class DataSnapshot:
+    """
+    One immutable version of the game data: the roster, its index and the effectiveness table.
+
+    Anything holding a snapshot (e.g. an in-flight battle, or monster instances whose classes
+    came from it) keeps seeing the same data even if the registry is reloaded: a Battle keeps
+    the snapshot current when it started in Battle.game_data, and a BattleSession the one current
+    when it started playing.
+    Data derived from a snapshot should be memoised with `cached`, so that it is
+    discarded together with the snapshot rather than compared against version numbers.
+    """
+
+    def __init__(self, version: int, monsters: ArrayR[type[MonsterBase]], index: RosterIndex, effectiveness: EffectivenessCalculator) -> None:
+        self.version = version
+        self.monsters = monsters
+        self.index = index
+        self.effectiveness = effectiveness
+        self._derived: dict[str, Any] = {}
+        self._derived_lock = threading.Lock()
+
+    def cached(self, key: str, build: Callable[[DataSnapshot], Any]) -> Any:
+        """Returns build(self), computed at most once per snapshot for each key."""
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = build(self)
+            return self._derived[key]
+
+
+class DataRegistry:
+    """
+    Versioned holder for the current DataSnapshot.
+
+    The first snapshot is loaded lazily. `reload` builds a complete new snapshot off to the side
+    and then swaps it in with a single assignment, so readers never see a half-loaded roster.
+
+    Usage:
+    ```
+    snapshot = registry.current()      # Load if needed and return the current data
+    registry.reload()                  # Re-read monsters.yaml and type_effectiveness.csv
+    registry.version                   # Incremented on each reload
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._current: Optional[DataSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """The version of the current snapshot, or 0 if nothing has been loaded yet."""
+        return 0 if self._current is None else self._current.version
+
+    def is_loaded(self) -> bool:
+        return self._current is not None
+
+    def current(self) -> DataSnapshot:
+        snapshot = self._current
+        if snapshot is None:
+            with self._lock:
+                if self._current is None:
+                    self._publish(self._load(1, ROSTER_FILE, None))
+                snapshot = self._current
+        return snapshot
+
+    def reload(self, roster_file: Optional[str] = None, effectiveness_file: Optional[str] = None) -> DataSnapshot:
+        """
+        Load a new snapshot and make it current. Previously handed out snapshots are unaffected.
+        If loading fails, the current snapshot stays in place and the error is raised.
+        """
+        from elements import EFFECTIVENESS_FILE
+        with self._lock:
+            snapshot = self._load(
+                self.version + 1,
+                roster_file or ROSTER_FILE,
+                effectiveness_file or EFFECTIVENESS_FILE,
+            )
+            self._publish(snapshot)
+        return snapshot
+
+    @staticmethod
+    def _load(version: int, roster_file: str, effectiveness_file: Optional[str]) -> DataSnapshot:
+        from elements import EffectivenessCalculator
+        from roster import RosterIndex
+        monsters = _make_monster_classes(_load_roster_records(roster_file))
+        if effectiveness_file is None:
+            # Reuse the singleton if it has already been loaded on its own.
+            if EffectivenessCalculator.instance is None:
+                EffectivenessCalculator.make_singleton()
+            effectiveness = EffectivenessCalculator.instance
+        else:
+            effectiveness = EffectivenessCalculator.from_csv(effectiveness_file)
+        return DataSnapshot(version, monsters, RosterIndex(monsters), effectiveness)
+
+    def _publish(self, snapshot: DataSnapshot) -> None:
+        """
+        Make the snapshot current, also updating the module-level monster classes (helpers.Flamikin, ...)
+        and EffectivenessCalculator's singleton for code that names them directly.
+        """
+        from elements import EffectivenessCalculator
+        for monster in snapshot.monsters:
+            globals()[monster.get_name()] = monster
+        EffectivenessCalculator.instance = snapshot.effectiveness
+        self._current = snapshot
+
+
+registry = DataRegistry()
+
 def get_all_monsters():
-    if _monsters is None:
-        _make_all_monster_classes()
-    return _monsters
+    return registry.current().monsters
 
-def _make_all_monster_classes():
-    from stats import SimpleStats, ComplexStats
-    global _monsters
-    with open("monsters.yaml", "r") as f:
-        monsters_yaml = yaml.safe_load(f)
-    _monsters = ArrayR(len(monsters_yaml))
-    idx = 0
-    for monster in monsters_yaml:
+def get_roster_index() -> RosterIndex:
+    return registry.current().index
+
+def _roster_cache_path(roster_file: str) -> str:
+    """The compiled roster lives next to the YAML, in the usual bytecode cache directory."""
+    directory, name = os.path.split(os.path.abspath(roster_file))
+    return os.path.join(directory, "__pycache__", f"{name}.roster.pickle")
+
+def _parse_roster_yaml(raw: bytes) -> list[tuple]:
+    """
+    Parse the YAML roster into flat records.
+
+    Each record is (name, description, evolution, element, simple, complex, can_be_spawned),
+    where simple is a tuple of the 4 simple stats and complex is a tuple of 4 tokenised formulas.
+    Uses the libyaml C loader when PyYAML was built with it.
+    """
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    records = []
+    for monster in yaml.load(raw, Loader=loader):
         simple = monster["simple"]
         complex = monster["complex"]
-        new_class = MonsterBaseFactory(
+        records.append((
             monster["name"],
             monster["description"],
             monster.get("evolution", None),
             monster["element"],
-            SimpleStats(simple["attack"], simple["defense"], simple["speed"], simple["max_hp"]),
-            ComplexStats(
-                ArrayR.from_list(str(complex["attack"]).split()),
-                ArrayR.from_list(str(complex["defense"]).split()),
-                ArrayR.from_list(str(complex["speed"]).split()),
-                ArrayR.from_list(str(complex["max_hp"]).split()),
+            (simple["attack"], simple["defense"], simple["speed"], simple["max_hp"]),
+            tuple(
+                tuple(str(complex[stat]).split())
+                for stat in ("attack", "defense", "speed", "max_hp")
             ),
-            monster.get("can_be_spawned", False)
+            monster.get("can_be_spawned", False),
+        ))
+    return records
+
+def _load_roster_records(roster_file: str) -> list[tuple]:
+    """
+    Returns the parsed roster records, going through the compiled roster cache.
+
+    The cache is keyed by the YAML's mtime and size, falling back to its sha256 hash
+    if those changed (e.g. a fresh checkout). Failure to write the cache is not an error.
+    """
+    cache_file = _roster_cache_path(roster_file)
+    stat = os.stat(roster_file)
+    # (mtime_ns, size, sha256, records) from the cache, or None on a miss.
+    cached = None
+    try:
+        with open(cache_file, "rb") as f:
+            state = pickle.load(f)
+        if state["version"] == ROSTER_CACHE_VERSION:
+            cached = (state["mtime_ns"], state["size"], state["sha256"], state["records"])
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, ValueError, AttributeError):
+        cached = None
+
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[3]
+
+    with open(roster_file, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached is not None and cached[2] == digest:
+        records = cached[3]
+    else:
+        records = _parse_roster_yaml(raw)
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump({
+                "version": ROSTER_CACHE_VERSION,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "records": records,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return records
+
+def _make_monster_classes(records: list[tuple]) -> ArrayR[type[MonsterBase]]:
+    from stats import SimpleStats, ComplexStats
+    monsters = ArrayR(len(records))
+    classes = {}
+    for idx, (name, description, evolution, element, simple, complex, can_be_spawned) in enumerate(records):
+        new_class = MonsterBaseFactory(
+            name,
+            description,
+            evolution,
+            element,
+            SimpleStats(*simple),
+            ComplexStats(*(ArrayR.from_list(list(formula)) for formula in complex)),
+            can_be_spawned,
         )
-        globals()[monster["name"]] = new_class
-        _monsters[idx] = new_class
-        idx += 1
+        classes[name] = new_class
+        monsters[idx] = new_class
     # Now assign evolution
-    for monster in monsters_yaml:
-        evolution = monster.get("evolution", None)
+    for name, _, evolution, *_ in records:
         if evolution is None:
             continue
-        evolution_class = globals()[evolution]
-        globals()[monster["name"]].evolution_class = evolution_class
-        globals()[monster["name"]].get_evolution = classmethod(lambda s: s.evolution_class)
+        classes[name].evolution_class = classes[evolution]
+        classes[name].get_evolution = classmethod(lambda s: s.evolution_class)
+    return monsters
+
+def preload() -> None:
+    """
+    Eagerly load the roster and the effectiveness table.
+
+    Everything is otherwise loaded on first use. Call this in a parent process
+    before forking workers so they all share the already loaded state.
+    """
+    registry.current()
+
+def can_fork() -> bool:
+    """Whether worker processes can be forked here, inheriting this process's state."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+def fork_pool(processes: Optional[int] = None, initializer: Optional[Callable] = None, initargs: Iterable = ()) -> multiprocessing.pool.Pool:
+    """
+    A multiprocessing Pool of workers forked from this process, which inherit its state
+    (such as an object set by the initializer) rather than having it pickled over.
+    The roster is loaded first, so the workers share it rather than each loading it.
+    Use it as a context manager, so its workers are shut down afterwards.
+    :raises ValueError: where processes cannot be forked (see can_fork).
+    """
+    if not can_fork():
+        raise ValueError("Worker processes cannot be forked on this platform.")
+    preload()
+    return multiprocessing.get_context("fork").Pool(processes, initializer, tuple(initargs))
+
+def worker_executor(processes: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    A ProcessPoolExecutor for work that only needs its arguments, forked as fork_pool is
+    where possible (sharing the loaded roster), and spawned otherwise.
+    """
+    preload()
+    return ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork" if can_fork() else "spawn"))
 
-get_all_monsters()
+def __getattr__(name: str):
+    """Lazily load the roster the first time a monster class is imported from this module."""
+    if name.startswith("_") or registry.is_loaded():
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    registry.current()
+    try:
+        return globals()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
 
 if TYPE_CHECKING:
     # Makes no sense but fixes the red squigglies
@@ -0,0 +1,327 @@
+from __future__ import annotations
+import json
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional, TYPE_CHECKING
+
+import helpers
+from battle import Battle
+from helpers import get_roster_index
+from random_gen import RandomGen
+from team import MonsterTeam
+
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.referential_array import ArrayR
+from data_structures.sorted_list_adt import ListItem
+from data_structures.typed_array import ArrayT
+
+if TYPE_CHECKING:
+    from helpers import DataSnapshot
+    from monster_base import MonsterBase
+    from roster import RosterIndex
+
+LADDER_STATE_VERSION = 1
+
+
+def team_spec_key(team_mode: MonsterTeam.TeamMode, classes: Iterable[type[MonsterBase]]) -> str:
+    """The ladder's key for a team: its mode and monster classes in order, e.g. 'BACK:Flamikin,Gustwing'."""
+    return f"{team_mode.name}:" + ",".join(cls.get_name() for cls in classes)
+
+
+def parse_team_spec_key(key: str, index: Optional[RosterIndex] = None) -> tuple[MonsterTeam.TeamMode, ArrayR[type[MonsterBase]]]:
+    """The team mode and monster classes of a key, with the classes from `index` (default: the current roster)."""
+    mode, names = key.split(":")
+    index = index or get_roster_index()
+    return MonsterTeam.TeamMode[mode], ArrayR.from_iterable(index.get(name) for name in names.split(","))
+
+
+# The ladder whose matches a worker process plays, inherited when the pool forks.
+_worker_ladder: Optional[Ladder] = None
+
+
+def _init_worker(ladder: Ladder) -> None:
+    global _worker_ladder
+    _worker_ladder = ladder
+
+
+def _play_in_worker(pair: tuple[int, int]) -> Battle.Result:
+    return _worker_ladder.play_match(*pair)
+
+
+class Ladder:
+    """
+    Elo ladder over a population of team specs (a TeamMode plus monster classes in order).
+
+    Memory is O(number of teams), however many matches are played: ratings and records are
+    kept in typed arrays indexed by team id, and only a bounded LRU cache of match results
+    is kept (a battle between two given specs always plays out the same way). The parsed specs
+    and that cache are dropped when the game data is reloaded (see helpers.DataSnapshot).
+
+    Matches are played in batches. At the start of each batch the teams are sorted by rating
+    into an ArraySortedList, and each scheduled team is matched with a random one of the
+    2 * window teams nearest to it in that order (`window` either side, away from the ends). The batch's battles are then played (in parallel,
+    if processes > 1) and ratings updated match by match, in scheduling order.
+
+    Teams with fewer than PROVISIONAL_GAMES games use a larger K, so new teams find their level quickly.
+
+    Usage:
+    ```
+    ladder = Ladder(seed=1)
+    ladder.add_random_teams(10_000)
+    ladder.run(1_000_000, batch_size=10_000)
+    ladder.top(10)                               # [(key, rating), ...]
+    ladder.save("ladder.json")
+    ladder = Ladder.load("ladder.json")          # carries on where it left off
+    ```
+    """
+
+    INITIAL_RATING = 1500.0
+    PROVISIONAL_GAMES = 30
+    K_PROVISIONAL = 40.0
+    K = 20.0
+
+    def __init__(self, seed: int = 0, window: int = 8, processes: int = 1, max_turns: int = 100, cache_size: int = 100_000) -> None:
+        """
+        :max_turns: battles still going after this many turns are draws. Finished battles between
+            full teams take a few dozen turns at most, while stalled ones would otherwise never end.
+        """
+        if window < 1:
+            raise ValueError("window should be at least 1.")
+        self.seed = seed
+        self.window = window
+        self.processes = processes
+        self.max_turns = max_turns
+        self.cache_size = cache_size
+        self.keys: list[str] = []
+        self.ids: dict[str, int] = {}
+        self.ratings = ArrayT("d", 0)
+        # games, wins, losses and draws, per team
+        self.games = ArrayT("l", 0)
+        self.wins = ArrayT("l", 0)
+        self.losses = ArrayT("l", 0)
+        self.draws = ArrayT("l", 0)
+        self.matches = 0
+        self._specs: dict[int, tuple[MonsterTeam.TeamMode, ArrayR[type[MonsterBase]]]] = {}
+        self._results: OrderedDict[tuple[int, int], Battle.Result] = OrderedDict()
+        # The game data that _specs and _results were derived from.
+        self._game_data: Optional[DataSnapshot] = None
+        self._battle = Battle(verbosity=0, log_size=0, max_turns=max_turns)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.ids
+
+    def add_team(self, team_mode: MonsterTeam.TeamMode, classes: Iterable[type[MonsterBase]]) -> int:
+        """Add a team spec to the ladder (if not already present), returning its id."""
+        return self._add_key(team_spec_key(team_mode, classes))
+
+    def add_random_teams(self, n: int, team_mode: MonsterTeam.TeamMode = MonsterTeam.TeamMode.BACK) -> None:
+        """
+        Add n random team specs, drawn the way SelectionMode.RANDOM draws them. Duplicates are skipped.
+        They are drawn from the ladder's own seed, and the caller's RandomGen seed is put back afterwards.
+        """
+        spawnable = get_roster_index().spawnable()
+        keys = []
+        caller_seed = RandomGen.seed
+        try:
+            RandomGen.set_seed(self.seed)
+            for _ in range(n):
+                size = RandomGen.randint(1, MonsterTeam.TEAM_LIMIT)
+                keys.append(team_spec_key(team_mode, [RandomGen.random_choice(spawnable) for _ in range(size)]))
+            self.seed = RandomGen.seed
+        finally:
+            RandomGen.seed = caller_seed
+        self._add_keys(keys)
+
+    def _add_key(self, key: str) -> int:
+        self._add_keys([key])
+        return self.ids[key]
+
+    def _add_keys(self, keys: Iterable[str]) -> None:
+        new = [key for key in dict.fromkeys(keys) if key not in self.ids]
+        if not new:
+            return
+        start = len(self.keys)
+        for i, key in enumerate(new, start):
+            self.keys.append(key)
+            self.ids[key] = i
+        n = len(self.keys)
+        if n > len(self.ratings):
+            # The columns are only used up to len(self.keys). Doubling their capacity keeps
+            # adding teams one at a time amortised O(1).
+            capacity = max(n, 2 * len(self.ratings))
+            self.ratings = self.ratings.extend_into(capacity)
+            self.games = self.games.extend_into(capacity)
+            self.wins = self.wins.extend_into(capacity)
+            self.losses = self.losses.extend_into(capacity)
+            self.draws = self.draws.extend_into(capacity)
+        self.ratings[start:n] = [self.INITIAL_RATING] * len(new)
+
+    def rating(self, key: str) -> float:
+        return self.ratings[self.ids[key]]
+
+    def record(self, key: str) -> tuple[int, int, int]:
+        """(wins, losses, draws) of the team."""
+        i = self.ids[key]
+        return self.wins[i], self.losses[i], self.draws[i]
+
+    def top(self, n: int = 10, min_games: int = 0) -> list[tuple[str, float]]:
+        """The n highest rated teams with at least min_games games, best first."""
+        ranked = sorted(
+            (i for i in range(len(self.keys)) if self.games[i] >= min_games),
+            key=lambda i: -self.ratings[i],
+        )
+        return [(self.keys[i], self.ratings[i]) for i in ranked[:n]]
+
+    def rating_order(self) -> ArraySortedList:
+        """All teams as ListItem(id, rating), sorted by rating. :complexity: O(n log n)"""
+        order = ArraySortedList(len(self.keys))
+        order.add_many([ListItem(i, self.ratings[i]) for i in range(len(self.keys))])
+        return order
+
+    def schedule(self, n_matches: int) -> list[tuple[int, int]]:
+        """
+        Pick n_matches pairings of near-rated teams, as (team 1 id, team 2 id).
+        :complexity: O(T log T + n_matches) for T teams.
+        """
+        if len(self.keys) < 2:
+            raise ValueError("The ladder needs at least two teams.")
+        order = self.rating_order()
+        n = len(order)
+        # Opponents are drawn from the `span` teams around each team (fewer in a tiny ladder).
+        span = min(2 * self.window, n - 1)
+        pairs = []
+        # Drawn from the ladder's own seed; the caller's is put back afterwards.
+        caller_seed = RandomGen.seed
+        try:
+            RandomGen.set_seed(self.seed)
+            for _ in range(n_matches):
+                position = RandomGen.randint(0, n - 1)
+                low = min(max(0, position - self.window), n - 1 - span)
+                other = RandomGen.randint(low, low + span - 1)
+                if other >= position:
+                    other += 1
+                first, second = order[position].value, order[other].value
+                pairs.append((first, second) if RandomGen.randint(0, 1) else (second, first))
+            self.seed = RandomGen.seed
+        finally:
+            RandomGen.seed = caller_seed
+        return pairs
+
+    def _spec(self, i: int) -> tuple[MonsterTeam.TeamMode, ArrayR[type[MonsterBase]]]:
+        game_data = self._sync_game_data()
+        spec = self._specs.get(i)
+        if spec is None:
+            spec = self._specs[i] = parse_team_spec_key(self.keys[i], game_data.index)
+        return spec
+
+    def _sync_game_data(self) -> DataSnapshot:
+        """The current game data, first dropping the specs and results derived from any earlier version."""
+        game_data = helpers.registry.current()
+        if game_data is not self._game_data:
+            self._specs.clear()
+            self._results.clear()
+            self._game_data = game_data
+        return game_data
+
+    def play_match(self, first: int, second: int) -> Battle.Result:
+        """Battle team `first` (as team 1) against team `second`, going through the result cache."""
+        pair = (first, second)
+        self._sync_game_data()
+        result = self._results.get(pair)
+        if result is not None:
+            self._results.move_to_end(pair)
+            return result
+        teams = []
+        for i in pair:
+            mode, classes = self._spec(i)
+            teams.append(MonsterTeam(mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=classes))
+        result = self._battle.battle(teams[0], teams[1])
+        self._remember(pair, result)
+        return result
+
+    def _remember(self, pair: tuple[int, int], result: Battle.Result) -> None:
+        self._results[pair] = result
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    def play(self, pairs: list[tuple[int, int]]) -> list[Battle.Result]:
+        # Only the distinct pairs not already cached go to the workers, whose results are
+        # then added to this process's cache (a worker's own cache goes when it exits).
+        self._sync_game_data()
+        missing = [pair for pair in dict.fromkeys(pairs) if pair not in self._results]
+        if self.processes > 1 and len(missing) > 1 and helpers.can_fork():
+            with helpers.fork_pool(self.processes, _init_worker, (self,)) as pool:
+                played = pool.map(_play_in_worker, missing, max(1, len(missing) // (4 * self.processes)))
+            results = dict(zip(missing, played))
+            for pair, result in results.items():
+                self._remember(pair, result)
+            return [results[pair] if pair in results else self.play_match(*pair) for pair in pairs]
+        return [self.play_match(first, second) for first, second in pairs]
+
+    def update(self, first: int, second: int, result: Battle.Result) -> None:
+        """Apply one match's result to both teams' ratings and records."""
+        score = 1.0 if result == Battle.Result.TEAM1 else 0.0 if result == Battle.Result.TEAM2 else 0.5
+        expected = 1 / (1 + 10 ** ((self.ratings[second] - self.ratings[first]) / 400))
+        for i, delta in ((first, score - expected), (second, expected - score)):
+            k = self.K_PROVISIONAL if self.games[i] < self.PROVISIONAL_GAMES else self.K
+            self.ratings[i] += k * delta
+            self.games[i] += 1
+        if score == 1.0:
+            self.wins[first] += 1
+            self.losses[second] += 1
+        elif score == 0.0:
+            self.losses[first] += 1
+            self.wins[second] += 1
+        else:
+            self.draws[first] += 1
+            self.draws[second] += 1
+        self.matches += 1
+
+    def run(self, n_matches: int, batch_size: int = 1000) -> None:
+        """Schedule, play and rate n_matches matches, batch_size at a time."""
+        played = 0
+        while played < n_matches:
+            pairs = self.schedule(min(batch_size, n_matches - played))
+            for (first, second), result in zip(pairs, self.play(pairs)):
+                self.update(first, second, result)
+            played += len(pairs)
+
+    def save(self, path: str) -> None:
+        """Write the ladder's state, atomically replacing any previous file."""
+        state = {
+            "version": LADDER_STATE_VERSION,
+            "seed": self.seed,
+            "window": self.window,
+            "max_turns": self.max_turns,
+            "matches": self.matches,
+            "keys": self.keys,
+            "ratings": self.ratings[:len(self.keys)].to_list(),
+            "games": self.games[:len(self.keys)].to_list(),
+            "wins": self.wins[:len(self.keys)].to_list(),
+            "losses": self.losses[:len(self.keys)].to_list(),
+            "draws": self.draws[:len(self.keys)].to_list(),
+        }
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, path)
+
+    @classmethod
+    def load(cls, path: str, processes: int = 1, cache_size: int = 100_000) -> Ladder:
+        with open(path, "r") as f:
+            state = json.load(f)
+        if state.get("version") != LADDER_STATE_VERSION:
+            raise ValueError(f"Unsupported ladder state version {state.get('version')}.")
+        ladder = cls(state["seed"], state["window"], processes, state["max_turns"], cache_size)
+        ladder._add_keys(state["keys"])
+        n = len(ladder.keys)
+        ladder.ratings[:n] = state["ratings"]
+        ladder.games[:n] = state["games"]
+        ladder.wins[:n] = state["wins"]
+        ladder.losses[:n] = state["losses"]
+        ladder.draws[:n] = state["draws"]
+        ladder.matches = state["matches"]
+        return ladder
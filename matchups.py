@@ -0,0 +1,202 @@
+"""
+One-on-one matchup matrix of the spawnable roster.
+
+Every spawnable class duels every other (and itself) at each level, in simple and complex
+mode, through Battle with one-monster teams. Results are from the row monster's point of
+view: WIN (1), DRAW (0) or LOSS (-1), with the row monster as team 1.
+
+Duels are deduplicated before anything is simulated:
+* Levels and evolutions only change once a monster has fainted, which ends a duel, so a duel
+  depends only on the two monsters' starting stats. Duels are keyed by stats, which among
+  other things makes every level of simple mode (whose stats don't depend on level) free.
+* The faster monster always acts first, so when speeds differ, B vs A is the mirror of
+  A vs B. Only ties in speed (where team 1 goes first) are simulated both ways round.
+The remaining duels are shared out between worker processes.
+
+Usage:
+```
+python matchups.py -o matchups.csv --levels 1 10
+```
+and to read it back:
+```
+matrix = MatchupMatrix.from_csv("matchups.csv")
+matrix.get("complex", 5, "Flamikin", "Aquariuma")    # 1, 0 or -1
+matrix.win_rate("Flamikin", mode="simple")
+```
+"""
+from __future__ import annotations
+import argparse
+import csv
+import os
+import sys
+from typing import Iterable, Optional, TYPE_CHECKING
+
+import helpers
+from battle import Battle
+from helpers import get_roster_index
+from team import MonsterTeam
+
+from data_structures.referential_array import ArrayR
+from data_structures.typed_array import ArrayT
+
+if TYPE_CHECKING:
+    from monster_base import MonsterBase
+
+WIN, DRAW, LOSS = 1, 0, -1
+MODES = ("simple", "complex")
+
+# Stats that decide a duel: (attack, defense, speed, max_hp).
+StatLine = tuple[int, int, int, int]
+
+
+def stat_line(monster: MonsterBase) -> StatLine:
+    return monster.get_attack(), monster.get_defense(), monster.get_speed(), monster.get_max_hp()
+
+
+def duel(name: str, opponent: str, level: int, simple_mode: bool, battle: Optional[Battle] = None) -> int:
+    """The result of a one-on-one battle between the named classes, from the first one's point of view."""
+    index = get_roster_index()
+    battle = battle or Battle(verbosity=0, log_size=0, max_turns=1000)
+    teams = []
+    for cls in (index.get(name), index.get(opponent)):
+        team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([cls]))
+        team.monster_order[0] = cls(simple_mode=simple_mode, level=level)
+        teams.append(team)
+    result = battle.battle(teams[0], teams[1])
+    if result == Battle.Result.TEAM1:
+        return WIN
+    elif result == Battle.Result.TEAM2:
+        return LOSS
+    return DRAW
+
+
+# Battle reused by a worker process for all of its duels.
+_worker_battle: Optional[Battle] = None
+
+
+def _duel_in_worker(args: tuple[str, str, int, bool]) -> int:
+    global _worker_battle
+    if _worker_battle is None:
+        _worker_battle = Battle(verbosity=0, log_size=0, max_turns=1000)
+    return duel(*args, battle=_worker_battle)
+
+
+class MatchupMatrix:
+    """
+    Results of every (mode, level, monster, opponent) duel, stored compactly in a typed
+    array of signed bytes, in that index order.
+    """
+
+    def __init__(self, names: Iterable[str], levels: Iterable[int], modes: Iterable[str] = MODES) -> None:
+        self.names = list(names)
+        self.levels = list(levels)
+        self.modes = list(modes)
+        self._name_index = {name: i for i, name in enumerate(self.names)}
+        self._level_index = {level: i for i, level in enumerate(self.levels)}
+        self._mode_index = {mode: i for i, mode in enumerate(self.modes)}
+        n = len(self.names)
+        self.values = ArrayT("b", len(self.modes) * len(self.levels) * n * n)
+        # How many duels were actually simulated to fill the matrix, when built by build_matrix.
+        self.simulated = 0
+
+    def _offset(self, mode: str, level: int, monster: str, opponent: str) -> int:
+        n = len(self.names)
+        row = (self._mode_index[mode] * len(self.levels) + self._level_index[level]) * n + self._name_index[monster]
+        return row * n + self._name_index[opponent]
+
+    def get(self, mode: str, level: int, monster: str, opponent: str) -> int:
+        return self.values[self._offset(mode, level, monster, opponent)]
+
+    def set(self, mode: str, level: int, monster: str, opponent: str, result: int) -> None:
+        self.values[self._offset(mode, level, monster, opponent)] = result
+
+    def win_rate(self, monster: str, mode: Optional[str] = None, level: Optional[int] = None) -> float:
+        """Fraction of duels the monster wins as team 1, over all opponents (and modes/levels unless given)."""
+        modes = [mode] if mode is not None else self.modes
+        levels = [level] if level is not None else self.levels
+        n = len(self.names)
+        wins = 0
+        for m in modes:
+            for l in levels:
+                start = self._offset(m, l, monster, self.names[0])
+                wins += sum(1 for result in self.values[start:start + n] if result == WIN)
+        return wins / (len(modes) * len(levels) * n)
+
+    def to_csv(self, path: str) -> None:
+        """One row per (mode, level, monster), with a column of results per opponent."""
+        n = len(self.names)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["mode", "level", "monster"] + self.names)
+            for mode in self.modes:
+                for level in self.levels:
+                    for name in self.names:
+                        start = self._offset(mode, level, name, self.names[0])
+                        writer.writerow([mode, level, name] + self.values[start:start + n].to_list())
+
+    @classmethod
+    def from_csv(cls, path: str) -> MatchupMatrix:
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            names = next(reader)[3:]
+            rows = list(reader)
+        modes = list(dict.fromkeys(row[0] for row in rows))
+        levels = list(dict.fromkeys(int(row[1]) for row in rows))
+        matrix = cls(names, levels, modes)
+        for mode, level, name, *results in rows:
+            start = matrix._offset(mode, int(level), name, names[0])
+            matrix.values[start:start + len(names)] = [int(result) for result in results]
+        return matrix
+
+
+def build_matrix(levels: Iterable[int] = range(1, 11), modes: Iterable[str] = MODES, processes: Optional[int] = None) -> MatchupMatrix:
+    """
+    Simulate the full matchup matrix of the spawnable roster.
+    :processes: worker processes to simulate with; defaults to one per CPU.
+    """
+    spawnable = get_roster_index().spawnable()
+    matrix = MatchupMatrix((cls.get_name() for cls in spawnable), levels, modes)
+
+    # Map every cell to a canonical duel (keyed by stats), remembering whether it is mirrored.
+    duels: dict[tuple[StatLine, StatLine], tuple[str, str, int, bool]] = {}
+    cells = []
+    for mode in matrix.modes:
+        simple_mode = mode == "simple"
+        for level in matrix.levels:
+            stats = [stat_line(cls(simple_mode=simple_mode, level=level)) for cls in spawnable]
+            for i, name in enumerate(matrix.names):
+                for j, opponent in enumerate(matrix.names):
+                    key, flipped = (stats[i], stats[j]), False
+                    if stats[i][2] != stats[j][2] and stats[j] < stats[i]:
+                        key, flipped = (stats[j], stats[i]), True
+                    if key not in duels:
+                        duels[key] = (opponent, name, level, simple_mode) if flipped else (name, opponent, level, simple_mode)
+                    cells.append((mode, level, name, opponent, key, flipped))
+
+    keys = list(duels)
+    processes = processes or os.cpu_count() or 1
+    if processes > 1 and helpers.can_fork():
+        with helpers.fork_pool(processes) as pool:
+            results = pool.map(_duel_in_worker, [duels[key] for key in keys], max(1, len(keys) // (4 * processes)))
+    else:
+        results = [_duel_in_worker(duels[key]) for key in keys]
+    outcomes = dict(zip(keys, results))
+
+    for mode, level, name, opponent, key, flipped in cells:
+        matrix.set(mode, level, name, opponent, -outcomes[key] if flipped else outcomes[key])
+    matrix.simulated = len(keys)
+    return matrix
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser(description="Build the one-on-one matchup matrix of the spawnable roster.")
+    p.add_argument("-o", "--output", help="CSV file to write. Default matchups.csv.", default="matchups.csv")
+    p.add_argument("--levels", help="Lowest and highest level. Default 1 10.", type=int, nargs=2, default=(1, 10))
+    p.add_argument("--modes", help="Stat modes to include. Default both.", nargs="+", choices=MODES, default=list(MODES))
+    p.add_argument("-j", "--jobs", help="Worker processes. Default one per CPU.", type=int)
+    args = p.parse_args()
+
+    matrix = build_matrix(range(args.levels[0], args.levels[1] + 1), args.modes, args.jobs)
+    matrix.to_csv(args.output)
+    print(f"{len(matrix.values)} duels from {matrix.simulated} simulations written to {args.output}", file=sys.stderr)
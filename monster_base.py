@@ -3,6 +3,9 @@ import abc
 
 from stats import Stats
 
+# A monster instance's (class, simple_mode, original_level, level, hp), see MonsterBase.state.
+MonsterState = tuple[type["MonsterBase"], bool, int, int, int]
+
 class MonsterBase(abc.ABC):
 
     def __init__(self, simple_mode=True, level:int=1, reduced_hp:int=0) -> None:
@@ -20,6 +23,21 @@ class MonsterBase(abc.ABC):
     def __str__(self) -> str:
         return f"LV.{self.level} {self.get_name()}, {self.hp}/{self.get_max_hp()} HP"
     
+    def state(self) -> MonsterState:
+        """This instance's state as an immutable value. :complexity: O(1)"""
+        return type(self), self.simple_mode, self.original_level, self.level, self.hp
+
+    @staticmethod
+    def from_state(state: MonsterState) -> MonsterBase:
+        """A new instance in the given state. :complexity: O(1)"""
+        cls, simple_mode, original_level, level, hp = state
+        monster = cls.__new__(cls)
+        monster.simple_mode = simple_mode
+        monster.original_level = original_level
+        monster.level = level
+        monster.hp = hp
+        return monster
+
     def get_level(self):
         """The current level of this monster instance"""
         return self.level
@@ -43,27 +61,27 @@ class MonsterBase(abc.ABC):
         if self.simple_mode:
             return self.get_simple_stats().get_attack()
         else:
-            return self.get_complex_stats().get_attack()
+            return self.get_complex_stats().get_attack(self.level)
 
     def get_defense(self):
         """Get the defense of this monster instance"""
         if self.simple_mode:
             return self.get_simple_stats().get_defense()
         else:
-            return self.get_complex_stats().get_defense()
+            return self.get_complex_stats().get_defense(self.level)
 
     def get_speed(self):
         """Get the speed of this monster instance"""
         if self.simple_mode:
             return self.get_simple_stats().get_speed()
         else:
-            return self.get_complex_stats().get_speed()
+            return self.get_complex_stats().get_speed(self.level)
     def get_max_hp(self):
         """Get the maximum HP of this monster instance"""
         if self.simple_mode:
             return self.get_simple_stats().get_max_hp()
         else:
-            return self.get_complex_stats().get_max_hp()
+            return self.get_complex_stats().get_max_hp(self.level)
 
     def alive(self) -> bool:
         """Whether the current monster instance is alive (HP > 0 )"""
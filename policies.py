@@ -0,0 +1,148 @@
+"""
+Action policies: what decides each team's action every turn of a battle.
+
+Battle calls policy.choose_action(battle, team) for team 1 or 2 (see Battle's policy1 and
+policy2). Policies that look ahead simulate on battle.clone(), which copies a battle in
+progress in a few microseconds, and score the states they reach in batches, through
+score_states, so an evaluator can be swapped in that does the whole batch at once.
+
+Usage:
+```
+battle = Battle(policy1=LookaheadPolicy(depth=4))            # team 2 keeps its own choose_action
+battle.battle(team1, team2)
+
+policy = LookaheadPolicy()
+policy.choose_many([battle1, battle2, battle3], team=1)      # one batch of states for all three
+```
+"""
+from __future__ import annotations
+import abc
+from typing import Optional
+
+from battle import Battle
+from monster_base import MonsterBase
+from team import MonsterTeam
+
+# A state reached by simulating ahead: the battle, and its result if it has finished.
+SimulatedState = tuple[Battle, Optional[Battle.Result]]
+
+
+def sides(battle: Battle, team: int) -> tuple[MonsterTeam, MonsterBase, MonsterTeam, MonsterBase]:
+    """(team, its monster out, enemy team, the enemy's monster out) from the point of view of team 1 or 2."""
+    if team == 1:
+        return battle.team1, battle.out1, battle.team2, battle.out2
+    return battle.team2, battle.out2, battle.team1, battle.out1
+
+
+def legal_actions(battle: Battle, team: int) -> list[Battle.Action]:
+    """
+    The actions worth considering for team 1 or 2. Swapping needs a monster waiting in
+    the team, and a special needs at least two to rearrange.
+    """
+    own, _, _, _ = sides(battle, team)
+    actions = [Battle.Action.ATTACK]
+    if len(own) > 0:
+        actions.append(Battle.Action.SWAP)
+    if len(own) > 1:
+        actions.append(Battle.Action.SPECIAL)
+    return actions
+
+
+class ActionPolicy(abc.ABC):
+
+    @abc.abstractmethod
+    def choose_action(self, battle: Battle, team: int) -> Battle.Action:
+        """The action team 1 or 2 takes this turn of the battle."""
+        pass
+
+    def choose_many(self, battles: list[Battle], team: int) -> list[Battle.Action]:
+        """The action team 1 or 2 takes in each of these battles. Override to batch the work."""
+        return [self.choose_action(battle, team) for battle in battles]
+
+
+class HeuristicPolicy(ActionPolicy):
+    """The team's own choose_action: attack when faster or healthier than the enemy, otherwise swap."""
+
+    def choose_action(self, battle: Battle, team: int) -> Battle.Action:
+        own, out, _, enemy = sides(battle, team)
+        return own.choose_action(out, enemy)
+
+
+class LookaheadPolicy(ActionPolicy):
+    """
+    Tries each legal action on a clone of the battle, with the enemy answering as the
+    rollout policy would, then plays `depth` - 1 more turns with the rollout policy on
+    both sides, and takes the action whose resulting state scores best.
+    Ties go to the earliest of ATTACK, SWAP and SPECIAL.
+    """
+
+    # Score of a finished battle, beyond anything score_states gives an unfinished one.
+    WIN_SCORE = 2.0
+
+    def __init__(self, depth: int = 4, rollout: Optional[ActionPolicy] = None) -> None:
+        if depth < 1:
+            raise ValueError("depth should be at least 1.")
+        self.depth = depth
+        self.rollout = rollout or HeuristicPolicy()
+
+    def choose_action(self, battle: Battle, team: int) -> Battle.Action:
+        return self.choose_many([battle], team)[0]
+
+    def choose_many(self, battles: list[Battle], team: int) -> list[Battle.Action]:
+        """
+        Simulate every legal action in every battle, then score all the states reached in one batch.
+        :complexity: O(B * A * depth) turns simulated, for B battles and A <= 3 legal actions.
+        """
+        candidates = [legal_actions(battle, team) for battle in battles]
+        states = [self.simulate(battle, team, action) for battle, actions in zip(battles, candidates) for action in actions]
+        scores = self.score_states(states, team)
+        chosen = []
+        start = 0
+        for actions in candidates:
+            best = start
+            for i in range(start + 1, start + len(actions)):
+                if scores[i] > scores[best]:
+                    best = i
+            chosen.append(actions[best - start])
+            start += len(actions)
+        return chosen
+
+    def simulate(self, battle: Battle, team: int, action: Battle.Action) -> SimulatedState:
+        """The state reached by team 1 or 2 taking this action, then depth - 1 turns of the rollout policy."""
+        state = battle.clone()
+        enemy_action = self.rollout.choose_action(state, 3 - team)
+        if team == 1:
+            result = state.resolve_turn(action, enemy_action)
+        else:
+            result = state.resolve_turn(enemy_action, action)
+        for _ in range(self.depth - 1):
+            if result is not None:
+                break
+            result = state.resolve_turn(self.rollout.choose_action(state, 1), self.rollout.choose_action(state, 2))
+        return state, result
+
+    def score_states(self, states: list[SimulatedState], team: int) -> list[float]:
+        """
+        How good each state is for team 1 or 2, higher being better. By default, the
+        difference in the fraction of total HP each side has left, or +-WIN_SCORE
+        (0 for a draw) once the battle has finished.
+        :complexity: O(S * TEAM_LIMIT) for S states.
+        """
+        won = Battle.Result.TEAM1 if team == 1 else Battle.Result.TEAM2
+        scores = []
+        for battle, result in states:
+            if result is not None:
+                scores.append(self.WIN_SCORE if result == won else 0.0 if result == Battle.Result.DRAW else -self.WIN_SCORE)
+                continue
+            own, out, enemy_team, enemy_out = sides(battle, team)
+            scores.append(self._health(own, out) - self._health(enemy_team, enemy_out))
+        return scores
+
+    @staticmethod
+    def _health(team: MonsterTeam, out: MonsterBase) -> float:
+        hp, max_hp = max(0, out.hp), out.get_max_hp()
+        for i in range(len(team)):
+            monster = team.monster_order[i]
+            hp += max(0, monster.hp)
+            max_hp += monster.get_max_hp()
+        return hp / max_hp
@@ -0,0 +1,306 @@
+"""
+Opt-in counters and timers for the hot paths of a game run.
+
+Instrumentation is installed by wrapping the relevant methods when the profiler
+is enabled, and removed again when it is disabled, so a disabled profiler costs
+nothing on those paths. The few counts that can't be taken from outside a method
+(such as how many monsters a team shuffles) are guarded by `profiler.enabled`.
+
+Usage:
+```
+from profiling import profiler
+
+with profiler.profile():
+    tower.next_battle()
+print(profiler.summary())
+```
+
+`memory_report` is the memory counterpart: it runs a simulation under tracemalloc
+and breaks the traced memory down by the module that allocated it, alongside
+counts and sizes of the game's own objects (teams, monsters, arrays, ...).
+"""
+from __future__ import annotations
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterable, Iterator, Union
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class Profiler:
+
+    STATS = ("get_attack", "get_defense", "get_speed", "get_max_hp")
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counters: defaultdict[str, int] = defaultdict(int)
+        # name -> [calls, total seconds]
+        self.timers: defaultdict[str, list] = defaultdict(lambda: [0, 0.0])
+        self._originals: list[tuple[type, str, object]] = []
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add n to the named counter. Callers on hot paths should check `enabled` first."""
+        self.counters[name] += n
+
+    def add_time(self, name: str, seconds: float) -> None:
+        timer = self.timers[name]
+        timer[0] += 1
+        timer[1] += seconds
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block under the given name, if the profiler is enabled."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.timers.clear()
+
+    def enable(self) -> None:
+        """Install the hooks. Counts and timings are kept from any previous run; see `reset`."""
+        if self.enabled:
+            return
+        for owner, attr, wrap in self._hooks():
+            original = owner.__dict__[attr]
+            self._originals.append((owner, attr, original))
+            if isinstance(original, (classmethod, staticmethod)):
+                setattr(owner, attr, type(original)(wrap(original.__func__)))
+            else:
+                setattr(owner, attr, wrap(original))
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Remove the hooks, restoring the original methods."""
+        while self._originals:
+            owner, attr, original = self._originals.pop()
+            setattr(owner, attr, original)
+        self.enabled = False
+
+    @contextmanager
+    def profile(self, reset: bool = True) -> Iterator[Profiler]:
+        """Enable the profiler for the enclosed block."""
+        if reset:
+            self.reset()
+        self.enable()
+        try:
+            yield self
+        finally:
+            self.disable()
+
+    def snapshot(self) -> dict:
+        """A JSON-ready copy of the counters and timers."""
+        return {
+            "counters": dict(self.counters),
+            "timers": {name: {"calls": calls, "total_s": total} for name, (calls, total) in self.timers.items()},
+        }
+
+    def summary(self) -> str:
+        lines = []
+        if self.timers:
+            lines.append(f"{'timer':<30} {'calls':>10} {'total':>12} {'per call':>12}")
+            for name, (calls, total) in sorted(self.timers.items()):
+                lines.append(f"{name:<30} {calls:>10} {total * 1e3:>10.2f}ms {total / calls * 1e6:>10.2f}us")
+        if self.counters:
+            lines.append(f"{'counter':<30} {'count':>10}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:<30} {value:>10}")
+        return "\n".join(lines)
+
+    def _counted(self, name: str) -> Callable[[Callable], Callable]:
+        counters = self.counters
+        def wrap(func):
+            @wraps(func)
+            def counted(*args, **kwargs):
+                counters[name] += 1
+                return func(*args, **kwargs)
+            return counted
+        return wrap
+
+    def _timed(self, name: str) -> Callable[[Callable], Callable]:
+        add_time = self.add_time
+        def wrap(func):
+            @wraps(func)
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    add_time(name, time.perf_counter() - start)
+            return timed
+        return wrap
+
+    def _stat_lookup(self, stat: str) -> Callable[[Callable], Callable]:
+        counters = self.counters
+        simple_name = f"monster.{stat}.simple"
+        complex_name = f"monster.{stat}.complex"
+        def wrap(func):
+            @wraps(func)
+            def counted(monster):
+                counters[simple_name if monster.simple_mode else complex_name] += 1
+                return func(monster)
+            return counted
+        return wrap
+
+    def _hooks(self) -> list[tuple[type, str, Callable[[Callable], Callable]]]:
+        # Imported here, as the game modules themselves import this one.
+        from battle import Battle
+        from monster_base import MonsterBase
+        from random_gen import RandomGen
+        from team import MonsterTeam
+        from tower import BattleTower
+
+        return [
+            (BattleTower, "_next_battle", self._timed("tower.next_battle")),
+            (Battle, "battle", self._timed("battle.battle")),
+            # Every turn goes through resolve_turn, whether or not the teams chose their own actions.
+            (Battle, "resolve_turn", self._timed("battle.turn")),
+            (Battle, "compute_damage", self._counted("battle.damage")),
+            (MonsterTeam, "add_to_team", self._counted("team.add")),
+            (MonsterTeam, "retrieve_from_team", self._counted("team.retrieve")),
+            (MonsterTeam, "special", self._counted("team.special")),
+            (MonsterTeam, "regenerate_team", self._timed("team.regenerate")),
+            (MonsterBase, "level_up", self._counted("monster.level_up")),
+            (MonsterBase, "evolve", self._counted("monster.evolve")),
+            (RandomGen, "random", self._counted("rng.draws")),
+        ] + [(MonsterBase, stat, self._stat_lookup(stat[len("get_"):])) for stat in self.STATS]
+
+
+profiler = Profiler()
+
+
+def subsystem_of(filename: str) -> str:
+    """The module of this repository a traced allocation belongs to, e.g. data_structures.referential_array."""
+    if filename.startswith("<"):
+        # Frozen modules such as <frozen importlib._bootstrap>.
+        return "other"
+    path = os.path.abspath(filename)
+    if not path.startswith(REPO_ROOT + os.sep):
+        return "other"
+    return os.path.splitext(os.path.relpath(path, REPO_ROOT))[0].replace(os.sep, ".")
+
+
+def _by_subsystem(snapshot: tracemalloc.Snapshot, baseline: tracemalloc.Snapshot) -> dict[str, int]:
+    """Bytes allocated since the baseline snapshot (and still alive), per subsystem, largest first."""
+    totals: defaultdict[str, int] = defaultdict(int)
+    for diff in snapshot.compare_to(baseline, "filename"):
+        totals[subsystem_of(diff.traceback[0].filename)] += diff.size_diff
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def _census_types() -> tuple[type, ...]:
+    from battle import Battle
+    from monster_base import MonsterBase
+    from team import MonsterTeam
+    from tower import BattleTower
+    from data_structures.queue_adt import CircularQueue
+    from data_structures.referential_array import ArrayR
+    from data_structures.typed_array import ArrayT
+    return (BattleTower, Battle, MonsterTeam, MonsterBase, CircularQueue, ArrayR, ArrayT)
+
+
+def _object_size(obj: object) -> int:
+    """
+    Shallow size of obj, plus the buffer and ctypes' keepalive dict for arrays.
+    Instance dicts are left out: reading __dict__ would allocate one for objects that store
+    their attributes inline, changing the memory being measured.
+    """
+    size = sys.getsizeof(obj)
+    if type(obj).__name__ in ("ArrayR", "ArrayT"):
+        array = obj.array
+        # sys.getsizeof includes the ctypes/array.array buffer.
+        size += sys.getsizeof(array)
+        keepalive = getattr(array, "_objects", None)
+        if keepalive is not None:
+            size += sys.getsizeof(keepalive)
+    return size
+
+
+def object_census(types: Union[tuple[type, ...], None] = None) -> dict[str, dict[str, int]]:
+    """
+    Count the live instances of each of the given types (by default the game's own classes),
+    with their total size in bytes. Each object is counted under the first type it is an instance of.
+    :complexity: O(n) where n is the number of objects tracked by the garbage collector.
+    """
+    types = types or _census_types()
+    census = {cls.__name__: {"count": 0, "bytes": 0} for cls in types}
+    for obj in gc.get_objects():
+        # Checking the MRO rather than isinstance keeps ABCs (MonsterBase) from caching every type seen.
+        mro = type(obj).__mro__
+        for cls in types:
+            if cls in mro:
+                entry = census[cls.__name__]
+                entry["count"] += 1
+                entry["bytes"] += _object_size(obj)
+                break
+    return census
+
+
+def memory_report(checkpoints: Iterable[Union[str, tuple[str, dict]]]) -> dict:
+    """
+    Run a simulation under tracemalloc and report where its memory went.
+
+    `checkpoints` is usually a generator that performs the simulation in steps and
+    yields a label after each one, optionally with a dict of extra measurements
+    (label, extra). At every checkpoint, garbage is collected and a snapshot taken.
+
+    The report holds:
+    * peak_bytes: the highest traced memory at any point of the run.
+    * peak: the checkpoint with the most traced memory, broken down by subsystem.
+    * steady: the final checkpoint broken down by subsystem, plus an object census.
+    * checkpoints: the traced memory and extras at every checkpoint.
+    Memory allocated before the run (e.g. the loaded roster) is not included.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    # Leave out tracemalloc's own allocations, such as the snapshots taken here.
+    exclude = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    gc.collect()
+    baseline = tracemalloc.take_snapshot().filter_traces(exclude)
+    tracemalloc.reset_peak()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    steps = []
+    peak = steady = None
+    census = {}
+    try:
+        for checkpoint in checkpoints:
+            label, extra = (checkpoint, {}) if isinstance(checkpoint, str) else checkpoint
+            gc.collect()
+            snapshot = tracemalloc.take_snapshot().filter_traces(exclude)
+            traced = tracemalloc.get_traced_memory()[0] - start_bytes
+            steps.append({"label": label, "traced_bytes": traced, **extra})
+            steady = (label, traced, snapshot)
+            if peak is None or traced >= peak[1]:
+                peak = steady
+            # Taken at every checkpoint, as the simulation's objects may be released once it finishes.
+            census = object_census()
+        peak_bytes = tracemalloc.get_traced_memory()[1] - start_bytes
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    def breakdown(checkpoint):
+        if checkpoint is None:
+            return None
+        label, traced, snapshot = checkpoint
+        return {"label": label, "traced_bytes": traced, "by_subsystem": _by_subsystem(snapshot, baseline)}
+
+    return {
+        "peak_bytes": peak_bytes,
+        "peak": breakdown(peak),
+        "steady": {**(breakdown(steady) or {}), "objects": census},
+        "checkpoints": steps,
+    }
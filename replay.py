@@ -0,0 +1,185 @@
+"""
+Deterministic battle replays.
+
+A Replay records everything a battle depends on: the RandomGen seed when it started, the
+starting state of both teams (as MonsterTeam fingerprints), max_turns, and both teams'
+action on every turn, packed one byte per turn. With the result and a hash of the final
+state, it re-runs the battle exactly, with no need for the tower (or anything else) that
+led up to it.
+
+Usage:
+```
+battle = Battle(record=True)
+battle.battle(team1, team2)
+data = battle.last_replay.to_bytes()         # a few dozen bytes
+
+replay = Replay.from_bytes(data)
+replayed = replay_battle(replay, verbosity=2)   # prints every event; raises ValueError on divergence
+verify(replay)                               # fast check of the final state hash only
+audit(replays)                               # indices of the replays that fail to verify
+```
+"""
+from __future__ import annotations
+import hashlib
+import os
+import struct
+from typing import Iterable, Optional
+
+import helpers
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+
+REPLAY_MAGIC = b"MBR1"
+
+# The actions of both teams in one turn, packed as team 1's value | team 2's value << 2.
+_TURN_ACTIONS = {
+    action1.value | action2.value << 2: (action1, action2)
+    for action1 in Battle.Action
+    for action2 in Battle.Action
+}
+
+
+def final_state_hash(battle: Battle, result: Battle.Result) -> bytes:
+    """
+    Hash of how a battle ended: its result, turn count, and the state of both teams and
+    their monsters still out.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(struct.pack("<BBI", result.value, battle.stalled, battle.turn_number))
+    for team, out in ((battle.team1, battle.out1), (battle.team2, battle.out2)):
+        h.update(team.fingerprint())
+        h.update(MonsterTeam.monster_fingerprint(out))
+    return h.digest()
+
+
+class Replay:
+    """
+    A recorded battle. See the module docstring.
+
+    Serialised by to_bytes as a fixed header followed by both team fingerprints and the actions.
+    """
+
+    # magic, seed, max_turns (0 for none), result, team 1 and team 2 fingerprint lengths, turns, final state hash
+    _HEADER = struct.Struct("<4sQIBHHI16s")
+
+    def __init__(self, seed: int, team1: bytes, team2: bytes, actions: bytes, max_turns: Optional[int], result: Battle.Result, final_hash: bytes) -> None:
+        self.seed = seed
+        self.team1 = team1
+        self.team2 = team2
+        self.actions = actions
+        self.max_turns = max_turns
+        self.result = result
+        self.final_hash = final_hash
+
+    def __len__(self) -> int:
+        """The number of turns the battle took."""
+        return len(self.actions)
+
+    def turn_actions(self, turn: int) -> tuple[Battle.Action, Battle.Action]:
+        """The actions of team 1 and team 2 on this turn, counting from 0."""
+        return _TURN_ACTIONS[self.actions[turn]]
+
+    def teams(self) -> tuple[MonsterTeam, MonsterTeam]:
+        """Fresh copies of both teams as they were when the battle started."""
+        return MonsterTeam.from_fingerprint(self.team1), MonsterTeam.from_fingerprint(self.team2)
+
+    def to_bytes(self) -> bytes:
+        # Only the seed modulo RandomGen.MOD affects what RandomGen draws, and that fits the header.
+        header = self._HEADER.pack(
+            REPLAY_MAGIC, self.seed % RandomGen.MOD, self.max_turns or 0, self.result.value,
+            len(self.team1), len(self.team2), len(self.actions), self.final_hash,
+        )
+        return b"".join((header, self.team1, self.team2, self.actions))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Replay:
+        if len(data) < cls._HEADER.size:
+            raise ValueError("Replay data is truncated.")
+        magic, seed, max_turns, result, size1, size2, turns, final_hash = cls._HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("Not a replay, or an unsupported replay version.")
+        start = cls._HEADER.size
+        if len(data) != start + size1 + size2 + turns:
+            raise ValueError("Replay data is truncated.")
+        team1 = data[start:start + size1]
+        team2 = data[start + size1:start + size1 + size2]
+        actions = data[start + size1 + size2:]
+        return cls(seed, team1, team2, actions, max_turns or None, Battle.Result(result), final_hash)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Replay):
+            return NotImplemented
+        return self.to_bytes() == other.to_bytes()
+
+    __hash__ = None
+
+
+class ReplayBattle(Battle):
+    """A Battle whose teams take the actions recorded in a replay, rather than choosing their own."""
+
+    def __init__(self, replay: Replay, verbosity=0, log_size=Battle.DEFAULT_LOG_SIZE) -> None:
+        super().__init__(verbosity, log_size, replay.max_turns)
+        self.script = replay
+        self.turns_played = 0
+
+    def choose_actions(self) -> tuple[Battle.Action, Battle.Action]:
+        if self.turns_played >= len(self.script.actions):
+            raise ValueError(f"The replay ran out of actions on turn {self.turns_played}.")
+        actions = _TURN_ACTIONS.get(self.script.actions[self.turns_played])
+        if actions is None:
+            raise ValueError(f"Invalid actions recorded for turn {self.turns_played}.")
+        self.turns_played += 1
+        return actions
+
+    def play(self) -> Battle.Result:
+        """Re-run the recorded battle from fresh copies of its teams."""
+        RandomGen.set_seed(self.script.seed)
+        self.turns_played = 0
+        return self.battle(*self.script.teams())
+
+
+def replay_battle(replay: Replay, verbosity=0, log_size=Battle.DEFAULT_LOG_SIZE) -> ReplayBattle:
+    """
+    Re-run a recorded battle, checking every recorded action is used and that it ends as
+    recorded. The returned battle holds the events of the replay in its log.
+    :complexity: O(T) for a battle of T turns.
+    """
+    battle = ReplayBattle(replay, verbosity, log_size)
+    result = battle.play()
+    if battle.turns_played != len(replay):
+        raise ValueError(f"The battle ended after {battle.turns_played} of the replay's {len(replay)} turns.")
+    if result != replay.result:
+        raise ValueError(f"The battle ended in {result.name}, not {replay.result.name}.")
+    if final_state_hash(battle, result) != replay.final_hash:
+        raise ValueError("The battle ended in a different state.")
+    return battle
+
+
+def verify(replay: Replay) -> bool:
+    """
+    Fast check that a replay reproduces: re-run it without logging and compare only the
+    final state hash.
+    :complexity: O(T) for a battle of T turns.
+    """
+    battle = ReplayBattle(replay, log_size=0)
+    try:
+        result = battle.play()
+    except ValueError:
+        return False
+    return final_state_hash(battle, result) == replay.final_hash
+
+
+def audit(replays: Iterable[Replay], processes: Optional[int] = None) -> list[int]:
+    """
+    Verify many replays, in parallel, returning the indices of those that fail.
+    :processes: worker processes to verify with; defaults to one per CPU.
+    """
+    replays = list(replays)
+    processes = processes or os.cpu_count() or 1
+    if processes > 1 and len(replays) > 1 and helpers.can_fork():
+        with helpers.fork_pool(processes) as pool:
+            results = pool.map(verify, replays, max(1, len(replays) // (4 * processes)))
+    else:
+        results = [verify(replay) for replay in replays]
+    return [i for i, ok in enumerate(results) if not ok]
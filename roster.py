@@ -0,0 +1,114 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+from elements import Element
+
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from monster_base import MonsterBase
+
+
+class RosterIndex:
+    """
+    Lookup tables over the monster roster, built once when the roster is loaded.
+
+    Usage:
+    ```
+    index = get_roster_index()                   # from helpers
+    index.get("Flamikin")                        # Flamikin class
+    index.of_element(Element.FIRE)               # ArrayR of all fire monster classes
+    index.spawnable()                            # ArrayR of classes that can be spawned
+    index.evolution_chain(Flamikin)              # [Flamikin, Infernoth, Infernox]
+    index.evolution_depth(Infernoth)             # 1
+    index.class_id(Aquariuma)                    # 3, its position in the roster
+    ```
+    All lookups are O(1); the returned arrays are shared and should not be modified.
+    """
+
+    def __init__(self, monsters: ArrayR[type[MonsterBase]]) -> None:
+        """
+        Build the index for the given roster.
+        :complexity: O(n) where n is the number of monster classes.
+        """
+        self.monsters = monsters
+        self.by_name: dict[str, type[MonsterBase]] = {}
+        # Position of each class in the roster, a compact id for it.
+        self.class_ids: dict[str, int] = {}
+        element_lists: dict[Element, list[type[MonsterBase]]] = {}
+        spawnable = []
+        evolves_from: dict[str, type[MonsterBase]] = {}
+
+        for i, monster in enumerate(monsters):
+            self.by_name[monster.get_name()] = monster
+            self.class_ids[monster.get_name()] = i
+            element_lists.setdefault(Element.from_string(monster.get_element()), []).append(monster)
+            if monster.can_be_spawned():
+                spawnable.append(monster)
+            evolution = monster.get_evolution()
+            if evolution is not None:
+                evolves_from[evolution.get_name()] = monster
+
+        self.by_element: dict[Element, ArrayR[type[MonsterBase]]] = {
+            element: ArrayR.from_list(classes) for element, classes in element_lists.items()
+        }
+        self.spawnable_monsters: ArrayR[type[MonsterBase]] = ArrayR.from_list(spawnable)
+
+        # Walk each chain once from its base form, sharing the resulting array across its members.
+        self.chains: dict[str, ArrayR[type[MonsterBase]]] = {}
+        self.depths: dict[str, int] = {}
+        for monster in monsters:
+            if monster.get_name() in evolves_from:
+                continue
+            chain = []
+            current = monster
+            while current is not None and current.get_name() not in self.depths:
+                self.depths[current.get_name()] = len(chain)
+                chain.append(current)
+                current = current.get_evolution()
+            chain_array = ArrayR.from_list(chain)
+            for member in chain:
+                self.chains[member.get_name()] = chain_array
+
+    def __len__(self) -> int:
+        return len(self.monsters)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def get(self, name: str) -> type[MonsterBase]:
+        """Returns the monster class with the given name."""
+        try:
+            return self.by_name[name]
+        except KeyError:
+            raise ValueError(f"Unexpected monster {name}") from None
+
+    def class_id(self, monster: type[MonsterBase] | str) -> int:
+        """Returns the position of this monster class in the roster."""
+        name = monster if isinstance(monster, str) else monster.get_name()
+        self.get(name)
+        return self.class_ids[name]
+
+    def by_class_id(self, class_id: int) -> type[MonsterBase]:
+        """Returns the monster class at this position in the roster."""
+        return self.monsters[class_id]
+
+    def of_element(self, element: Element) -> ArrayR[type[MonsterBase]]:
+        """Returns all monster classes of the given element, in roster order."""
+        return self.by_element.get(element, ArrayR(0))
+
+    def spawnable(self) -> ArrayR[type[MonsterBase]]:
+        """Returns all monster classes that can be spawned, in roster order."""
+        return self.spawnable_monsters
+
+    def evolution_chain(self, monster: type[MonsterBase] | str) -> ArrayR[type[MonsterBase]]:
+        """Returns the full evolution chain containing this monster, from base form to final form."""
+        name = monster if isinstance(monster, str) else monster.get_name()
+        self.get(name)
+        return self.chains[name]
+
+    def evolution_depth(self, monster: type[MonsterBase] | str) -> int:
+        """Returns how many evolutions this monster is from its base form (0 for base forms)."""
+        name = monster if isinstance(monster, str) else monster.get_name()
+        self.get(name)
+        return self.depths[name]
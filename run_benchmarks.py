@@ -0,0 +1,96 @@
+import argparse
+import json
+import sys
+
+from benchmarks.harness import compare_to_baseline, format_seconds, load_report, run_benchmarks
+
+# Importing the modules registers their benchmarks.
+import benchmarks.bench_battle
+import benchmarks.bench_data_structures
+import benchmarks.bench_helpers
+import benchmarks.bench_stats
+import benchmarks.bench_team
+import benchmarks.bench_tower
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument(
+        "pattern",
+        help=(
+            "Only run benchmarks whose name contains this string. "
+            "Leave blank for all benchmarks.\n\n"
+            "Example: run_benchmarks.py battle."
+        ),
+        default="",
+        nargs="?",
+    )
+    p.add_argument("-o", "--output", help="Write the JSON report to this file instead of stdout.")
+    p.add_argument("-b", "--baseline", help="A previous JSON report to compare against.")
+    p.add_argument(
+        "-t",
+        "--threshold",
+        help="Relative slowdown against the baseline that counts as a regression. Default 0.1 (10%%).",
+        type=float,
+        default=0.1,
+    )
+    p.add_argument("-r", "--repeat", help="Samples per benchmark. Default 5.", type=int, default=5)
+    p.add_argument("--min-time", help="Minimum seconds per sample. Default 0.2.", type=float, default=0.2)
+    p.add_argument("-l", "--list", help="List the benchmark names and exit.", action="store_true")
+    p.add_argument(
+        "-m",
+        "--memory",
+        help="Instead of timing, report the memory used by a tower with this many enemy teams.",
+        type=int,
+        metavar="TEAMS",
+    )
+    p.add_argument("--battles", help="Battles to play in the --memory tower. Default 5.", type=int, default=5)
+    p.add_argument(
+        "-s",
+        "--server",
+        help="Instead of timing, load a local battle server with this many requests, batched and unbatched.",
+        type=int,
+        metavar="REQUESTS",
+    )
+    p.add_argument("--connections", help="Client connections for --server. Default 8.", type=int, default=8)
+    p.add_argument("-j", "--jobs", help="Server worker processes for --server. Default 1.", type=int, default=1)
+    p.add_argument("--teams", help="Distinct teams to draw --server requests from. Default: all new.", type=int)
+    args = p.parse_args()
+
+    if args.list:
+        from benchmarks.harness import BENCHMARKS
+        print("\n".join(sorted(BENCHMARKS)))
+        sys.exit(0)
+
+    log = lambda line: print(line, file=sys.stderr)
+    if args.memory is not None:
+        from benchmarks.memory import format_memory_report, tower_memory_report
+        report = {"memory": tower_memory_report(args.memory, args.battles)}
+        log(format_memory_report(report["memory"]))
+    elif args.server is not None:
+        from benchmarks.server_load import format_server_load_report, server_load_report
+        report = {"server": server_load_report(args.server, args.connections, args.jobs, args.teams)}
+        log(format_server_load_report(report["server"]))
+    else:
+        report = run_benchmarks(args.pattern, args.repeat, args.min_time, log=log)
+
+    regressions = []
+    if args.baseline and "benchmarks" in report:
+        comparison = compare_to_baseline(report, load_report(args.baseline), args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "results": comparison}
+        for name, result in comparison.items():
+            flag = "REGRESSION" if result["regression"] else ""
+            log(f"{name:<45} {format_seconds(result['baseline_s']):>10} -> {format_seconds(result['current_s']):>10}  x{result['ratio']:.2f} {flag}")
+            if result["regression"]:
+                regressions.append(name)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=4))
+
+    if regressions:
+        log(f"{len(regressions)} regression(s) past {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
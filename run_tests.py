@@ -1,9 +1,13 @@
 import argparse
+import json
 import re
+import sys
+import time
 import unittest
 from io import StringIO
 
 from ed_utils.json_test_runner import JSONTestRunner
+from ed_utils.parallel_runner import ParallelTestRunner
 
 if __name__ == "__main__":
 
@@ -31,6 +35,22 @@ if __name__ == "__main__":
         help="Use if running on Ed.",
         action="store_true",
     )
+    p.add_argument(
+        "-j",
+        "--jobs",
+        help=(
+            "Run the test modules in this many worker processes. "
+            "0 uses one per CPU. Leave out to run serially."
+        ),
+        type=int,
+    )
+    p.add_argument(
+        "-t",
+        "--timeout",
+        help="In parallel mode, seconds allowed for tests without a @timeout. Default 60.",
+        type=float,
+        default=60,
+    )
     args = p.parse_args()
 
     suite = unittest.defaultTestLoader.discover('test_actual' if args.for_ed else '.')
@@ -47,7 +67,26 @@ if __name__ == "__main__":
                     marked_remove.add(t2)
             for t2 in marked_remove:
                 t._tests.remove(t2)
-    if args.for_ed:
+    if args.jobs is not None:
+        start = time.perf_counter()
+        runner = ParallelTestRunner(jobs=args.jobs or None, default_timeout=args.timeout)
+        results = runner.run(suite)
+        if args.for_ed:
+            print(json.dumps(results, indent=4))
+        else:
+            failed = [r for r in results["testcases"] if not r["passed"]]
+            for r in failed:
+                print(f"FAIL: {r['name']} ({r['duration']:.3f}s)")
+                print(r["feedback"])
+            slowest = sorted(results["testcases"], key=lambda r: -r["duration"])[:5]
+            print("Slowest tests:")
+            for r in slowest:
+                print(f"  {r['duration']:.3f}s {r['name']}")
+            skipped = sum(1 for r in results["testcases"] if "skipped" in r)
+            print(f"Ran {len(results['testcases'])} tests in {time.perf_counter() - start:.3f}s with {runner.jobs} workers")
+            print(f"FAILED (failures={len(failed)})" if failed else "OK" + (f" (skipped={skipped})" if skipped else ""))
+            sys.exit(1 if failed else 0)
+    elif args.for_ed:
         f = StringIO("")
         runner = JSONTestRunner(stream=f)
         runner.run(suite)
@@ -55,4 +94,4 @@ if __name__ == "__main__":
         print(f.getvalue())
     else:
         runner = unittest.runner.TextTestRunner()
-        runner.run(suite)
+        sys.exit(not runner.run(suite).wasSuccessful())
@@ -0,0 +1,243 @@
+"""
+asyncio sessions for interactive battles.
+
+A BattleSession runs one battle between two clients, each choosing its team and then an
+action every turn, all awaited, so a single event loop can host many sessions at once while
+their players think. Turns themselves are resolved by resolve_turn, on the battle's state as
+a BattleSnapshot; given an executor (see worker_pool), that CPU-bound work runs in worker
+processes, with the state sent over in its compact bytes form.
+
+Clients implement BattleClient. ScriptedClient is an in-process stand-in for a remote
+player, answering from a fixed team and a policy (or a script of actions).
+
+Usage:
+```
+async def main():
+    with worker_pool(4) as pool:
+        sessions = [
+            BattleSession(ScriptedClient([Flamikin, Vineon]), ScriptedClient([Aquariuma]), executor=pool)
+            for _ in range(100)
+        ]
+        return await play_sessions(sessions)
+
+results = asyncio.run(main())
+```
+"""
+from __future__ import annotations
+import abc
+import asyncio
+from concurrent.futures import Executor
+from typing import Iterable, Optional, TYPE_CHECKING
+
+import helpers
+from battle import Battle, BattleSnapshot
+from policies import HeuristicPolicy
+from random_gen import RandomGen
+from team import MonsterTeam
+
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from helpers import DataSnapshot
+    from monster_base import MonsterBase
+    from policies import ActionPolicy
+
+# The battle a process resolves turns on, reused from turn to turn.
+_turn_battle: Optional[Battle] = None
+
+
+def resolve_turn(
+    state: BattleSnapshot,
+    action_team1: Battle.Action,
+    action_team2: Battle.Action,
+    max_turns: Optional[int] = None,
+) -> tuple[BattleSnapshot, Optional[Battle.Result], list[tuple]]:
+    """
+    Play one turn from the given state with the given actions.
+    Returns the state after it, the result if the battle is over, and the turn's events.
+    The turn runs on the state's RandomGen seed, and the caller's seed is put back afterwards.
+    :complexity: O(TEAM_LIMIT)
+    """
+    global _turn_battle
+    if _turn_battle is None:
+        _turn_battle = Battle(log_size=Battle.DEFAULT_LOG_SIZE)
+    battle = _turn_battle
+    battle.max_turns = max_turns
+    seed = RandomGen.seed
+    try:
+        battle.restore(state)
+        battle.log.drain()
+        result = battle.play_turn(action_team1, action_team2)
+        return battle.snapshot(), result, battle.log.drain().to_list()
+    finally:
+        RandomGen.seed = seed
+
+
+def _resolve_turn_in_worker(
+    state: bytes,
+    action_team1: Battle.Action,
+    action_team2: Battle.Action,
+    max_turns: Optional[int],
+) -> tuple[bytes, Optional[Battle.Result], list[tuple]]:
+    after, result, events = resolve_turn(BattleSnapshot.from_bytes(state), action_team1, action_team2, max_turns)
+    return after.to_bytes(), result, events
+
+
+def worker_pool(processes: Optional[int] = None) -> Executor:
+    """
+    A process pool to resolve turns in, for BattleSession's executor.
+    Use it as a context manager, so its workers are shut down afterwards.
+    """
+    return helpers.worker_executor(processes)
+
+
+class BattleClient(abc.ABC):
+    """One player of a BattleSession."""
+
+    @abc.abstractmethod
+    async def choose_team(self, spawnable: ArrayR[type[MonsterBase]]) -> Iterable[type[MonsterBase]]:
+        """The monster classes of the player's team, in order, from those that can be spawned."""
+        pass
+
+    @abc.abstractmethod
+    async def choose_action(self, state: BattleSnapshot, team: int) -> Battle.Action:
+        """The player's action this turn, as team 1 or 2 of the battle in this state."""
+        pass
+
+    async def notify(self, message: str) -> None:
+        """Tell the player something: a rejected choice, what happened in a turn, or the result."""
+        pass
+
+
+class ScriptedClient(BattleClient):
+    """
+    In-process stand-in for a player. Picks a fixed team, then answers each turn with the
+    next of `actions` if given, otherwise with what `policy` (default: the team's own
+    choose_action) would do. Waits `delay` seconds before each answer, like a player would,
+    and keeps every message it is sent in `messages`.
+    """
+
+    def __init__(
+        self,
+        classes: Iterable[type[MonsterBase]],
+        policy: Optional[ActionPolicy] = None,
+        actions: Optional[Iterable[Battle.Action]] = None,
+        delay: float = 0.0,
+    ) -> None:
+        self.classes = list(classes)
+        self.policy = policy or HeuristicPolicy()
+        self.actions = iter(actions) if actions is not None else None
+        self.delay = delay
+        self.messages: list[str] = []
+
+    async def choose_team(self, spawnable: ArrayR[type[MonsterBase]]) -> Iterable[type[MonsterBase]]:
+        await asyncio.sleep(self.delay)
+        return self.classes
+
+    async def choose_action(self, state: BattleSnapshot, team: int) -> Battle.Action:
+        await asyncio.sleep(self.delay)
+        if self.actions is not None:
+            return next(self.actions)
+        battle = Battle(log_size=0)
+        battle.restore(state, rng=False)
+        return self.policy.choose_action(battle, team)
+
+    async def notify(self, message: str) -> None:
+        self.messages.append(message)
+
+
+class BattleSession:
+    """
+    One battle between two clients. Team selection follows the rules of
+    MonsterTeam.select_manually: 1 to TEAM_LIMIT spawnable monsters, asking again after an
+    invalid choice. Each turn both clients choose their action concurrently.
+
+    :executor: where to resolve turns. None resolves them on the event loop itself, which
+        is quickest for a few sessions; a worker_pool keeps the loop free for many.
+    :action_timeout: seconds a client has to choose an action, after which its team's own
+        choose_action is used instead. None waits as long as it takes.
+
+    The session plays on the game data that is current when it starts (see helpers.DataSnapshot),
+    even if the registry is reloaded while it runs. Clients name their monsters by class, and
+    classes from any version of the data are taken by name.
+    """
+
+    def __init__(
+        self,
+        client1: BattleClient,
+        client2: BattleClient,
+        team_mode: MonsterTeam.TeamMode = MonsterTeam.TeamMode.BACK,
+        sort_key: Optional[MonsterTeam.SortMode] = None,
+        max_turns: Optional[int] = 1000,
+        executor: Optional[Executor] = None,
+        action_timeout: Optional[float] = None,
+    ) -> None:
+        if team_mode == MonsterTeam.TeamMode.OPTIMISE and sort_key is None:
+            raise ValueError("TeamMode.OPTIMISE needs a sort_key.")
+        self.clients = (client1, client2)
+        self.team_mode = team_mode
+        self.sort_key = sort_key
+        self.max_turns = max_turns
+        self.executor = executor
+        self.action_timeout = action_timeout
+        self.state: Optional[BattleSnapshot] = None
+        self.result: Optional[Battle.Result] = None
+        self.game_data: Optional[DataSnapshot] = None
+
+    async def play(self) -> Battle.Result:
+        """Run the whole session: team selection, then turns until there is a result."""
+        self.game_data = helpers.registry.current()
+        team1, team2 = await asyncio.gather(self.select_team(self.clients[0]), self.select_team(self.clients[1]))
+        battle = Battle(log_size=0)
+        battle.start(team1, team2)
+        # Teams were chosen from this session's data, even if a reload happened meanwhile.
+        battle.game_data = self.game_data
+        self.state = battle.snapshot()
+        while self.result is None:
+            actions = await asyncio.gather(self.request_action(1), self.request_action(2))
+            self.state, self.result, events = await self.resolve(*actions)
+            text = "\n".join(Battle.describe_event(event) for event in events)
+            await asyncio.gather(*(client.notify(text) for client in self.clients))
+        return self.result
+
+    async def select_team(self, client: BattleClient) -> MonsterTeam:
+        index = (self.game_data or helpers.registry.current()).index
+        while True:
+            classes = list(await client.choose_team(index.spawnable()))
+            if not 1 <= len(classes) <= MonsterTeam.TEAM_LIMIT:
+                await client.notify(f"A team has between 1 and {MonsterTeam.TEAM_LIMIT} monsters.")
+                continue
+            # This session's version of each class, found by name.
+            classes = [index.by_name.get(getattr(cls, "get_name", str)()) for cls in classes]
+            if not all(cls is not None and cls.can_be_spawned() for cls in classes):
+                await client.notify("This monster cannot be spawned.")
+            else:
+                return MonsterTeam(self.team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list(classes), sort_key=self.sort_key)
+
+    async def request_action(self, team: int) -> Battle.Action:
+        client = self.clients[team - 1]
+        while True:
+            try:
+                action = await asyncio.wait_for(client.choose_action(self.state, team), self.action_timeout)
+            except asyncio.TimeoutError:
+                await client.notify("Out of time, your team chooses for you.")
+                battle = Battle(log_size=0)
+                battle.restore(self.state, rng=False)
+                return HeuristicPolicy().choose_action(battle, team)
+            if isinstance(action, Battle.Action):
+                return action
+            await client.notify(f"{action!r} is not an action.")
+
+    async def resolve(self, action_team1: Battle.Action, action_team2: Battle.Action) -> tuple[BattleSnapshot, Optional[Battle.Result], list[tuple]]:
+        if self.executor is None:
+            return resolve_turn(self.state, action_team1, action_team2, self.max_turns)
+        loop = asyncio.get_running_loop()
+        state, result, events = await loop.run_in_executor(
+            self.executor, _resolve_turn_in_worker, self.state.to_bytes(), action_team1, action_team2, self.max_turns,
+        )
+        return BattleSnapshot.from_bytes(state, self.state.game_data), result, events
+
+
+async def play_sessions(sessions: Iterable[BattleSession]) -> list[Battle.Result]:
+    """Play many sessions at once on the running event loop, returning their results in order."""
+    return list(await asyncio.gather(*(session.play() for session in sessions)))
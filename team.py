@@ -1,16 +1,20 @@
 from __future__ import annotations
+import struct
 from enum import auto
-from typing import Optional, TYPE_CHECKING
+from operator import methodcaller
+from typing import NamedTuple, Optional, TYPE_CHECKING
 
 from base_enum import BaseEnum
-from monster_base import MonsterBase
+from monster_base import MonsterBase, MonsterState
 from random_gen import RandomGen
-from helpers import get_all_monsters
+from helpers import get_all_monsters, get_roster_index
+from profiling import profiler
 
 from data_structures.referential_array import ArrayR
 
 if TYPE_CHECKING:
     from battle import Battle
+    from roster import RosterIndex
 
 class MonsterTeam:
 
@@ -34,8 +38,25 @@ class MonsterTeam:
         SPEED = auto()
         LEVEL = auto()
 
+    SORT_KEYS = {
+        SortMode.HP: methodcaller("get_hp"),
+        SortMode.ATTACK: methodcaller("get_attack"),
+        SortMode.DEFENSE: methodcaller("get_defense"),
+        SortMode.SPEED: methodcaller("get_speed"),
+        SortMode.LEVEL: methodcaller("get_level"),
+    }
+
     TEAM_LIMIT = 6
 
+    # The team's TeamSnapshot, kept until the team next changes. See snapshot.
+    _snapshot: Optional[TeamSnapshot] = None
+
+    # Fingerprint layout: a header of (team mode, sort mode or 0, size), then for each monster
+    # in order (class id, simple mode, original level, level, hp).
+    _FINGERPRINT_HEADER = struct.Struct("<BBB")
+    _FINGERPRINT_MONSTER = struct.Struct("<HBHHi")
+    MONSTER_FINGERPRINT_SIZE = _FINGERPRINT_MONSTER.size
+
     def __init__(self, team_mode: TeamMode, selection_mode, **kwargs) -> None:
         # Add any preinit logic here.
         self.team_mode = team_mode
@@ -56,25 +77,19 @@ class MonsterTeam:
             raise ValueError(f"selection_mode {selection_mode} not supported.")
 
     def _get_sort_key_method(self):
-        if self.sort_key == self.SortMode.HP:
-            return lambda monster: monster.get_hp()
-        elif self.sort_key == self.SortMode.ATTACK:
-            return lambda monster: monster.get_attack()
-        elif self.sort_key == self.SortMode.DEFENSE:
-            return lambda monster: monster.get_defense()
-        elif self.sort_key == self.SortMode.SPEED:
-            return lambda monster: monster.get_speed()
-        elif self.sort_key == self.SortMode.LEVEL:
-            return lambda monster: monster.get_level()
-        
+        return self.SORT_KEYS.get(self.sort_key)
+
     def add_to_team(self, monster: MonsterBase):
         if self.current_size >= self.TEAM_LIMIT:
             raise ValueError("Team is already at maximum capacity.")
+        self._snapshot = None
 
         if self.team_mode == self.TeamMode.FRONT:
             for i in range(self.current_size, 0, -1):
                 self.monster_order[i] = self.monster_order[i - 1]
             self.monster_order[0] = monster
+            if profiler.enabled:
+                profiler.count("team.shifts", self.current_size)
         elif self.team_mode == self.TeamMode.BACK:
             self.monster_order[self.current_size] = monster
         elif self.team_mode == self.TeamMode.OPTIMISE:
@@ -94,10 +109,13 @@ class MonsterTeam:
 
             # Insert the monster at the correct position
             self.monster_order[insert_position] = monster
+            if profiler.enabled:
+                profiler.count("team.shifts", self.current_size - insert_position)
 
         self.current_size += 1
 
     def retrieve_from_team(self) -> MonsterBase:
+        self._snapshot = None
         if self.current_size == 0:
             return self.monster_order[0]
 
@@ -115,11 +133,14 @@ class MonsterTeam:
             for i in range(self.current_size - 1):
                 self.monster_order[i] = self.monster_order[i + 1]
 
+        if profiler.enabled:
+            profiler.count("team.shifts", self.current_size - 1)
         self.current_size -= 1
 
         return retrieved_monster
 
     def special(self) -> None:
+        self._snapshot = None
         middle_index = self.current_size // 2
 
         if self.team_mode == self.TeamMode.FRONT:
@@ -141,16 +162,17 @@ class MonsterTeam:
         elif self.team_mode == self.TeamMode.OPTIMISE:
             sort_key_method = self._get_sort_key_method()  # Retrieve the appropriate method
 
+            # Only the monsters still in the team: slots past current_size hold retrieved ones.
             index_dict = {
-                monster: sort_key_method(monster)
-                for monster in self.monster_order
-                if monster is not None
+                self.monster_order[i]: sort_key_method(self.monster_order[i])
+                for i in range(self.current_size)
             }
             monsters = sorted(index_dict, key=lambda x: index_dict[x])
             for i, monster in enumerate(monsters):
                 self.monster_order[i] = monster
 
     def regenerate_team(self) -> None:
+        self._snapshot = None
         if self.provided_monsters:
             for i in range(self.TEAM_LIMIT):
                 self.monster_order[i] = None
@@ -173,28 +195,18 @@ class MonsterTeam:
             self.monster_order[i].level = 1  # Reset to level 1
             self.monster_order[i].hp = self.monster_order[i].get_max_hp()  # Restore full health
 
-    def select_randomly(self, sort_key=None):
+    def select_randomly(self, sort_key=None, spawnable=None):
+        """
+        :spawnable: the classes to draw from, for a caller holding on to one version of the
+            game data (see helpers.DataSnapshot). Default: the current roster's.
+        """
         self.sort_key = sort_key
 
         team_size = RandomGen.randint(1, self.TEAM_LIMIT)
-        monsters = get_all_monsters()
-        n_spawnable = 0
-        for x in range(len(monsters)):
-            if monsters[x].can_be_spawned():
-                n_spawnable += 1
-
+        if spawnable is None:
+            spawnable = get_roster_index().spawnable()
         for _ in range(team_size):
-            spawner_index = RandomGen.randint(0, n_spawnable-1)
-            cur_index = -1
-            for x in range(len(monsters)):
-                if monsters[x].can_be_spawned():
-                    cur_index += 1
-                    if cur_index == spawner_index:
-                        # Spawn this monster
-                        self.add_to_team(monsters[x]())
-                        break
-            else:
-                raise ValueError("Spawning logic failed.")
+            self.add_to_team(RandomGen.random_choice(spawnable)())
 
     def select_manually(self, sort_key=None):
         """
@@ -357,10 +369,235 @@ class MonsterTeam:
             return Battle.Action.ATTACK
         return Battle.Action.SWAP
 
+    def snapshot(self) -> TeamSnapshot:
+        """
+        The team's current state as an immutable value. Until the team next changes, the
+        same snapshot is returned again, so snapshots of an unchanged team share it.
+        Changes are tracked through the team's methods; a monster swapped into monster_order
+        directly, or a waiting monster whose HP is set directly, is not noticed.
+        :complexity: O(n) where n is the size of the team, O(1) if it hasn't changed.
+        """
+        # An empty team keeps its last monster in slot 0, which retrieve_from_team returns
+        # again. That may be the monster out in battle, changing every turn, so it is always
+        # captured afresh.
+        if self._snapshot is None or self.current_size == 0:
+            held = max(self.current_size, 1) if self.monster_order[0] is not None else 0
+            self._snapshot = TeamSnapshot(
+                self.team_mode,
+                getattr(self, "sort_key", None),
+                self.provided_monsters,
+                self.current_size,
+                tuple(self.monster_order[i].state() for i in range(held)),
+            )
+        return self._snapshot
+
+    def restore(self, snapshot: TeamSnapshot) -> None:
+        """
+        Put the team back in the state of the snapshot, with new monster instances. Does
+        nothing if the team hasn't changed since it took (or was restored from) this snapshot.
+        :complexity: O(n) where n is the size of the team, O(1) if it hasn't changed.
+        """
+        if self._snapshot is snapshot and self.current_size > 0:
+            return
+        self.team_mode = snapshot.team_mode
+        self.sort_key = snapshot.sort_key
+        self.provided_monsters = snapshot.provided_monsters
+        self.current_size = snapshot.current_size
+        monsters = [MonsterBase.from_state(state) for state in snapshot.monsters]
+        self.monster_order = ArrayR.from_list(monsters + [None] * (self.TEAM_LIMIT - len(monsters)))
+        self._snapshot = snapshot
+
+    @classmethod
+    def from_snapshot(cls, snapshot: TeamSnapshot) -> MonsterTeam:
+        """A new team in the state of the snapshot. :complexity: O(n) where n is the size of the team."""
+        team = cls.__new__(cls)
+        team.restore(snapshot)
+        return team
+
+    @classmethod
+    def state_fingerprint(cls, state: MonsterState, index: Optional[RosterIndex] = None) -> bytes:
+        """
+        A compact key for a monster's state: its class, stat mode, original level, level and HP.
+        :index: the roster to number classes by. Default: the current one.
+        """
+        monster_cls, simple_mode, original_level, level, hp = state
+        class_id = (index or get_roster_index()).class_ids[monster_cls.get_name()]
+        return cls._FINGERPRINT_MONSTER.pack(class_id, simple_mode, original_level, level, hp)
+
+    @classmethod
+    def state_from_fingerprint(cls, fingerprint: bytes, offset: int = 0, index: Optional[RosterIndex] = None) -> MonsterState:
+        """The monster state whose fingerprint starts at `offset`, with its class from `index` (default: the current roster)."""
+        class_id, simple_mode, original_level, level, hp = cls._FINGERPRINT_MONSTER.unpack_from(fingerprint, offset)
+        return (index or get_roster_index()).by_class_id(class_id), bool(simple_mode), original_level, level, hp
+
+    @classmethod
+    def monster_fingerprint(cls, monster: MonsterBase) -> bytes:
+        return cls.state_fingerprint(monster.state())
+
+    @classmethod
+    def monster_from_fingerprint(cls, fingerprint: bytes, offset: int = 0) -> MonsterBase:
+        """Rebuild the monster whose fingerprint starts at `offset`."""
+        return MonsterBase.from_state(cls.state_from_fingerprint(fingerprint, offset))
+
+    def fingerprint(self) -> bytes:
+        """
+        A compact key for the team's current state: its mode, sort mode, and the state of
+        each monster in order (see monster_fingerprint). Teams have equal fingerprints
+        exactly when they are equal.
+        :complexity: O(n) where n is the size of the team.
+        """
+        sort_key = getattr(self, "sort_key", None)
+        parts = [self._FINGERPRINT_HEADER.pack(self.team_mode.value, 0 if sort_key is None else sort_key.value, self.current_size)]
+        for i in range(self.current_size):
+            parts.append(self.monster_fingerprint(self.monster_order[i]))
+        return b"".join(parts)
+
+    @classmethod
+    def from_fingerprint(cls, fingerprint: bytes) -> MonsterTeam:
+        """
+        Rebuild a team from its fingerprint. The team has no provided_monsters, so
+        regenerate_team restores its monsters in place rather than respawning them.
+        :complexity: O(n) where n is the size of the team.
+        """
+        mode, sort_key, size = cls._FINGERPRINT_HEADER.unpack_from(fingerprint)
+        if len(fingerprint) != cls._FINGERPRINT_HEADER.size + size * cls._FINGERPRINT_MONSTER.size:
+            raise ValueError("Malformed team fingerprint.")
+        # The monsters may have evolved, so bypass __init__, which only accepts spawnable ones.
+        team = cls.__new__(cls)
+        team.team_mode = cls.TeamMode(mode)
+        team.sort_key = cls.SortMode(sort_key) if sort_key else None
+        team.provided_monsters = None
+        team.monster_order = ArrayR(cls.TEAM_LIMIT)
+        team.current_size = size
+        offset = cls._FINGERPRINT_HEADER.size
+        for i in range(size):
+            team.monster_order[i] = cls.monster_from_fingerprint(fingerprint, offset)
+            offset += cls._FINGERPRINT_MONSTER.size
+        return team
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MonsterTeam):
+            return NotImplemented
+        return self.fingerprint() == other.fingerprint()
+
+    # Teams are mutable, so they are unhashable; key on fingerprint() (or TeamInterner ids) instead.
+    __hash__ = None
+
+    def __str__(self) -> str:
+        monsters = ", ".join(str(self.monster_order[i]) for i in range(self.current_size))
+        return f"{self.team_mode.name} team [{monsters}]"
+
     def __len__(self) -> int:
         return self.current_size
     
 
+# TeamSnapshot.to_bytes header: team mode, sort mode or 0, current size, monsters held,
+# and the number of provided monster classes (NO_PROVIDED_MONSTERS for none).
+_TEAM_SNAPSHOT_HEADER = struct.Struct("<BBBBB")
+_CLASS_ID = struct.Struct("<H")
+NO_PROVIDED_MONSTERS = 0xFF
+
+
+class TeamSnapshot(NamedTuple):
+    """An immutable copy of a MonsterTeam's state; see MonsterTeam.snapshot."""
+
+    team_mode: MonsterTeam.TeamMode
+    sort_key: Optional[MonsterTeam.SortMode]
+    provided_monsters: Optional[ArrayR[type[MonsterBase]]]
+    current_size: int
+    # States of the monsters in monster_order, first to last (plus slot 0 of an empty team).
+    monsters: tuple[MonsterState, ...]
+
+    def to_bytes(self, index: Optional[RosterIndex] = None) -> bytes:
+        """
+        The snapshot in a compact form that can be sent to other processes, with monster
+        classes as roster class ids (see MonsterTeam.fingerprint).
+        :index: the roster to number classes by. Default: the current one.
+        :complexity: O(n) where n is the size of the team.
+        """
+        index = index or get_roster_index()
+        provided = NO_PROVIDED_MONSTERS if self.provided_monsters is None else len(self.provided_monsters)
+        parts = [_TEAM_SNAPSHOT_HEADER.pack(
+            self.team_mode.value, 0 if self.sort_key is None else self.sort_key.value,
+            self.current_size, len(self.monsters), provided,
+        )]
+        parts.extend(MonsterTeam.state_fingerprint(state, index) for state in self.monsters)
+        if self.provided_monsters is not None:
+            parts.extend(_CLASS_ID.pack(index.class_id(cls)) for cls in self.provided_monsters)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, offset: int = 0, index: Optional[RosterIndex] = None) -> tuple[TeamSnapshot, int]:
+        """The snapshot encoded at `offset`, and the offset just past it. Classes come from `index` (default: the current roster)."""
+        index = index or get_roster_index()
+        mode, sort_key, size, held, provided = _TEAM_SNAPSHOT_HEADER.unpack_from(data, offset)
+        offset += _TEAM_SNAPSHOT_HEADER.size
+        monsters = []
+        for _ in range(held):
+            monsters.append(MonsterTeam.state_from_fingerprint(data, offset, index))
+            offset += MonsterTeam.MONSTER_FINGERPRINT_SIZE
+        provided_monsters = None
+        if provided != NO_PROVIDED_MONSTERS:
+            classes = []
+            for _ in range(provided):
+                classes.append(index.by_class_id(_CLASS_ID.unpack_from(data, offset)[0]))
+                offset += _CLASS_ID.size
+            provided_monsters = ArrayR.from_list(classes)
+        snapshot = cls(
+            MonsterTeam.TeamMode(mode),
+            MonsterTeam.SortMode(sort_key) if sort_key else None,
+            provided_monsters,
+            size,
+            tuple(monsters),
+        )
+        return snapshot, offset
+
+
+class TeamInterner:
+    """
+    Interning table of team fingerprints.
+
+    Each distinct fingerprint gets a small integer id, in order of first appearance, and a
+    single shared bytes object, so caches can key on team state without holding the
+    (mutable) teams themselves, and equal states are stored once however often they recur.
+
+    Usage:
+    ```
+    interner = TeamInterner()
+    team_id = interner.intern(team)              # same id for every equal team
+    interner.fingerprint(team_id)                # the canonical fingerprint
+    MonsterTeam.from_fingerprint(interner.fingerprint(team_id))
+    ```
+    """
+
+    def __init__(self) -> None:
+        self.ids: dict[bytes, int] = {}
+        self.fingerprints: list[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def __contains__(self, team: MonsterTeam | bytes) -> bool:
+        key = team if isinstance(team, bytes) else team.fingerprint()
+        return key in self.ids
+
+    def intern(self, team: MonsterTeam) -> int:
+        """The id of the team's current state. :complexity: O(n) where n is the size of the team."""
+        return self.intern_fingerprint(team.fingerprint())
+
+    def intern_fingerprint(self, fingerprint: bytes) -> int:
+        """The id of this fingerprint, adding it if new. :complexity: O(n) for a fingerprint of n bytes."""
+        team_id = self.ids.get(fingerprint)
+        if team_id is None:
+            team_id = self.ids[fingerprint] = len(self.fingerprints)
+            self.fingerprints.append(fingerprint)
+        return team_id
+
+    def fingerprint(self, team_id: int) -> bytes:
+        """The canonical fingerprint with this id. :complexity: O(1)"""
+        return self.fingerprints[team_id]
+
+
 if __name__ == "__main__":
     team = MonsterTeam(
         team_mode=MonsterTeam.TeamMode.OPTIMISE,
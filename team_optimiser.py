@@ -0,0 +1,152 @@
+from __future__ import annotations
+import os
+from typing import Callable, Iterable, Optional, TYPE_CHECKING
+
+import helpers
+from helpers import get_roster_index
+from team import MonsterTeam
+from win_rate import estimate_win_rate
+
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from monster_base import MonsterBase
+
+# The optimiser whose candidates a worker process evaluates, inherited when the pool forks.
+_worker_optimiser: Optional[TeamOptimiser] = None
+
+
+def _init_worker(optimiser: TeamOptimiser) -> None:
+    global _worker_optimiser
+    _worker_optimiser = optimiser
+
+
+def _score_in_worker(names: tuple[str, ...]) -> float:
+    return _worker_optimiser.score(names)
+
+
+class TeamOptimiser:
+    """
+    Searches the spawnable roster for the teams that do best against an opponent distribution.
+
+    A team's fitness is its score over a fixed set of `battles` seeded battles against
+    opponents from make_opponent (a win counts 1 and a draw 1/2). Every candidate plays the
+    same seeds, so differences between teams are not down to luckier opponents.
+    Fitness is memoised by team, as the search reaches the same teams many times.
+
+    The search is a beam search: it scores every one-monster team, then repeatedly extends
+    each of the beam_width best teams of the current size with every spawnable monster,
+    up to max_size monsters. Each size's candidates are evaluated as one batch, in parallel.
+
+    Usage:
+    ```
+    optimiser = TeamOptimiser(MonsterTeam.TeamMode.BACK, battles=50)
+    best = optimiser.search(top=5)                 # ArrayR of provided_monsters arrays, best first
+    team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=best[0])
+    optimiser.fitness(best[0])                     # its (memoised) score
+    ```
+    """
+
+    def __init__(
+        self,
+        team_mode: MonsterTeam.TeamMode = MonsterTeam.TeamMode.BACK,
+        make_opponent: Optional[Callable[[], MonsterTeam]] = None,
+        battles: int = 100,
+        seed: int = 0,
+        beam_width: int = 8,
+        max_size: int = MonsterTeam.TEAM_LIMIT,
+        sort_key: Optional[MonsterTeam.SortMode] = None,
+        processes: Optional[int] = None,
+        max_turns: int = 1000,
+    ) -> None:
+        """
+        :processes: worker processes to evaluate candidates with. Defaults to one per CPU;
+            1 (or a platform without fork) evaluates in this process.
+        """
+        if not 1 <= max_size <= MonsterTeam.TEAM_LIMIT:
+            raise ValueError(f"max_size should be between 1 and {MonsterTeam.TEAM_LIMIT}.")
+        if team_mode == MonsterTeam.TeamMode.OPTIMISE and sort_key is None:
+            raise ValueError("TeamMode.OPTIMISE needs a sort_key.")
+        self.team_mode = team_mode
+        self.make_opponent = make_opponent
+        self.battles = battles
+        self.seed = seed
+        self.beam_width = beam_width
+        self.max_size = max_size
+        self.sort_key = sort_key
+        self.processes = processes or os.cpu_count() or 1
+        self.max_turns = max_turns
+        self.scores: dict[tuple[str, ...], float] = {}
+        self._pool = None
+
+    def score(self, names: tuple[str, ...]) -> float:
+        """Simulate the fitness of the team made of the named monsters, in order. Not memoised."""
+        index = get_roster_index()
+        classes = ArrayR.from_iterable(index.get(name) for name in names)
+        estimate = estimate_win_rate(
+            lambda: MonsterTeam(self.team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=classes, sort_key=self.sort_key),
+            # A width of 1 is reached by the first batch, which is every battle.
+            target_width=1,
+            batch_size=self.battles,
+            max_battles=self.battles,
+            seed=self.seed,
+            make_opponent=self.make_opponent,
+            max_turns=self.max_turns,
+        )
+        return (estimate.wins + estimate.draws / 2) / estimate.battles
+
+    def evaluate(self, candidates: Iterable[tuple[str, ...]]) -> None:
+        """Compute the fitness of every candidate not already memoised, in parallel if possible."""
+        unseen = [names for names in dict.fromkeys(candidates) if names not in self.scores]
+        if self._pool is not None and len(unseen) > 1:
+            chunksize = max(1, len(unseen) // (4 * self.processes))
+            scores = self._pool.map(_score_in_worker, unseen, chunksize)
+        else:
+            scores = [self.score(names) for names in unseen]
+        self.scores.update(zip(unseen, scores))
+
+    def fitness(self, classes: ArrayR[type[MonsterBase]] | Iterable[type[MonsterBase]]) -> float:
+        """The memoised fitness of the team made of these monster classes, in order."""
+        names = tuple(cls.get_name() for cls in classes)
+        self.evaluate([names])
+        return self.scores[names]
+
+    def search(self, top: int = 10) -> ArrayR[ArrayR[type[MonsterBase]]]:
+        """
+        Run the beam search, returning the `top` teams found as provided_monsters arrays, best first.
+        :complexity: O(S * W * M) fitness evaluations, for S = max_size, W = beam_width
+            and M the number of spawnable monsters.
+        """
+        spawnable = [cls.get_name() for cls in get_roster_index().spawnable()]
+        self._start_pool()
+        try:
+            beam = [(name,) for name in spawnable]
+            self.evaluate(beam)
+            for _ in range(1, self.max_size):
+                beam = sorted(beam, key=self._rank_key)[:self.beam_width]
+                beam = [names + (name,) for names in beam for name in spawnable]
+                self.evaluate(beam)
+        finally:
+            self._stop_pool()
+        return self.ranked(top)
+
+    def ranked(self, top: int = 10) -> ArrayR[ArrayR[type[MonsterBase]]]:
+        """The `top` teams evaluated so far as provided_monsters arrays, best first."""
+        index = get_roster_index()
+        best = sorted(self.scores, key=self._rank_key)[:top]
+        return ArrayR.from_iterable(ArrayR.from_iterable(index.get(name) for name in names) for names in best)
+
+    def _rank_key(self, names: tuple[str, ...]) -> tuple[float, int, tuple[str, ...]]:
+        # Highest fitness first; ties go to smaller teams, then by name so the order is stable.
+        return -self.scores[names], len(names), names
+
+    def _start_pool(self) -> None:
+        if self.processes <= 1 or not helpers.can_fork():
+            return
+        self._pool = helpers.fork_pool(self.processes, _init_worker, (self,))
+
+    def _stop_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
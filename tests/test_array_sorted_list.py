@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.sorted_list_adt import ListItem
+
+def keys(sorted_list):
+    return [sorted_list[i].key for i in range(len(sorted_list))]
+
+class TestArraySortedList(TestCase):
+
+    @number("9.13")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_add_and_delete(self):
+        l = ArraySortedList(1)
+        for key in [5, 1, 3, 3, 9]:
+            l.add(ListItem(str(key), key))
+        self.assertListEqual(keys(l), [1, 3, 3, 5, 9])
+        l.delete_at_index(1)
+        self.assertListEqual(keys(l), [1, 3, 5, 9])
+        self.assertRaises(IndexError, lambda: l.__setitem__(0, ListItem("x", 100)))
+
+    @number("9.14")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_add_many_matches_add(self):
+        RandomGen.set_seed(1234)
+        items = [ListItem(i, RandomGen.randint(0, 50)) for i in range(200)]
+        one_by_one = ArraySortedList(0)
+        for item in items[:100]:
+            one_by_one.add(item)
+        for item in items[100:]:
+            one_by_one.add(item)
+        bulk = ArraySortedList(0)
+        bulk.add_many(items[:100])
+        bulk.add_many(items[100:])
+        self.assertEqual(len(bulk), 200)
+        self.assertListEqual(keys(bulk), keys(one_by_one))
+        self.assertListEqual(keys(bulk), sorted(item.key for item in items))
+        # Equal keys keep their insertion order in bulk loads.
+        fives = [bulk[i].value for i in range(bulk.bisect_left(5), bulk.bisect_right(5))]
+        self.assertListEqual(fives, [item.value for item in items if item.key == 5])
+
+    @number("9.15")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_merge(self):
+        a = ArraySortedList(2)
+        a.add_many(ListItem(k, k) for k in [1, 4, 7])
+        b = ArraySortedList(2)
+        b.add_many(ListItem(k, k) for k in [2, 4, 8, 9])
+        a.merge(b)
+        self.assertListEqual(keys(a), [1, 2, 4, 4, 7, 8, 9])
+        self.assertEqual(len(b), 4)
+
+    @number("9.16")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_contains_and_index(self):
+        l = ArraySortedList(4)
+        items = [ListItem(name, key) for name, key in [("a", 1), ("b", 2), ("c", 2), ("d", 3)]]
+        l.add_many(items)
+        for item in items:
+            self.assertIn(item, l)
+            self.assertEqual(l[l.index(item)], item)
+        missing = ListItem("e", 2)
+        self.assertNotIn(missing, l)
+        self.assertRaises(ValueError, lambda: l.index(missing))
+        l.remove(items[2])
+        self.assertNotIn(items[2], l)
+
+    @number("9.17")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_range_queries(self):
+        l = ArraySortedList(1)
+        l.add_many(ListItem(k, k) for k in [1, 3, 3, 5, 7, 9])
+        self.assertEqual(l.bisect_left(3), 1)
+        self.assertEqual(l.bisect_right(3), 3)
+        self.assertEqual(l.bisect_left(0), 0)
+        self.assertEqual(l.bisect_right(10), 6)
+        self.assertListEqual([item.key for item in l.range_query(3, 7)], [3, 3, 5])
+        self.assertEqual(len(l.range_query(8, 2)), 0)
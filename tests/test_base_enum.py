@@ -0,0 +1,41 @@
+from enum import auto
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from base_enum import BaseEnum
+from battle import Battle
+from team import MonsterTeam
+
+class TestBaseEnum(TestCase):
+
+    @number("8.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_equality(self):
+        self.assertEqual(Battle.Action.ATTACK, Battle.Action.ATTACK)
+        self.assertNotEqual(Battle.Action.ATTACK, Battle.Action.SWAP)
+        self.assertNotEqual(Battle.Action.ATTACK, Battle.Result.TEAM1)
+        self.assertNotEqual(Battle.Action.ATTACK, None)
+
+    @number("8.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_double_import(self):
+        # Mimics the same enum being imported from two different locations.
+        class Action(BaseEnum):
+            ATTACK = auto()
+            SWAP = auto()
+            SPECIAL = auto()
+        self.assertEqual(Action.ATTACK, Battle.Action.ATTACK)
+        self.assertNotEqual(Action.SWAP, Battle.Action.ATTACK)
+        self.assertEqual(hash(Action.SWAP), hash(Battle.Action.SWAP))
+
+    @number("8.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_dict_keys(self):
+        table = {action: action.name for action in Battle.Action}
+        self.assertEqual(table[Battle.Action.SPECIAL], "SPECIAL")
+        self.assertEqual(len({MonsterTeam.TeamMode.FRONT, MonsterTeam.TeamMode.FRONT, MonsterTeam.TeamMode.BACK}), 2)
@@ -133,3 +133,75 @@ class TestBattle(TestCase):
         ]
         res = b.battle(team1, team2)
         self.assertEqual(res, Battle.Result.DRAW)
+
+
+class TestBattleLog(TestCase):
+
+    def make_teams(self):
+        team1 = MonsterTeam(
+            team_mode=MonsterTeam.TeamMode.BACK,
+            selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+            provided_monsters=ArrayR.from_list([Flamikin, Aquariuma]),
+        )
+        team2 = MonsterTeam(
+            team_mode=MonsterTeam.TeamMode.BACK,
+            selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+            provided_monsters=ArrayR.from_list([Vineon, Strikeon]),
+        )
+        return team1, team2
+
+    @number("4.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_events_logged(self):
+        b = Battle()
+        res = b.battle(*self.make_teams())
+        events = b.log.snapshot()
+        self.assertEqual(events[0][2], Battle.Event.START)
+        self.assertEqual(events[len(events) - 1][2], Battle.Event.RESULT)
+        self.assertEqual(events[len(events) - 1][5], res.value)
+        for event in events:
+            self.assertEqual(len(event), 6)
+            self.assertEqual(event[0], 1)
+        self.assertIsInstance(Battle.describe_event(events[1]), str)
+
+    @number("4.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_log_keeps_last_events(self):
+        b = Battle(log_size=8)
+        b.battle(*self.make_teams())
+        b.battle(*self.make_teams())
+        events = b.log.snapshot()
+        self.assertEqual(len(events), 8)
+        self.assertGreater(b.log.dropped, 0)
+        self.assertEqual(events[7][0], 2)
+        last = b.last_turns(1)
+        self.assertGreater(len(last), 0)
+        for event in last:
+            self.assertEqual(event[:2], (2, b.turn_number))
+
+    @number("4.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_log_disabled(self):
+        b = Battle(log_size=0)
+        b.battle(*self.make_teams())
+        self.assertIsNone(b.log)
+        self.assertEqual(len(b.last_turns(3)), 0)
+
+    @number("4.7")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_flusher(self):
+        from battle_log import BattleLogFlusher
+        batches = []
+        b = Battle()
+        flusher = BattleLogFlusher(b.log, sink=lambda events: batches.append(events.to_list()), interval=0.01)
+        flusher.start()
+        b.battle(*self.make_teams())
+        flusher.stop()
+        flushed = [event for batch in batches for event in batch]
+        self.assertEqual(flushed[0][2], Battle.Event.START)
+        self.assertEqual(flushed[-1][2], Battle.Event.RESULT)
+        self.assertTrue(b.log.is_empty())
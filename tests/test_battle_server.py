@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from battle_server import BattleServer
+from helpers import get_roster_index
+from ladder import team_spec_key
+from team import MonsterTeam
+
+from data_structures.referential_array import ArrayR
+
+
+def random_specs(n, seed):
+    RandomGen.set_seed(seed)
+    spawnable = get_roster_index().spawnable()
+    return [
+        tuple(team_spec_key(MonsterTeam.TeamMode.BACK, [RandomGen.random_choice(spawnable) for _ in range(RandomGen.randint(1, 6))]) for _ in range(2))
+        for _ in range(n)
+    ]
+
+
+def direct_result(spec1, spec2, max_turns):
+    teams = []
+    for spec in (spec1, spec2):
+        mode, names = spec.split(":")
+        classes = [get_roster_index().get(name) for name in names.split(",")]
+        teams.append(MonsterTeam(MonsterTeam.TeamMode[mode], MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list(classes)))
+    battle = Battle(log_size=0, max_turns=max_turns)
+    return battle.battle(*teams).name, battle.turn_number
+
+
+async def exchange(address, messages):
+    """Send every message (pipelined) on one connection, returning the responses."""
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+    for message in messages:
+        writer.write((message if isinstance(message, str) else json.dumps(message)).encode() + b"\n")
+    await writer.drain()
+    responses = [json.loads(await reader.readline()) for _ in messages]
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+async def serve(server, *connections):
+    async with server:
+        return await asyncio.gather(*(exchange(server.address, messages) for messages in connections))
+
+
+class TestBattleServer(TestCase):
+
+    @number("22.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_matches_battle(self):
+        specs = random_specs(60, 3)
+        requests = [{"id": i, "team1": spec1, "team2": spec2, "seed": i} for i, (spec1, spec2) in enumerate(specs)]
+        random_teams = [{"id": f"r{i}", "team1": "BACK:*", "team2": "FRONT:*", "seed": i % 2} for i in range(4)]
+        first, second = asyncio.run(serve(BattleServer(), requests[::2] + random_teams, requests[1::2]))
+        for request, response in zip(requests[::2] + requests[1::2], first[:30] + second):
+            self.assertEqual(response["id"], request["id"])
+            self.assertEqual((response["result"], response["turns"]), direct_result(request["team1"], request["team2"], 100))
+        # Random teams are drawn from the seed.
+        outcomes = [(response["result"], response["turns"]) for response in first[30:]]
+        self.assertEqual(outcomes[:2], outcomes[2:])
+        self.assertNotEqual(outcomes[0], outcomes[1])
+
+    @number("22.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_errors(self):
+        messages = [
+            "not json",
+            {"id": 1, "team1": "BACK:Flamikin"},
+            {"id": 2, "team1": "BACK:Flamikn", "team2": "BACK:Flamikin"},
+            {"id": 3, "team1": "SIDEWAYS:Flamikin", "team2": "BACK:Flamikin"},
+            {"id": 4, "team1": "BACK:" + ",".join(["Flamikin"] * 7), "team2": "BACK:Flamikin"},
+            {"id": 5, "team1": "OPTIMISE:Flamikin", "team2": "BACK:Flamikin"},
+            {"id": 6, "team1": "BACK:Flamikin", "team2": "BACK:Flamikin", "seed": 1e400},
+            {"id": 7, "team1": "BACK:Flamikin", "team2": "BACK:Flamikin", "max_turns": 101},
+            {"id": 8, "team1": "BACK:Flamikin", "team2": "BACK:Flamikin", "max_turns": 0},
+            [1, 2],
+            "[" * 100_000,
+            {"id": 0, "team1": "BACK:" + "x" * 100_000, "team2": "BACK:Flamikin"},
+            {"id": 9, "team1": "BACK:Flamikin", "team2": "BACK:Aquariuma", "max_turns": 2},
+        ]
+        responses, = asyncio.run(serve(BattleServer(), messages))
+        self.assertEqual([response["id"] for response in responses], [None, 1, 2, 3, 4, 5, 6, 7, 8, None, None, None, 9])
+        for response in responses[:12]:
+            self.assertIn("error", response)
+        self.assertEqual(responses[2]["error"], "Unexpected monster Flamikn")
+        self.assertEqual(responses[7]["error"], "Malformed request: max_turns should be an integer from 1 to 100")
+        self.assertEqual(responses[11]["error"], "Malformed request: line too long")
+        # The connection carries on after bad requests.
+        self.assertEqual((responses[12]["result"], responses[12]["turns"]), direct_result("BACK:Flamikin", "BACK:Aquariuma", 2))
+
+    @number("22.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_batching(self):
+        specs = random_specs(20, 8)
+        # Every pair four times, with different seeds, which don't change a battle between given teams.
+        requests = [{"id": i, "team1": spec1, "team2": spec2, "seed": i} for i, (spec1, spec2) in enumerate(specs * 4)]
+        expected = [direct_result(spec1, spec2, 100) for spec1, spec2 in specs * 4]
+
+        server = BattleServer(batch_size=1000, max_delay=0.05)
+        responses, = asyncio.run(serve(server, requests))
+        self.assertEqual([(response["result"], response["turns"]) for response in responses], expected)
+        self.assertEqual(server.requests, 80)
+        self.assertLessEqual(server.battles, 20)
+        self.assertLess(server.batches, 10)
+
+        # Unix socket, worker processes, and no cache or batching.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "battles.sock")
+            server = BattleServer(path=path, batch_size=1, max_delay=0, processes=2, cache_size=0)
+            responses, = asyncio.run(serve(server, requests))
+            self.assertEqual([(response["result"], response["turns"]) for response in responses], expected)
+            self.assertEqual((server.batches, server.battles), (80, 80))
+            self.assertFalse(os.path.exists(path))
+
+    @number("22.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_failed_batch(self):
+        server = BattleServer()
+
+        async def fail(requests):
+            raise RuntimeError("worker died")
+
+        server._run = fail
+        request = {"id": 1, "team1": "BACK:Flamikin", "team2": "BACK:Aquariuma"}
+        first, second = asyncio.run(serve(server, [request], [request]))
+        self.assertEqual(first, [{"id": 1, "error": "The batch failed: RuntimeError('worker died')"}])
+        self.assertEqual(second, first)
+        # Failures aren't cached.
+        del server._run
+        responses, = asyncio.run(serve(server, [request]))
+        self.assertEqual((responses[0]["result"], responses[0]["turns"]), direct_result("BACK:Flamikin", "BACK:Aquariuma", 100))
@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle, BattleSnapshot
+from team import MonsterTeam
+
+
+def state(battle):
+    """Everything the rest of a battle depends on, including slot 0 of an emptied team."""
+    held = tuple(team.monster_order[0] and team.monster_order[0].state() for team in (battle.team1, battle.team2))
+    return battle.team1.fingerprint(), battle.team2.fingerprint(), battle.out1.state(), battle.out2.state(), held, battle.turn_number
+
+
+def started_battles(n, seed):
+    RandomGen.set_seed(seed)
+    for _ in range(n):
+        battle = Battle(log_size=0)
+        battle.team1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+        battle.team2 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.RANDOM)
+        battle.out1 = battle.team1.retrieve_from_team()
+        battle.out2 = battle.team2.retrieve_from_team()
+        yield battle
+
+
+class TestBattleSnapshot(TestCase):
+
+    @number("20.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_restore_continues_identically(self):
+        for battle in started_battles(40, 3):
+            snapshots = []
+            for _ in range(40):
+                snapshots.append(battle.snapshot())
+                if battle.process_turn() is not None:
+                    break
+            final = state(battle)
+            for i, snapshot in enumerate(snapshots):
+                # Into a new battle, and back into the original one.
+                for target in (Battle(log_size=0), battle):
+                    target.restore(snapshot)
+                    for _ in range(i, len(snapshots)):
+                        target.process_turn()
+                    self.assertEqual(state(target), final)
+
+    @number("20.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_sharing(self):
+        battle = next(started_battles(1, 3))
+        first = battle.snapshot()
+        RandomGen.random()
+        battle.out1.hp -= 1
+        second = battle.snapshot()
+        self.assertNotEqual(first, second)
+        self.assertNotEqual(first.rng_seed, second.rng_seed)
+        # Neither team has changed, so both snapshots share their team snapshots.
+        self.assertIs(first.team1, second.team1)
+        self.assertIs(first.team2, second.team2)
+        with self.assertRaises(AttributeError):
+            first.turn_number = 3
+
+        # Restoring keeps unchanged teams as they are, and rebuilds changed ones.
+        waiting = battle.team1.monster_order[0]
+        battle.team2.retrieve_from_team()
+        battle.restore(first)
+        self.assertIs(battle.team1.monster_order[0], waiting)
+        self.assertIs(battle.team2.snapshot(), first.team2)
+        self.assertEqual(RandomGen.seed, first.rng_seed)
+        self.assertEqual(battle.snapshot(), first)
+
+        # Restoring without the RNG leaves RandomGen alone.
+        RandomGen.set_seed(-1)
+        battle.restore(second, rng=False)
+        self.assertEqual(RandomGen.seed, -1)
+        # Seeds outside the header's range are stored modulo RandomGen.MOD, which draws the same.
+        snapshot = battle.snapshot()
+        self.assertEqual(BattleSnapshot.from_bytes(snapshot.to_bytes()), snapshot._replace(rng_seed=RandomGen.MOD - 1))
+
+        team = MonsterTeam.from_snapshot(first.team1)
+        self.assertEqual(team, battle.team1)
+        self.assertIsNot(team.monster_order[0], waiting)
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from benchmarks.harness import BENCHMARKS, benchmark, compare_to_baseline, run_benchmarks, time_benchmark
+
+class TestBenchmarkHarness(TestCase):
+
+    def tearDown(self):
+        BENCHMARKS.pop("test.noop", None)
+
+    @number("10.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_time_benchmark(self):
+        calls = []
+        result = time_benchmark(lambda: lambda: calls.append(1), repeat=3, min_time=0.001)
+        self.assertEqual(result["samples"], 3)
+        # Calibration runs come on top of the timed samples.
+        self.assertGreaterEqual(len(calls), 3 * result["calls_per_sample"])
+        self.assertLessEqual(result["per_call_s"], result["median_s"])
+
+    @number("10.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_register_and_run(self):
+        benchmark("test.noop")(lambda: lambda: None)
+        self.assertRaises(ValueError, lambda: benchmark("test.noop")(lambda: lambda: None))
+        report = run_benchmarks("test.noop", repeat=1, min_time=0.001)
+        self.assertListEqual(list(report["benchmarks"]), ["test.noop"])
+
+    @number("10.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_compare_to_baseline(self):
+        baseline = {"benchmarks": {"a": {"per_call_s": 1.0}, "b": {"per_call_s": 1.0}, "gone": {"per_call_s": 1.0}}}
+        report = {"benchmarks": {"a": {"per_call_s": 1.05}, "b": {"per_call_s": 1.5}, "new": {"per_call_s": 1.0}}}
+        comparison = compare_to_baseline(report, baseline, 0.1)
+        self.assertListEqual(sorted(comparison), ["a", "b"])
+        self.assertFalse(comparison["a"]["regression"])
+        self.assertTrue(comparison["b"]["regression"])
+        self.assertAlmostEqual(comparison["b"]["ratio"], 1.5)
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from data_structures.bset import BSet
+
+class TestBSet(TestCase):
+
+    @number("9.10")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_len_and_iter(self):
+        s = BSet.from_iterable([1, 4, 4, 70, 2])
+        self.assertEqual(len(s), 4)
+        self.assertListEqual(list(s), [1, 2, 4, 70])
+        self.assertEqual(str(s), "{1, 2, 4, 70}")
+        self.assertEqual(len(BSet()), 0)
+        self.assertEqual(str(BSet()), "{}")
+        self.assertRaises(TypeError, lambda: BSet.from_iterable([1, 0]))
+
+    @number("9.11")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_in_place_operators(self):
+        s = BSet.from_iterable([1, 2, 3])
+        original = s
+        s |= BSet.from_iterable([5])
+        self.assertIs(s, original)
+        self.assertListEqual(list(s), [1, 2, 3, 5])
+        s &= BSet.from_iterable([2, 3, 5, 8])
+        self.assertListEqual(list(s), [2, 3, 5])
+        s -= BSet.from_iterable([3])
+        self.assertIs(s, original)
+        self.assertListEqual(list(s), [2, 5])
+        self.assertListEqual(list(s - BSet.from_iterable([2])), [5])
+
+    @number("9.12")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_union_all(self):
+        sets = [BSet.from_iterable([i, i + 10]) for i in range(1, 4)]
+        self.assertListEqual(list(BSet.union_all(sets)), [1, 2, 3, 11, 12, 13])
+        self.assertTrue(BSet.union_all([]).is_empty())
@@ -0,0 +1,209 @@
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+import helpers
+from data_structures.referential_array import ArrayR
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROSTER_PATH = os.path.join(REPO_ROOT, "monsters.yaml")
+
+class TestRosterCache(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.roster_file = os.path.join(self.tmp_dir, "monsters.yaml")
+        shutil.copyfile(ROSTER_PATH, self.roster_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @number("6.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_cache_matches_yaml(self):
+        with open(self.roster_file, "rb") as f:
+            parsed = helpers._parse_roster_yaml(f.read())
+        first = helpers._load_roster_records(self.roster_file)
+        self.assertTrue(os.path.exists(helpers._roster_cache_path(self.roster_file)))
+        second = helpers._load_roster_records(self.roster_file)
+        self.assertEqual(first, parsed)
+        self.assertEqual(second, parsed)
+        name, _, evolution, element, simple, complex, can_be_spawned = parsed[0]
+        self.assertEqual((name, evolution, element, can_be_spawned), ("Flamikin", "Infernoth", "Fire", True))
+        self.assertEqual(simple, (3, 3, 2, 6))
+        self.assertEqual(complex[0], ("3",))
+
+    @number("6.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_cache_invalidated_on_change(self):
+        helpers._load_roster_records(self.roster_file)
+        with open(self.roster_file, "r") as f:
+            contents = f.read()
+        with open(self.roster_file, "w") as f:
+            f.write(contents.replace("name: Flamikin", "name: Flamikins", 1))
+        records = helpers._load_roster_records(self.roster_file)
+        self.assertEqual(records[0][0], "Flamikins")
+
+    @number("6.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_corrupt_cache_ignored(self):
+        cache_file = helpers._roster_cache_path(self.roster_file)
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, "wb") as f:
+            f.write(b"not a pickle")
+        records = helpers._load_roster_records(self.roster_file)
+        self.assertEqual(len(records), 41)
+
+        # A truncated cache, and one missing fields, are misses too.
+        with open(cache_file, "rb") as f:
+            data = f.read()
+        for corrupt in (data[:len(data) // 2], pickle.dumps({"version": helpers.ROSTER_CACHE_VERSION})):
+            with open(cache_file, "wb") as f:
+                f.write(corrupt)
+            self.assertEqual(helpers._load_roster_records(self.roster_file), records)
+
+
+class TestLazyLoading(TestCase):
+
+    @number("6.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(10)
+    def test_import_outside_repo_root(self):
+        # Importing the game modules should do no file I/O, and loading should not depend on the cwd.
+        script = "\n".join([
+            "import tower, helpers",
+            "from elements import EffectivenessCalculator, Element",
+            "assert not helpers.registry.is_loaded()",
+            "assert EffectivenessCalculator.instance is None",
+            "from helpers import Flamikin",
+            "assert Flamikin.get_name() == 'Flamikin'",
+            "assert EffectivenessCalculator.get_effectiveness(Element.FIRE, Element.GRASS) == 2",
+        ])
+        with tempfile.TemporaryDirectory() as cwd:
+            env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+            proc = subprocess.run([sys.executable, "-c", script], cwd=cwd, env=env, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+    @number("6.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_unknown_attribute(self):
+        self.assertRaises(AttributeError, lambda: helpers.NotAMonster)
+
+
+class TestDataRegistry(TestCase):
+
+    def setUp(self):
+        self.saved = helpers.registry.current()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.roster_file = os.path.join(self.tmp_dir, "monsters.yaml")
+        with open(ROSTER_PATH, "r") as f:
+            contents = f.read()
+        # Flamikin is the first monster listed, so its simple attack is the first one in the file.
+        with open(self.roster_file, "w") as f:
+            f.write(contents.replace("  simple:\n    attack: 3", "  simple:\n    attack: 30", 1))
+        self.csv_file = os.path.join(self.tmp_dir, "type_effectiveness.csv")
+        with open(os.path.join(REPO_ROOT, "type_effectiveness.csv"), "r") as f:
+            header, rest = f.read().split("\n", maxsplit=1)
+        with open(self.csv_file, "w") as f:
+            # Normal vs Normal is the first value of the table.
+            f.write(header + "\n4" + rest[1:])
+
+    def tearDown(self):
+        # Put the original classes back, as other tests imported them by name.
+        helpers.registry._publish(self.saved)
+        shutil.rmtree(self.tmp_dir)
+
+    @number("6.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_reload_swaps_snapshot(self):
+        from elements import EffectivenessCalculator, Element
+        old = helpers.registry.current()
+        old_flamikin = old.index.get("Flamikin")
+        in_flight = old_flamikin()
+
+        new = helpers.registry.reload(self.roster_file, self.csv_file)
+        self.assertIs(helpers.registry.current(), new)
+        self.assertEqual(new.version, old.version + 1)
+        self.assertEqual(helpers.registry.version, new.version)
+        self.assertEqual(new.index.get("Flamikin").get_simple_stats().get_attack(), 30)
+        self.assertIs(helpers.Flamikin, new.index.get("Flamikin"))
+        self.assertIs(helpers.get_all_monsters(), new.monsters)
+        self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.NORMAL, Element.NORMAL), 4)
+
+        # Existing snapshots and monsters are untouched.
+        self.assertEqual(in_flight.get_attack(), 3)
+        self.assertEqual(old.index.get("Flamikin").get_simple_stats().get_attack(), 3)
+        self.assertEqual(old.effectiveness.lookup(Element.NORMAL, Element.NORMAL), 1)
+        self.assertIs(in_flight.evolve().__class__, old.index.get("Infernoth"))
+
+    @number("6.7")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_derived_cache_per_snapshot(self):
+        calls = []
+        def build(snapshot):
+            calls.append(snapshot.version)
+            return len(snapshot.index.spawnable())
+        old = helpers.registry.current()
+        self.assertEqual(old.cached("n_spawnable", build), old.cached("n_spawnable", build))
+        new = helpers.registry.reload(self.roster_file, self.csv_file)
+        new.cached("n_spawnable", build)
+        self.assertListEqual(calls, [old.version, new.version])
+
+    @number("6.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_failed_reload_keeps_current(self):
+        old = helpers.registry.current()
+        self.assertRaises(OSError, lambda: helpers.registry.reload(os.path.join(self.tmp_dir, "missing.yaml")))
+        self.assertIs(helpers.registry.current(), old)
+
+    @number("6.9")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_consumers_follow_reload(self):
+        import asyncio
+        from battle import Battle, BattleSnapshot
+        from battle_server import build_team
+        from ladder import Ladder
+        from sessions import BattleSession, ScriptedClient
+        from team import MonsterTeam
+        old = helpers.registry.current()
+        old_flamikin, aquariuma = old.index.get("Flamikin"), old.index.get("Aquariuma")
+        ladder = Ladder()
+        first = ladder.add_team(MonsterTeam.TeamMode.BACK, [old_flamikin])
+        second = ladder.add_team(MonsterTeam.TeamMode.BACK, [aquariuma])
+        ladder.play_match(first, second)
+        self.assertIs(build_team("BACK:Flamikin").monster_order[0].__class__, old_flamikin)
+        battle = Battle(log_size=0)
+        battle.start(*(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([cls])) for cls in (old_flamikin, aquariuma)))
+
+        new = helpers.registry.reload(self.roster_file, self.csv_file)
+        new_flamikin = new.index.get("Flamikin")
+        # Derived caches are rebuilt from the new data.
+        self.assertIs(build_team("BACK:Flamikin").monster_order[0].__class__, new_flamikin)
+        self.assertIs(ladder._spec(first)[1][0], new_flamikin)
+        self.assertNotIn((first, second), ladder._results)
+        # A battle started before the reload stays on the data it started with.
+        self.assertIs(battle.game_data, old)
+        state = BattleSnapshot.from_bytes(battle.snapshot().to_bytes(), old)
+        self.assertIs(state.out1[0], old_flamikin)
+        battle.process_turn()
+        self.assertIs(battle.snapshot().game_data, old)
+        # Sessions take classes from any version by name, and play on the data current when they start.
+        session = BattleSession(ScriptedClient([old_flamikin]), ScriptedClient([aquariuma]))
+        asyncio.run(session.play())
+        self.assertIs(session.game_data, new)
+        self.assertIs(session.state.game_data, new)
@@ -0,0 +1,120 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from helpers import Flamikin, Gustwing, get_roster_index
+from ladder import Ladder, parse_team_spec_key, team_spec_key
+from team import MonsterTeam
+
+class TestLadder(TestCase):
+
+    @number("16.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_team_specs(self):
+        key = team_spec_key(MonsterTeam.TeamMode.FRONT, [Flamikin, Gustwing])
+        self.assertEqual(key, "FRONT:Flamikin,Gustwing")
+        mode, classes = parse_team_spec_key(key)
+        self.assertEqual(mode, MonsterTeam.TeamMode.FRONT)
+        self.assertListEqual(classes.to_list(), [Flamikin, Gustwing])
+        ladder = Ladder()
+        first = ladder.add_team(MonsterTeam.TeamMode.FRONT, [Flamikin, Gustwing])
+        self.assertEqual(ladder.add_team(MonsterTeam.TeamMode.FRONT, [Flamikin, Gustwing]), first)
+        self.assertNotEqual(ladder.add_team(MonsterTeam.TeamMode.BACK, [Flamikin, Gustwing]), first)
+        self.assertEqual(len(ladder), 2)
+        self.assertEqual(ladder.rating(key), Ladder.INITIAL_RATING)
+        self.assertRaises(ValueError, lambda: Ladder().schedule(1))
+
+    @number("16.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_elo_update(self):
+        ladder = Ladder()
+        a = ladder.add_team(MonsterTeam.TeamMode.BACK, [Flamikin])
+        b = ladder.add_team(MonsterTeam.TeamMode.BACK, [Gustwing])
+        ladder.update(a, b, Battle.Result.TEAM1)
+        self.assertAlmostEqual(ladder.ratings[a], Ladder.INITIAL_RATING + Ladder.K_PROVISIONAL / 2)
+        self.assertAlmostEqual(ladder.ratings[a] + ladder.ratings[b], 2 * Ladder.INITIAL_RATING)
+        ladder.update(a, b, Battle.Result.DRAW)
+        # The favourite loses points on a draw.
+        self.assertLess(ladder.ratings[a], Ladder.INITIAL_RATING + Ladder.K_PROVISIONAL / 2)
+        self.assertEqual(ladder.record("BACK:Flamikin"), (1, 0, 1))
+        self.assertEqual(ladder.record("BACK:Gustwing"), (0, 1, 1))
+        self.assertEqual(ladder.matches, 2)
+
+    @number("16.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_schedule_near_rated(self):
+        ladder = Ladder(seed=3, window=4)
+        RandomGen.set_seed(1234)
+        ladder.add_random_teams(200)
+        # The ladder draws from its own seed and leaves the caller's alone.
+        self.assertEqual(RandomGen.seed, 1234)
+        ladder.run(1000, batch_size=250)
+        self.assertEqual(ladder.matches, 1000)
+        self.assertEqual(sum(ladder.games), 2000)
+        order = [item.value for item in ladder.rating_order()]
+        position = {team: i for i, team in enumerate(order)}
+        pairs = ladder.schedule(500)
+        self.assertEqual(RandomGen.seed, 1234)
+        for first, second in pairs:
+            self.assertNotEqual(first, second)
+            self.assertLessEqual(abs(position[first] - position[second]), 2 * ladder.window)
+        self.assertLessEqual(len(ladder._results), ladder.cache_size)
+        top = ladder.top(5, min_games=5)
+        self.assertListEqual([rating for _, rating in top], sorted((rating for _, rating in top), reverse=True))
+
+    @number("16.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_persistence(self):
+        ladder = Ladder(seed=5, cache_size=10)
+        ladder.add_random_teams(50)
+        ladder.run(200, batch_size=50)
+        self.assertEqual(len(ladder._results), 10)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "ladder.json")
+            ladder.save(path)
+            loaded = Ladder.load(path)
+        self.assertListEqual(loaded.keys, ladder.keys)
+        self.assertListEqual(loaded.ratings[:len(loaded)].to_list(), ladder.ratings[:len(ladder)].to_list())
+        self.assertEqual(loaded.matches, 200)
+        # Both carry on identically.
+        ladder.run(100, batch_size=50)
+        loaded.run(100, batch_size=50)
+        self.assertListEqual(loaded.ratings[:len(loaded)].to_list(), ladder.ratings[:len(ladder)].to_list())
+        self.assertListEqual(loaded.wins[:len(loaded)].to_list(), ladder.wins[:len(ladder)].to_list())
+
+    @number("16.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_growth_and_parallel_cache(self):
+        ladder = Ladder(seed=2)
+        capacities = set()
+        spawnable = list(get_roster_index().spawnable())[:7]
+        for first in spawnable:
+            for second in spawnable:
+                ladder.add_team(MonsterTeam.TeamMode.BACK, [first, second])
+                capacities.add(len(ladder.ratings))
+        # Doubling: a handful of reallocations, not one per team.
+        self.assertEqual(len(ladder), 49)
+        self.assertLessEqual(len(capacities), 7)
+        self.assertEqual(ladder.ratings[:len(ladder)].to_list(), [Ladder.INITIAL_RATING] * 49)
+        self.assertEqual(len(ladder.top(100)), 49)
+
+        ladder.add_random_teams(30)
+        pairs = ladder.schedule(60)
+        serial = Ladder(seed=2)
+        serial._add_keys(ladder.keys)
+        expected = serial.play(pairs)
+        ladder.processes = 2
+        self.assertListEqual(ladder.play(pairs), expected)
+        # The workers' results are kept by the ladder itself.
+        self.assertEqual(set(ladder._results), set(pairs))
+        self.assertListEqual(ladder.play(pairs), expected)
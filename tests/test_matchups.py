@@ -0,0 +1,54 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from helpers import Flamikin
+from matchups import DRAW, LOSS, WIN, MatchupMatrix, build_matrix, duel
+
+class TestMatchups(TestCase):
+
+    @number("15.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_complex_mode_uses_level(self):
+        monster = Flamikin(simple_mode=False, level=3)
+        self.assertEqual(monster.get_attack(), Flamikin.get_complex_stats().get_attack(3))
+        self.assertEqual(monster.hp, Flamikin.get_complex_stats().get_max_hp(3))
+
+    @number("15.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_matrix_matches_duels(self):
+        matrix = build_matrix(levels=[1, 4], processes=1)
+        n = len(matrix.names)
+        self.assertEqual(len(matrix.values), 2 * 2 * n * n)
+        # Symmetry and stat caching mean far fewer simulations than cells.
+        self.assertLess(matrix.simulated, n * n)
+        for mode in matrix.modes:
+            for level in matrix.levels:
+                for name in matrix.names[::5]:
+                    for opponent in matrix.names[::4]:
+                        result = matrix.get(mode, level, name, opponent)
+                        self.assertEqual(result, duel(name, opponent, level, mode == "simple"))
+                        self.assertIn(result, (WIN, DRAW, LOSS))
+        self.assertEqual(matrix.get("simple", 1, "Flamikin", "Flamikin"), duel("Flamikin", "Flamikin", 1, True))
+        self.assertTrue(0 <= matrix.win_rate("Flamikin") <= 1)
+
+    @number("15.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_parallel_and_csv_round_trip(self):
+        serial = build_matrix(levels=[2], modes=["complex"], processes=1)
+        parallel = build_matrix(levels=[2], modes=["complex"], processes=2)
+        self.assertListEqual(serial.values.to_list(), parallel.values.to_list())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "matchups.csv")
+            serial.to_csv(path)
+            loaded = MatchupMatrix.from_csv(path)
+        self.assertListEqual(loaded.names, serial.names)
+        self.assertListEqual(loaded.levels, [2])
+        self.assertListEqual(loaded.modes, ["complex"])
+        self.assertListEqual(loaded.values.to_list(), serial.values.to_list())
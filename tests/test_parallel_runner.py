@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.parallel_runner import ParallelTestRunner
+from ed_utils.timeout import timeout
+
+SAMPLE_TESTS = textwrap.dedent("""
+    from unittest import TestCase
+    from ed_utils.decorators import number
+    from ed_utils.timeout import timeout
+
+    class TestSample(TestCase):
+
+        @number("1.1")
+        @timeout(0.5)
+        def test_hangs(self):
+            while True:
+                pass
+
+        @number("1.2")
+        def test_passes(self):
+            self.assertTrue(True)
+
+        @number("1.3")
+        def test_fails(self):
+            self.assertEqual(1, 2)
+""")
+
+class TestParallelTestRunner(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        for name in ("test_sample_a", "test_sample_b"):
+            with open(os.path.join(self.tmp_dir, name + ".py"), "w") as f:
+                f.write(SAMPLE_TESTS)
+        sys.path.insert(0, self.tmp_dir)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp_dir)
+        for name in ("test_sample_a", "test_sample_b"):
+            sys.modules.pop(name, None)
+
+    @number("12.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(10)
+    def test_kills_hung_tests(self):
+        suite = unittest.defaultTestLoader.loadTestsFromNames(["test_sample_a", "test_sample_b"])
+        start = time.perf_counter()
+        results = ParallelTestRunner(jobs=2, grace=0).run(suite)["testcases"]
+        # Both hung tests are killed after their own 0.5s limit, in parallel.
+        self.assertLess(time.perf_counter() - start, 3)
+        # Results keep the loader's (alphabetical) order, and test_passes still runs after test_hangs is killed.
+        self.assertListEqual([r["name"][:3] for r in results], ["1.3", "1.1", "1.2"] * 2)
+        self.assertListEqual([r["passed"] for r in results], [False, False, True] * 2)
+        self.assertIn("Timed out", results[1]["feedback"])
+        self.assertGreaterEqual(results[1]["duration"], 0.5)
+        self.assertTrue(all(r["duration"] >= 0 for r in results))
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from policies import ActionPolicy, HeuristicPolicy, LookaheadPolicy, legal_actions
+from replay import verify
+from team import MonsterTeam
+from helpers import Flamikin, Aquariuma, Vineon, Rockodile
+
+from data_structures.referential_array import ArrayR
+
+
+class SpecialFirst(ActionPolicy):
+    """Uses the special on the first turn, then attacks."""
+
+    def choose_action(self, battle, team):
+        return Battle.Action.SPECIAL if battle.turn_number == 0 else Battle.Action.ATTACK
+
+
+def start(battle, team1, team2):
+    battle.team1, battle.team2 = team1, team2
+    battle.out1, battle.out2 = team1.retrieve_from_team(), team2.retrieve_from_team()
+    return battle
+
+
+def random_pairs(n, seed):
+    RandomGen.set_seed(seed)
+    for _ in range(n):
+        yield (
+            MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM),
+            MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM),
+        )
+
+
+class TestPolicies(TestCase):
+
+    @number("19.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_special(self):
+        team1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon, Rockodile]))
+        team2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Vineon, Rockodile]))
+        battle = start(Battle(policy1=SpecialFirst()), team1, team2)
+        waiting = [type(team1.monster_order[i]) for i in range(len(team1))]
+        self.assertEqual(waiting, [Aquariuma, Vineon, Rockodile])
+        battle.process_turn()
+        self.assertEqual([type(team1.monster_order[i]) for i in range(len(team1))], [Rockodile, Vineon, Aquariuma])
+        self.assertIn((0, 0, Battle.Event.SPECIAL, 1, None, 3), battle.log.snapshot().to_list())
+        self.assertEqual(legal_actions(battle, 1), [Battle.Action.ATTACK, Battle.Action.SWAP, Battle.Action.SPECIAL])
+        self.assertEqual(legal_actions(battle, 2), [Battle.Action.ATTACK, Battle.Action.SWAP])
+
+    @number("19.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_clone(self):
+        for team1, team2 in random_pairs(30, 11):
+            battle = start(Battle(log_size=0), team1, team2)
+            before = team1.fingerprint(), team2.fingerprint(), battle.out1.hp, battle.out2.hp
+            clone = battle.clone()
+            self.assertIsNot(clone.out1, battle.out1)
+            self.assertIsNot(clone.team1.monster_order, battle.team1.monster_order)
+            turns = 0
+            while turns < 5:
+                turns += 1
+                if clone.process_turn() is not None:
+                    break
+            self.assertEqual((team1.fingerprint(), team2.fingerprint(), battle.out1.hp, battle.out2.hp), before)
+            # Playing the original the same way reaches the same state as the clone did.
+            for _ in range(turns):
+                battle.process_turn()
+            self.assertEqual(battle.team1, clone.team1)
+            self.assertEqual(battle.team2, clone.team2)
+            self.assertEqual((battle.out1.hp, battle.out2.hp), (clone.out1.hp, clone.out2.hp))
+
+    @number("19.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_lookahead(self):
+        policy = LookaheadPolicy(depth=4)
+        wins = heuristic_wins = 0
+        battles = []
+        for team1, team2 in random_pairs(60, 5):
+            copies = MonsterTeam.from_fingerprint(team1.fingerprint()), MonsterTeam.from_fingerprint(team2.fingerprint())
+            battles.append(start(Battle(log_size=0), MonsterTeam.from_snapshot(copies[0].snapshot()), MonsterTeam.from_snapshot(copies[1].snapshot())))
+            heuristic_wins += Battle(log_size=0, max_turns=100, policy1=HeuristicPolicy()).battle(*copies) == Battle.Result.TEAM1
+            battle = Battle(log_size=0, max_turns=100, policy1=policy, record=True)
+            wins += battle.battle(team1, team2) == Battle.Result.TEAM1
+            # Replays record the policy's actions.
+            self.assertTrue(verify(battle.last_replay))
+        self.assertGreater(wins, heuristic_wins)
+        self.assertEqual(policy.choose_many(battles, 2), [policy.choose_action(battle, 2) for battle in battles])
+        with self.assertRaises(ValueError):
+            LookaheadPolicy(depth=0)
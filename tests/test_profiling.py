@@ -0,0 +1,132 @@
+import io
+import os
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from battle import Battle
+from monster_base import MonsterBase
+from profiling import REPO_ROOT, memory_report, object_census, profiler, subsystem_of
+from random_gen import RandomGen
+from team import MonsterTeam
+from tower import BattleTower
+
+class TestProfiler(TestCase):
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    @number("11.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_hooks_removed_when_disabled(self):
+        originals = (Battle.__dict__["resolve_turn"], MonsterBase.__dict__["get_attack"], RandomGen.__dict__["random"])
+        with profiler.profile():
+            self.assertIsNot(Battle.__dict__["resolve_turn"], originals[0])
+        self.assertFalse(profiler.enabled)
+        self.assertTupleEqual((Battle.__dict__["resolve_turn"], MonsterBase.__dict__["get_attack"], RandomGen.__dict__["random"]), originals)
+        # Nothing is counted once disabled.
+        RandomGen.random()
+        self.assertNotIn("rng.draws", profiler.counters)
+
+    @number("11.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_counts_battle(self):
+        from helpers import Flamikin, Aquariuma
+        RandomGen.set_seed(1)
+        with profiler.profile():
+            draws = [RandomGen.randint(1, 6) for _ in range(3)]
+            team1 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=[Flamikin, Aquariuma])
+            team2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=[Aquariuma])
+            Battle(verbosity=0).battle(team1, team2)
+        counters = profiler.counters
+        self.assertEqual(counters["rng.draws"], len(draws))
+        self.assertEqual(counters["team.add"], 3)
+        # Adding Aquariuma to the front of the team moves Flamikin back by one.
+        self.assertGreaterEqual(counters["team.shifts"], 1)
+        self.assertGreaterEqual(counters["team.retrieve"], 2)
+        self.assertEqual(profiler.timers["battle.battle"][0], 1)
+        self.assertEqual(counters["battle.damage"], counters["monster.attack.simple"])
+        self.assertGreater(profiler.timers["battle.turn"][0], 0)
+
+        # Turns with actions given from outside are timed too.
+        battle = Battle(log_size=0)
+        battle.start(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=[Flamikin]),
+                     MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=[Aquariuma]))
+        with profiler.profile():
+            battle.play_turn(Battle.Action.ATTACK, Battle.Action.ATTACK)
+        self.assertEqual(profiler.timers["battle.turn"][0], 1)
+
+    @number("11.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_tower_dumps_summary(self):
+        RandomGen.set_seed(129371)
+        tower = BattleTower(Battle(verbosity=0), profile=True)
+        tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+        tower.generate_teams(3)
+        battles = 0
+        while tower.battles_remaining():
+            tower.next_battle()
+            battles += 1
+            # Only enabled while the tower runs, so nothing stays installed if it is dropped.
+            self.assertFalse(profiler.enabled)
+        stream = io.StringIO()
+        tower.dump_profile(stream)
+        self.assertFalse(profiler.enabled)
+        self.assertEqual(profiler.timers["tower.next_battle"][0], battles)
+        self.assertIn("tower.next_battle", stream.getvalue())
+        self.assertIn("rng.draws", stream.getvalue())
+
+        # Inside someone else's profile() block, the tower neither resets nor disables the profiler.
+        RandomGen.set_seed(129371)
+        with profiler.profile():
+            profiler.count("outer")
+            tower = BattleTower(Battle(verbosity=0), profile=True)
+            tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+            tower.generate_teams(1)
+            tower.next_battle()
+            tower.dump_profile(io.StringIO())
+            self.assertTrue(profiler.enabled)
+            self.assertEqual(profiler.counters["outer"], 1)
+            self.assertEqual(profiler.timers["tower.next_battle"][0], 1)
+
+
+class TestMemoryReport(TestCase):
+
+    @number("11.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_subsystem_of(self):
+        self.assertEqual(subsystem_of(os.path.join(REPO_ROOT, "team.py")), "team")
+        self.assertEqual(subsystem_of(os.path.join(REPO_ROOT, "data_structures", "referential_array.py")), "data_structures.referential_array")
+        self.assertEqual(subsystem_of("<frozen importlib._bootstrap>"), "other")
+        self.assertEqual(subsystem_of(os.__file__), "other")
+
+    @number("11.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_memory_report(self):
+        from helpers import Flamikin
+
+        def checkpoints():
+            teams = []
+            yield "start"
+            for _ in range(50):
+                teams.append(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=[Flamikin]))
+            yield "teams", {"teams": len(teams)}
+            teams.clear()
+            yield "cleared"
+
+        report = memory_report(checkpoints())
+        self.assertListEqual([c["label"] for c in report["checkpoints"]], ["start", "teams", "cleared"])
+        self.assertEqual(report["checkpoints"][1]["teams"], 50)
+        self.assertEqual(report["peak"]["label"], "teams")
+        self.assertGreater(report["peak"]["by_subsystem"]["team"], 0)
+        self.assertGreaterEqual(report["peak_bytes"], report["peak"]["traced_bytes"])
+        self.assertLess(report["steady"]["traced_bytes"], report["peak"]["traced_bytes"])
+        self.assertEqual(report["steady"]["label"], "cleared")
+        self.assertEqual(report["steady"]["objects"]["MonsterTeam"]["count"], object_census()["MonsterTeam"]["count"])
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from data_structures.queue_adt import CircularQueue, GrowableCircularQueue, RingBuffer
+from data_structures.stack_adt import ArrayStack, GrowableArrayStack
+
+class TestQueueBatches(TestCase):
+
+    @number("9.18")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_batches_wrap_around(self):
+        q = CircularQueue(5)
+        q.append_many([0, 1, 2])
+        self.assertListEqual(q.serve_many(2).to_list(), [0, 1])
+        # Rear wraps around the end of the array.
+        q.append_many([3, 4, 5, 6])
+        self.assertTrue(q.is_full())
+        self.assertRaises(Exception, lambda: q.append_many([7]))
+        self.assertRaises(Exception, lambda: q.serve_many(6))
+        self.assertEqual(len(q), 5)
+        self.assertEqual(q.serve(), 2)
+        self.assertListEqual(q.serve_many(4).to_list(), [3, 4, 5, 6])
+        self.assertTrue(q.is_empty())
+
+    @number("9.19")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_growable_queue(self):
+        q = GrowableCircularQueue(2)
+        served = []
+        for i in range(100):
+            q.append(i)
+            if i % 3 == 0:
+                served.append(q.serve())
+        self.assertFalse(q.is_full())
+        self.assertGreaterEqual(len(q.array), len(q))
+        q.append_many(range(100, 300))
+        served.extend(q.serve_many(len(q)).to_list())
+        self.assertListEqual(served, list(range(300)))
+        # Shrinks back down once empty, but not below its initial capacity.
+        self.assertEqual(len(q.array), 2)
+        q.append(1)
+        q.serve()
+        self.assertRaises(Exception, q.serve)
+
+    @number("9.22")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_ring_buffer_overwrites_oldest(self):
+        r = RingBuffer(3)
+        for i in range(5):
+            r.append(i)
+        self.assertEqual(len(r), 3)
+        self.assertEqual(r.dropped, 2)
+        self.assertListEqual(r.snapshot().to_list(), [2, 3, 4])
+        self.assertEqual(r.serve(), 2)
+        r.append_many([5, 6])
+        self.assertListEqual(r.serve_many(1).to_list(), [4])
+        self.assertEqual(r.peek(), 5)
+        self.assertListEqual(r.drain().to_list(), [5, 6])
+        self.assertTrue(r.is_empty())
+        self.assertEqual(len(r.drain()), 0)
+
+
+class TestStackBatches(TestCase):
+
+    @number("9.20")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_batches(self):
+        s = ArrayStack(4)
+        s.push_many([1, 2, 3])
+        self.assertRaises(Exception, lambda: s.push_many([4, 5]))
+        self.assertEqual(len(s), 3)
+        self.assertListEqual(s.pop_many(2).to_list(), [3, 2])
+        self.assertRaises(Exception, lambda: s.pop_many(2))
+        self.assertEqual(s.pop(), 1)
+
+    @number("9.21")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_growable_stack(self):
+        s = GrowableArrayStack()
+        for i in range(50):
+            s.push(i)
+        s.push_many(range(50, 120))
+        self.assertEqual(len(s), 120)
+        self.assertEqual(s.peek(), 119)
+        self.assertListEqual(s.pop_many(20).to_list(), list(range(119, 99, -1)))
+        popped = [s.pop() for _ in range(100)]
+        self.assertListEqual(popped, list(range(99, -1, -1)))
+        self.assertEqual(len(s.array), 1)
+        self.assertRaises(Exception, s.pop)
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from data_structures.referential_array import ArrayR
+
+class TestArrayR(TestCase):
+
+    @number("9.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_bulk_construction(self):
+        self.assertListEqual(ArrayR(3).to_list(), [None, None, None])
+        self.assertEqual(len(ArrayR(0)), 0)
+        self.assertRaises(ValueError, lambda: ArrayR(-1))
+        self.assertListEqual(ArrayR.from_list([1, 2, 3]).to_list(), [1, 2, 3])
+        self.assertListEqual(ArrayR.from_iterable(x * x for x in range(4)).to_list(), [0, 1, 4, 9])
+        self.assertListEqual(ArrayR.from_iterable(ArrayR.from_list("ab")).to_list(), ["a", "b"])
+
+    @number("9.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_copy_and_fill(self):
+        a = ArrayR.from_list([1, 2, 3])
+        b = a.copy()
+        b[0] = 10
+        self.assertListEqual(a.to_list(), [1, 2, 3])
+        self.assertListEqual(b.to_list(), [10, 2, 3])
+        a.fill(False)
+        self.assertListEqual(a.to_list(), [False, False, False])
+
+    @number("9.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_extend_into(self):
+        a = ArrayR.from_list([1, 2])
+        b = a.extend_into(4)
+        self.assertListEqual(b.to_list(), [1, 2, None, None])
+        self.assertListEqual(a.to_list(), [1, 2])
+        self.assertRaises(ValueError, lambda: a.extend_into(1))
+
+    @number("9.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_slices_and_iteration(self):
+        a = ArrayR.from_list([0, 1, 2, 3, 4])
+        self.assertListEqual(a[1:3].to_list(), [1, 2])
+        self.assertListEqual(a[::-1].to_list(), [4, 3, 2, 1, 0])
+        a[0:2] = ArrayR.from_list(["a", "b"])
+        a[3:5] = (x for x in "de")
+        self.assertListEqual(list(a), ["a", "b", 2, "d", "e"])
+        with self.assertRaises(ValueError):
+            a[0:2] = [1]
+        self.assertEqual(a.index(2), 2)
+        # Overlapping moves, either way.
+        a.move(0, 1, 3)
+        self.assertListEqual(list(a), ["a", "a", "b", 2, "e"])
+        a.move(2, 1, 3)
+        self.assertListEqual(list(a), ["a", "b", 2, "e", "e"])
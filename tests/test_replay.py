@@ -0,0 +1,79 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from replay import Replay, audit, replay_battle, verify
+from team import MonsterTeam
+
+
+def record_battles(n, seed=5):
+    battle = Battle(log_size=0, max_turns=100, record=True)
+    replays = []
+    RandomGen.set_seed(seed)
+    for _ in range(n):
+        team1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+        team2 = MonsterTeam(MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SelectionMode.RANDOM, sort_key=MonsterTeam.SortMode.HP)
+        result = battle.battle(team1, team2)
+        replays.append(battle.last_replay)
+        assert battle.last_replay.result == result
+    return replays
+
+
+class TestReplay(TestCase):
+
+    @number("18.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_round_trip(self):
+        for replay in record_battles(50):
+            copy = Replay.from_bytes(replay.to_bytes())
+            self.assertEqual(copy, replay)
+            self.assertEqual(len(copy), len(replay))
+            self.assertEqual(copy.turn_actions(0), replay.turn_actions(0))
+        with self.assertRaises(ValueError):
+            Replay.from_bytes(replay.to_bytes()[:-1])
+        with self.assertRaises(ValueError):
+            Replay.from_bytes(b"XXXX" + replay.to_bytes()[4:])
+
+        # Seeds outside the header's range are stored as the equivalent seed modulo RandomGen.MOD.
+        seed = replay.seed
+        for equivalent in (seed - RandomGen.MOD, seed + 2 ** 20 * RandomGen.MOD):
+            replay.seed = equivalent
+            self.assertTrue(verify(replay))
+            copy = Replay.from_bytes(replay.to_bytes())
+            self.assertEqual(copy.seed, seed)
+            self.assertTrue(verify(copy))
+
+    @number("18.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_replay_reproduces_battle(self):
+        for replay in record_battles(50):
+            battle = replay_battle(replay)
+            self.assertEqual(battle.turns_played, len(replay))
+            # The replayed events match a fresh run of the same starting teams.
+            original = Battle(max_turns=replay.max_turns)
+            original.battle(*replay.teams())
+            self.assertEqual(battle.log.snapshot().to_list()[1:], original.log.snapshot().to_list()[1:])
+
+    @number("18.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_verify(self):
+        replays = record_battles(20)
+        self.assertTrue(all(verify(replay) for replay in replays))
+
+        tampered = replays[3]
+        tampered.actions = bytes([tampered.actions[0] ^ 3]) + tampered.actions[1:]
+        self.assertFalse(verify(tampered))
+        with self.assertRaises(ValueError):
+            replay_battle(tampered)
+
+        short = replays[5]
+        short.actions = short.actions[:-1]
+        self.assertFalse(verify(short))
+        self.assertEqual(audit(replays, processes=2), [3, 5])
+        self.assertEqual(audit(replays, processes=1), [3, 5])
@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from elements import Element
+from helpers import get_all_monsters, get_roster_index
+from helpers import Flamikin, Infernoth, Infernox, Normake, Strikeon, Metalhorn, Ironclad
+
+class TestRosterIndex(TestCase):
+
+    @number("7.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_lookup_by_name(self):
+        index = get_roster_index()
+        self.assertEqual(len(index), len(get_all_monsters()))
+        self.assertIs(index.get("Flamikin"), Flamikin)
+        self.assertIn("Ironclad", index)
+        self.assertNotIn("Pikachu", index)
+        self.assertRaises(ValueError, lambda: index.get("Pikachu"))
+
+    @number("7.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_elements_and_spawnable(self):
+        index = get_roster_index()
+        self.assertListEqual(index.of_element(Element.FIRE).to_list()[:3], [Flamikin, Infernoth, Infernox])
+        self.assertListEqual(index.of_element(Element.NORMAL).to_list(), [Normake])
+        total = sum(len(index.of_element(element)) for element in Element)
+        self.assertEqual(total, len(index))
+
+        monsters = get_all_monsters()
+        expected = [m for m in monsters if m.can_be_spawned()]
+        self.assertListEqual(index.spawnable().to_list(), expected)
+        self.assertNotIn(Normake, index.spawnable().to_list())
+
+    @number("7.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_evolution_chains(self):
+        index = get_roster_index()
+        self.assertListEqual(index.evolution_chain(Infernoth).to_list(), [Flamikin, Infernoth, Infernox])
+        self.assertListEqual(index.evolution_chain("Infernox").to_list(), [Flamikin, Infernoth, Infernox])
+        self.assertListEqual(index.evolution_chain(Metalhorn).to_list(), [Metalhorn, Ironclad])
+        self.assertListEqual(index.evolution_chain(Strikeon).to_list(), [Strikeon, Normake])
+        self.assertEqual(index.evolution_depth(Flamikin), 0)
+        self.assertEqual(index.evolution_depth(Infernoth), 1)
+        self.assertEqual(index.evolution_depth("Infernox"), 2)
+
+    @number("7.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_element_from_string(self):
+        self.assertEqual(Element.from_string("Ice"), Element.ICE)
+        self.assertEqual(Element.from_string("fIRe"), Element.FIRE)
+        self.assertRaises(ValueError, lambda: Element.from_string("Plasma"))
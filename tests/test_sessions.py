@@ -0,0 +1,101 @@
+import asyncio
+import time
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from helpers import get_roster_index, Flamikin, Infernoth, Aquariuma, Vineon
+from sessions import BattleSession, ScriptedClient, play_sessions, worker_pool
+from team import MonsterTeam
+
+from data_structures.referential_array import ArrayR
+
+
+def random_lineups(n, seed):
+    RandomGen.set_seed(seed)
+    spawnable = get_roster_index().spawnable()
+    return [
+        tuple([RandomGen.random_choice(spawnable) for _ in range(RandomGen.randint(1, 6))] for _ in range(2))
+        for _ in range(n)
+    ]
+
+
+def direct_result(classes1, classes2, max_turns):
+    teams = [MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list(classes)) for classes in (classes1, classes2)]
+    return Battle(log_size=0, max_turns=max_turns).battle(*teams)
+
+
+class FussyClient(ScriptedClient):
+    """Tries an invalid team and a non-action first, then answers slowly."""
+
+    def __init__(self, classes, action_delay):
+        super().__init__(classes)
+        self.teams = iter([[], [Flamikin] * 7, [Infernoth], classes])
+        self.action_delay = action_delay
+        self.asked = 0
+
+    async def choose_team(self, spawnable):
+        return next(self.teams)
+
+    async def choose_action(self, state, team):
+        self.asked += 1
+        if self.asked == 1:
+            return "ATTACK"
+        await asyncio.sleep(self.action_delay)
+        return Battle.Action.ATTACK
+
+
+class TestSessions(TestCase):
+
+    @number("21.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_matches_battle(self):
+        lineups = random_lineups(60, 9)
+        clients = [(ScriptedClient(classes1), ScriptedClient(classes2)) for classes1, classes2 in lineups]
+        sessions = [BattleSession(client1, client2, max_turns=100) for client1, client2 in clients]
+        RandomGen.set_seed(777)
+        results = asyncio.run(play_sessions(sessions))
+        # Resolving turns in this process leaves its RandomGen as it was.
+        self.assertEqual(RandomGen.seed, 777)
+        self.assertEqual(results, [direct_result(classes1, classes2, 100) for classes1, classes2 in lineups])
+        for (client1, client2), result in zip(clients, results):
+            self.assertTrue(client1.messages[-1].endswith(f"Result: {result.name}"))
+            self.assertEqual(client1.messages, client2.messages)
+
+    @number("21.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_worker_pool(self):
+        lineups = random_lineups(10, 4)
+        with worker_pool(2) as pool:
+            sessions = [BattleSession(ScriptedClient(classes1), ScriptedClient(classes2), max_turns=100, executor=pool) for classes1, classes2 in lineups]
+            results = asyncio.run(play_sessions(sessions))
+        self.assertEqual(results, [direct_result(classes1, classes2, 100) for classes1, classes2 in lineups])
+
+    @number("21.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_interaction(self):
+        # Sessions wait on their clients concurrently: 40 sessions of slow players take
+        # about as long as one.
+        delay = 0.01
+        sessions = [BattleSession(ScriptedClient([Flamikin, Vineon], delay=delay), ScriptedClient([Aquariuma], delay=delay)) for _ in range(40)]
+        start = time.perf_counter()
+        asyncio.run(play_sessions(sessions))
+        turns = sessions[0].state.turn_number + 2
+        self.assertLess(time.perf_counter() - start, 40 * turns * delay / 4)
+
+        fussy = FussyClient([Vineon], action_delay=1)
+        session = BattleSession(fussy, ScriptedClient([Flamikin]), action_timeout=0.01)
+        self.assertEqual(asyncio.run(session.play()), direct_result([Vineon], [Flamikin], 1000))
+        self.assertEqual(fussy.messages[:3], [
+            "A team has between 1 and 6 monsters.",
+            "A team has between 1 and 6 monsters.",
+            "This monster cannot be spawned.",
+        ])
+        self.assertEqual(fussy.messages[3], "'ATTACK' is not an action.")
+        self.assertEqual(fussy.messages[4], "Out of time, your team chooses for you.")
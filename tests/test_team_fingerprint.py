@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from team import MonsterTeam, TeamInterner
+from helpers import Flamikin, Aquariuma, Vineon, Infernoth
+
+from data_structures.referential_array import ArrayR
+
+
+def provided(team_mode, classes, sort_key=None):
+    return MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list(classes), sort_key=sort_key)
+
+
+class TestTeamFingerprint(TestCase):
+
+    @number("17.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_equality(self):
+        team = provided(MonsterTeam.TeamMode.BACK, [Flamikin, Aquariuma, Vineon])
+        same = provided(MonsterTeam.TeamMode.BACK, [Flamikin, Aquariuma, Vineon])
+        self.assertEqual(team, same)
+        self.assertEqual(team.fingerprint(), same.fingerprint())
+        self.assertNotEqual(team, provided(MonsterTeam.TeamMode.BACK, [Aquariuma, Flamikin, Vineon]))
+        # FRONT stores the same classes in the opposite order.
+        self.assertNotEqual(team, provided(MonsterTeam.TeamMode.FRONT, [Vineon, Aquariuma, Flamikin]))
+
+        same.monster_order[1].set_hp(1)
+        self.assertNotEqual(team, same)
+        same.regenerate_team()
+        self.assertEqual(team, same)
+        same.monster_order[0].level_up()
+        self.assertNotEqual(team, same)
+
+        self.assertEqual(str(team), f"BACK team [{team.monster_order[0]}, {team.monster_order[1]}, {team.monster_order[2]}]")
+        with self.assertRaises(TypeError):
+            hash(team)
+
+    @number("17.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_round_trip(self):
+        RandomGen.set_seed(7)
+        for _ in range(20):
+            team = MonsterTeam(MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SelectionMode.RANDOM, sort_key=MonsterTeam.SortMode.SPEED)
+            team.monster_order[0].set_hp(team.monster_order[0].get_hp() - 2)
+            copy = MonsterTeam.from_fingerprint(team.fingerprint())
+            self.assertEqual(copy, team)
+            self.assertEqual(copy.sort_key, MonsterTeam.SortMode.SPEED)
+            self.assertIsNot(copy.monster_order[0], team.monster_order[0])
+
+        # Evolved (unspawnable) monsters survive the trip too.
+        team = provided(MonsterTeam.TeamMode.BACK, [Flamikin])
+        team.monster_order[0] = Infernoth(simple_mode=False, level=3)
+        copy = MonsterTeam.from_fingerprint(team.fingerprint())
+        self.assertIsInstance(copy.monster_order[0], Infernoth)
+        self.assertFalse(copy.monster_order[0].simple_mode)
+        self.assertEqual(copy.monster_order[0].get_level(), 3)
+
+        with self.assertRaises(ValueError):
+            MonsterTeam.from_fingerprint(team.fingerprint()[:-1])
+
+    @number("17.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_interner(self):
+        interner = TeamInterner()
+        team = provided(MonsterTeam.TeamMode.BACK, [Flamikin, Aquariuma])
+        team_id = interner.intern(team)
+        self.assertEqual(interner.intern(provided(MonsterTeam.TeamMode.BACK, [Flamikin, Aquariuma])), team_id)
+        self.assertEqual(interner.intern(provided(MonsterTeam.TeamMode.BACK, [Aquariuma])), team_id + 1)
+        self.assertEqual(len(interner), 2)
+        self.assertIn(team, interner)
+        self.assertIn(team.fingerprint(), interner)
+
+        # The interned key is the canonical object, and doesn't follow later changes to the team.
+        self.assertIs(interner.fingerprint(interner.intern_fingerprint(team.fingerprint())), interner.fingerprint(team_id))
+        team.monster_order[1].set_hp(1)
+        self.assertNotIn(team, interner)
+        self.assertEqual(MonsterTeam.from_fingerprint(interner.fingerprint(team_id)), provided(MonsterTeam.TeamMode.BACK, [Flamikin, Aquariuma]))
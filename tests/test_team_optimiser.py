@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from helpers import Flamikin, Gustwing, get_roster_index
+from team import MonsterTeam
+from team_optimiser import TeamOptimiser
+
+from data_structures.referential_array import ArrayR
+
+class TestTeamOptimiser(TestCase):
+
+    @number("14.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_search(self):
+        optimiser = TeamOptimiser(MonsterTeam.TeamMode.BACK, battles=5, beam_width=2, max_size=2, processes=1)
+        best = optimiser.search(top=4)
+        self.assertEqual(len(best), 4)
+        n_spawnable = len(get_roster_index().spawnable())
+        self.assertEqual(len(optimiser.scores), n_spawnable + 2 * n_spawnable)
+        fitnesses = [optimiser.fitness(team) for team in best]
+        self.assertListEqual(fitnesses, sorted(fitnesses, reverse=True))
+        self.assertEqual(fitnesses[0], max(optimiser.scores.values()))
+        # The results are ready to be used as provided monsters.
+        team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=best[0])
+        self.assertEqual(len(team), len(best[0]))
+
+    @number("14.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_parallel_matches_serial(self):
+        serial = TeamOptimiser(battles=3, beam_width=1, max_size=2, processes=1)
+        parallel = TeamOptimiser(battles=3, beam_width=1, max_size=2, processes=2)
+        self.assertListEqual(
+            [[cls.get_name() for cls in team] for team in serial.search(top=3)],
+            [[cls.get_name() for cls in team] for team in parallel.search(top=3)],
+        )
+        self.assertDictEqual(serial.scores, parallel.scores)
+
+    @number("14.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_fitness_memoised(self):
+        optimiser = TeamOptimiser(battles=10, processes=1)
+        calls = []
+        score = optimiser.score
+        optimiser.score = lambda names: calls.append(names) or score(names)
+        team = ArrayR.from_list([Flamikin, Gustwing])
+        first = optimiser.fitness(team)
+        self.assertEqual(optimiser.fitness([Flamikin, Gustwing]), first)
+        self.assertTrue(0 <= first <= 1)
+        self.assertListEqual(calls, [("Flamikin", "Gustwing")])
+        # Order matters to a team, so it is a different candidate.
+        optimiser.fitness([Gustwing, Flamikin])
+        self.assertEqual(len(calls), 2)
+        self.assertRaises(ValueError, lambda: TeamOptimiser(MonsterTeam.TeamMode.OPTIMISE))
+        self.assertRaises(ValueError, lambda: TeamOptimiser(max_size=7))
@@ -0,0 +1,70 @@
+import importlib.util
+from unittest import TestCase, skipUnless
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from elements import EffectivenessCalculator, Element, EFFECTIVENESS_FILE
+from data_structures.typed_array import ArrayT
+
+class TestArrayT(TestCase):
+
+    @number("9.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_basic(self):
+        a = ArrayT("i", 4)
+        self.assertListEqual(a.to_list(), [0, 0, 0, 0])
+        self.assertEqual(a.itemsize, 4)
+        a[1] = 5
+        a[2:4] = [6, 7]
+        self.assertListEqual(list(a), [0, 5, 6, 7])
+        self.assertEqual(a.index(6), 2)
+        self.assertRaises(TypeError, lambda: a.__setitem__(0, 1.5))
+        self.assertRaises(ValueError, lambda: a.__setitem__(slice(0, 2), [1]))
+        self.assertRaises(ValueError, lambda: ArrayT("i", -1))
+        self.assertEqual(str(a[1:3]), "[5, 6]")
+
+    @number("9.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_bulk(self):
+        a = ArrayT.from_list("d", [0.5, 2])
+        b = a.copy()
+        b.fill(1.0)
+        self.assertListEqual(a.to_list(), [0.5, 2.0])
+        self.assertListEqual(b.to_list(), [1.0, 1.0])
+        self.assertListEqual(a.extend_into(3).to_list(), [0.5, 2.0, 0.0])
+
+    @number("9.7")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_zero_copy_view(self):
+        a = ArrayT.from_list("i", [1, 2, 3])
+        view = a.view()
+        view[0] = 10
+        self.assertEqual(a[0], 10)
+        a.fill(4)
+        self.assertListEqual(view.tolist(), [4, 4, 4])
+        self.assertEqual(view.nbytes, 12)
+
+    @number("9.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @skipUnless(importlib.util.find_spec("numpy"), "numpy is not installed")
+    @timeout()
+    def test_numpy_view(self):
+        a = ArrayT.from_list("d", [1.0, 2.0])
+        arr = a.to_numpy()
+        arr[1] = 3.0
+        self.assertEqual(a[1], 3.0)
+        self.assertEqual(ArrayT.from_list("h", [1, -2]).to_numpy().tolist(), [1, -2])
+        with self.assertRaises(ValueError):
+            ArrayT.from_list("u", ["a"]).to_numpy()
+
+    @number("9.9")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_effectiveness_from_typed_values(self):
+        calculator = EffectivenessCalculator.from_csv(EFFECTIVENESS_FILE)
+        self.assertEqual(len(calculator.effectiveness_map), 18 * 18)
+        self.assertEqual(calculator.lookup(Element.FIRE, Element.GRASS), 2)
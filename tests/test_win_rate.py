@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from helpers import Aquariuma, Driftsnake, Faeboa, Flamikin, Rockodile, Strikeon, Venomcoil, Vineon
+from team import MonsterTeam
+from win_rate import battle_seed, estimate_win_rate, wilson_interval
+
+from data_structures.referential_array import ArrayR
+
+def provided(mode, classes):
+    classes = ArrayR.from_list(classes)
+    return lambda: MonsterTeam(mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=classes)
+
+class TestWinRate(TestCase):
+
+    @number("13.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_wilson_interval(self):
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+        low, high = wilson_interval(50, 100)
+        self.assertAlmostEqual(low + high, 1)
+        self.assertAlmostEqual(high - low, 0.19, places=2)
+        low, high = wilson_interval(100, 100)
+        self.assertEqual(high, 1.0)
+        self.assertGreater(low, 0.9)
+        # Wider for higher confidence, narrower with more samples.
+        self.assertGreater(wilson_interval(5, 10, 0.99)[1], wilson_interval(5, 10, 0.9)[1])
+        self.assertLess(wilson_interval(500, 1000)[1], wilson_interval(50, 100)[1])
+        self.assertNotEqual(battle_seed(0, 0), battle_seed(0, 1))
+
+    @number("13.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_stops_early(self):
+        make_team = provided(MonsterTeam.TeamMode.BACK, [Flamikin, Aquariuma, Vineon])
+        wide = estimate_win_rate(make_team, target_width=0.7, batch_size=10)
+        self.assertTrue(wide.converged)
+        self.assertEqual(wide.battles, 10)
+        narrow = estimate_win_rate(make_team, target_width=0.1, batch_size=10)
+        self.assertTrue(narrow.converged)
+        self.assertGreater(narrow.battles, wide.battles)
+        self.assertEqual(narrow.battles % 10, 0)
+        self.assertLessEqual(narrow.width, 0.1)
+        self.assertTrue(narrow.low <= narrow.win_rate <= narrow.high)
+        self.assertEqual(narrow.wins + narrow.losses + narrow.draws, narrow.battles)
+
+    @number("13.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_reproducible_and_capped(self):
+        make_team = provided(MonsterTeam.TeamMode.BACK, [Flamikin, Aquariuma, Vineon])
+        RandomGen.set_seed(1234)
+        first = estimate_win_rate(make_team, target_width=0.01, batch_size=7, max_battles=60, seed=5)
+        # The caller's RandomGen is left as it was.
+        self.assertEqual(RandomGen.seed, 1234)
+        second = estimate_win_rate(make_team, target_width=0.01, batch_size=20, max_battles=60, seed=5)
+        self.assertFalse(first.converged)
+        self.assertEqual(first.battles, 60)
+        # Each battle has its own seed, so batching makes no difference.
+        self.assertEqual((first.wins, first.losses, first.draws), (second.wins, second.losses, second.draws))
+        other = estimate_win_rate(make_team, target_width=0.01, max_battles=60, seed=6)
+        self.assertNotEqual((first.wins, first.losses), (other.wins, other.losses))
+        self.assertRaises(ValueError, lambda: estimate_win_rate(make_team, target_width=0))
+
+    @number("13.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_stalled_battles(self):
+        # These two teams never finish without a turn limit.
+        make_team = provided(MonsterTeam.TeamMode.BACK, [Rockodile, Faeboa, Venomcoil])
+        make_opponent = provided(MonsterTeam.TeamMode.FRONT, [Strikeon, Driftsnake, Aquariuma])
+        battle = Battle(max_turns=50)
+        self.assertEqual(battle.battle(make_team(), make_opponent()), Battle.Result.DRAW)
+        self.assertTrue(battle.stalled)
+        self.assertEqual(battle.turn_number, 50)
+        estimate = estimate_win_rate(make_team, make_opponent=make_opponent, batch_size=4, max_battles=4, max_turns=50)
+        self.assertGreater(estimate.stalled, 0)
+        self.assertLessEqual(estimate.stalled, estimate.draws)
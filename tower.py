@@ -1,11 +1,16 @@
 from __future__ import annotations
+import sys
+from contextlib import contextmanager
+from typing import Iterator, TextIO
 
+from profiling import profiler
 from random_gen import RandomGen
 from team import MonsterTeam
 from battle import Battle
 
 from elements import Element
 
+from data_structures.bset import BSet
 from data_structures.referential_array import ArrayR
 
 class BattleTower:
@@ -13,20 +18,54 @@ class BattleTower:
     MIN_LIVES = 2
     MAX_LIVES = 10
 
-    def __init__(self, battle: Battle|None=None) -> None:
+    def __init__(self, battle: Battle|None=None, profile: bool=False) -> None:
+        """
+        :profile: Count and time the hot paths of this run (see profiling.py),
+            and print a summary once iterating over the tower runs out of battles.
+            The profiler is only enabled while one of the tower's own methods runs,
+            so a tower that is dropped early leaves nothing installed. If something
+            else already enabled the profiler when the tower first runs, the tower
+            leaves it (and its counters) to that caller.
+        """
         self.battle = battle or Battle(verbosity=0)
         self.player_team = None
         self.enemy_teams = []
         self.enemy_team = None
         self.enemy_teams_order = []
+        # Elements of every team that has fought so far, for out_of_meta.
+        self.elements_seen = BSet()
+        self.profile = profile
+        # Whether this tower enables the profiler itself; decided the first time it runs.
+        self.owns_profiler: bool | None = None
+
+    @contextmanager
+    def _profiled(self) -> Iterator[None]:
+        """Profile the enclosed block if this run is profiled (and nothing else enabled the profiler)."""
+        if self.profile and self.owns_profiler is None:
+            self.owns_profiler = not profiler.enabled
+            if self.owns_profiler:
+                profiler.reset()
+        if not self.profile or not self.owns_profiler or profiler.enabled:
+            yield
+            return
+        with profiler.profile(reset=False):
+            yield
 
     def set_my_team(self, team: MonsterTeam) -> None:
+        with self._profiled():
+            self._set_my_team(team)
+
+    def _set_my_team(self, team: MonsterTeam) -> None:
         # Generate the team lives here too.
         self.player_team = team
         self.player_team.regenerate_team()
         self.player_team.lives = RandomGen.randint(self.MIN_LIVES, self.MAX_LIVES)
 
     def generate_teams(self, n: int) -> None:
+        with self._profiled():
+            self._generate_teams(n)
+
+    def _generate_teams(self, n: int) -> None:
         for _ in range(n):
             enemy_team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
             enemy_team.regenerate_team()
@@ -38,11 +77,17 @@ class BattleTower:
         return self.player_team.lives > 0 and any(team.lives > 0 for team in self.enemy_teams)
 
     def next_battle(self) -> tuple[Battle.Result, MonsterTeam, MonsterTeam, int, int]:
+        with self._profiled():
+            return self._next_battle()
+
+    def _next_battle(self) -> tuple[Battle.Result, MonsterTeam, MonsterTeam, int, int]:
         if not self.battles_remaining():
             raise ValueError("No battles remaining.")
 
         if self.enemy_team is None:
             self.enemy_team = self.enemy_teams_order.pop(0)
+        self.elements_seen |= self._team_elements(self.player_team)
+        self.elements_seen |= self._team_elements(self.enemy_team)
         result = self.battle.battle(self.player_team, self.enemy_team)
         return_player_lives = self.player_team.lives
         return_enemy_lives = self.enemy_team.lives
@@ -63,21 +108,24 @@ class BattleTower:
         
         return result, self.player_team, self.enemy_team, return_player_lives, return_enemy_lives
 
-    def out_of_meta(self) -> ArrayR[Element]:
-        elements_present = ArrayR(len(Element), False)
-        
-        for team in self.enemy_teams:
-            for monster in team.monster_order:
-                for element in Element:
-                    if element in monster.get_element():
-                        elements_present[element.value - 1] = True
-        
-        for monster in self.player_team.monster_order:
-            for element in Element:
-                if element in monster.get_element():
-                    elements_present[element.value - 1] = True
+    @staticmethod
+    def _team_elements(team: MonsterTeam) -> BSet:
+        # Element values are 1-based, so they can be used directly as BSet items.
+        return BSet.from_iterable(
+            Element.from_string(team.monster_order[i].get_element()).value
+            for i in range(len(team))
+        )
 
-        return elements_present.filter(lambda x: not x)
+    def out_of_meta(self) -> ArrayR[Element]:
+        """
+        The elements that have been in a battle so far, but are in neither team of the next one.
+        :complexity: O(P + E) where P and E are the sizes of the player's and the next enemy team.
+        """
+        if self.enemy_team is None:
+            # No battle has been fought yet.
+            return ArrayR(0)
+        elements = self.elements_seen - self._team_elements(self.player_team) - self._team_elements(self.enemy_team)
+        return ArrayR.from_iterable(Element(value) for value in elements)
 
     def sort_by_lives(self):
         # 1054 ONLY
@@ -88,7 +136,16 @@ class BattleTower:
             print(f'{"*"*10} Player lives: {self.player_team.lives} | enemy lives: {[team.lives for team in self.enemy_teams]} {"*"*10}')
 
             return self.next_battle()
+        if self.profile:
+            self.dump_profile()
         raise StopIteration
+
+    def dump_profile(self, stream: TextIO=sys.stdout) -> None:
+        """Stop profiling this run and write the summary of its counters and timers."""
+        # The tower only enables the profiler inside its own methods, so there is nothing to
+        # disable here, and anything enabled now belongs to someone else.
+        self.profile = False
+        print(profiler.summary(), file=stream)
     
     def __iter__(self):
         return self